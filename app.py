@@ -3,17 +3,23 @@ import datetime
 import pandas as pd
 import plotly.express as px
 import numpy as np
-import importlib
 import pytz 
 
-# Force reload of route_solver on every interaction
-import route_solver
-importlib.reload(route_solver)
-
-# Import BOTH solvers
-from route_solver import solve_route_with_priorities, solve_max_score_route, fetch_live_data, get_wait_time_prediction
+# Import BOTH solvers (the model itself loads lazily, once per process)
+from route_solver import solve_route_with_priorities, get_wait_time_prediction, predict_grid, get_wait_forecast
+from exact_solver import solve_route_exact, MAX_EXACT_RIDES
+from beam_solver import solve_route_beam
+from local_search import improve_route
+from orienteering import solve_max_score_anytime
+from parallel_solver import solve_parallel
+from replanner import replan
+from plan_cache import cached_plan
+from zone_solver import solve_route_zoned
+from start_sweep import sweep_start_times
+from live_data import refresh_park
 from queuequest_meta import ATTRACTION_METADATA
 from holiday_utils import is_crowd_risk_day
+import model_store
 
 # Try to load weather_utils
 try:
@@ -25,6 +31,13 @@ except ImportError:
 
 st.set_page_config(page_title="QueueQuest Pro", page_icon="🎢", layout="wide")
 
+# Pick up a freshly published model version between requests (cheap, throttled check).
+# A broken version must not take the app down: keep serving the current model.
+try:
+    model_store.check_for_update()
+except Exception as e:
+    print(f"⚠️ Model update failed, keeping the current model: {e}")
+
 # --- CSS STYLING ---
 st.markdown("""
     <style>
@@ -118,9 +131,9 @@ def get_step_reason(step, prev_step_loc, park_name, live_data):
         # Look 2 hours into the future
         future_check_time = arrival_dt + datetime.timedelta(hours=2)
         
-        # Predict wait time in future
-        wait_later = get_wait_time_prediction(park_name, ride, future_check_time, live_data_snapshot=None)
-        if isinstance(wait_later, dict): wait_later = 15
+        # Predict wait time in future (shared per-day forecast, no model call)
+        wait_later = get_wait_forecast(park_name, today).lookup(ride, future_check_time)
+        if wait_later is None: wait_later = get_wait_time_prediction(park_name, ride, future_check_time, live_data_snapshot=None)
         
         time_saved = wait_later - wait_now
         
@@ -163,6 +176,7 @@ defaults = {
     'lunch_done': False,
     'last_route': None,
     'last_closed': [],
+    'pending_diff': None,
     'mc': [], 'sc': [], 
     'md': [], 'sd': [], 
     'mo': [], 'so': [] 
@@ -189,11 +203,22 @@ if 'end_time_val' not in st.session_state:
 def update_start_time(): st.session_state.start_time_val = st.session_state.widget_start_time
 def update_end_time(): st.session_state.end_time_val = st.session_state.widget_end_time
 
+def plan_route(park_name, must_haves, should_haves, start_str, end_str, start_location, lunch_config, pace_factor, now=None, planner="⚡ Greedy", polish=False):
+    solver = {"🎯 Exact": solve_route_exact, "🔭 Beam": solve_route_beam}.get(planner, solve_route_with_priorities)
+    route, closed, skipped = solver(park_name, must_haves, should_haves, start_str, end_str, start_location, lunch_config, pace_factor, now=now)
+    if polish and route:
+        route, skipped, _ = improve_route(park_name, route, must_haves, should_haves, start_str, end_str, start_location, lunch_config, pace_factor, now=now)
+    return route, closed, skipped
+
 def mark_done(ride_name):
     if ride_name not in st.session_state.completed:
         st.session_state.completed.append(ride_name)
+    # Route niet weggooien: alleen het deel na deze rit wordt opnieuw gepland
+    if st.session_state.last_route:
+        diff = st.session_state.pending_diff or {"origin": st.session_state.current_loc}
+        diff.setdefault("done", []).append(ride_name)
+        st.session_state.pending_diff = diff
     st.session_state.current_loc = ride_name
-    st.session_state.last_route = None
     
     # Update time to NOW
     tz = pytz.timezone('Europe/Brussels')
@@ -270,9 +295,17 @@ with st.sidebar.expander("🍔 Lunch Break"):
 
 # Live data button
 if st.sidebar.button("🔄 Refresh Live Data"):
-    st.cache_data.clear()
+    # Alleen dit park; gelijktijdige refreshes van andere sessies delen hetzelfde request
     with st.spinner("Connecting to park servers..."):
-        st.session_state.live_data = fetch_live_data(park_keuze)
+        st.session_state.live_data = refresh_park(park_keuze)
+    # Gesloten ritten en nieuwe wachttijden doorgeven aan de bestaande route
+    if st.session_state.last_route and st.session_state.live_data:
+        planned = [s['ride'] for s in st.session_state.last_route if s['type'] != 'LUNCH']
+        fresh = {r: st.session_state.live_data[r] for r in planned if r in st.session_state.live_data}
+        diff = st.session_state.pending_diff or {"origin": st.session_state.current_loc}
+        diff["closed"] = [r for r, d in fresh.items() if not d['is_open']]
+        diff["waits"] = {r: d['wait_time'] for r, d in fresh.items() if d['is_open']}
+        st.session_state.pending_diff = diff
 live_data = st.session_state.get('live_data', {})
 
 active_selection = must_haves + should_haves
@@ -298,16 +331,14 @@ if not is_park_closed and active_selection:
         future_advice = now_advice + datetime.timedelta(minutes=45) 
         
         advice_count = 0
+        open_targets = [ride for ride in targets if ride in live_data and live_data[ride]['is_open']]
         
-        for ride in targets:
-            if ride not in live_data or not live_data[ride]['is_open']:
-                continue
-                
+        # Forecast (one batched model call for all targets)
+        future_grid = predict_grid(park_keuze, open_targets, [future_advice])
+        
+        for ride, future_row in zip(open_targets, future_grid):
             current_w = live_data[ride]['wait_time']
-            
-            # Forecast
-            future_w = get_wait_time_prediction(park_keuze, ride, future_advice, live_data_snapshot=None)
-            if isinstance(future_w, dict): future_w = 15
+            future_w = int(future_row[0])
             
             diff = future_w - current_w
             
@@ -338,6 +369,13 @@ with tab_copilot:
     c1, c2 = st.columns(2)
     c1.time_input("Start Time", value=st.session_state.start_time_val, key="widget_start_time", on_change=update_start_time)
     c2.time_input("End Time", value=st.session_state.end_time_val, key="widget_end_time", on_change=update_end_time)
+    planner_mode = st.radio(
+        "Planner", ["⚡ Greedy", "🎯 Exact", "🔭 Beam"], horizontal=True, key="planner_mode",
+        help=f"Exact searches every order (up to {MAX_EXACT_RIDES} rides, no lunch) and falls back to Greedy otherwise. "
+             "Beam keeps the best partial plans at every step; good for long wishlists."
+    )
+    polish_route = st.checkbox("✨ Polish route (local search)", key="polish_route",
+                               help="Reorders the plan afterwards (reversals, moves, swaps) to cut zig-zags and fit skipped rides.")
     
     if st.button("🚀 Calculate Route", type="primary", use_container_width=True):
         if not active_selection and not lunch_config:
@@ -347,7 +385,9 @@ with tab_copilot:
                 s_str = st.session_state.start_time_val.strftime("%H:%M")
                 e_str = st.session_state.end_time_val.strftime("%H:%M")
                 
-                route, closed, skipped = solve_route_with_priorities(
+                # Identieke aanvragen (zelfde park, lijst, venster, live snapshot) komen uit de plan cache
+                route, closed, skipped = cached_plan(
+                    plan_route,
                     park_name=park_keuze,
                     must_haves=must_haves,
                     should_haves=should_haves,
@@ -355,11 +395,24 @@ with tab_copilot:
                     end_str=e_str, 
                     start_location=st.session_state.current_loc,
                     lunch_config=lunch_config,
-                    pace_factor=pace_factor 
+                    pace_factor=pace_factor,
+                    planner=planner_mode,
+                    polish=polish_route
                 )
                 st.session_state.last_route = route
                 st.session_state.last_closed = closed
 
+    if st.session_state.pending_diff and st.session_state.last_route:
+        diff = st.session_state.pending_diff
+        route, closed, _, _ = replan(
+            park_keuze, st.session_state.last_route, diff, must_haves, should_haves,
+            st.session_state.start_time_val.strftime("%H:%M"), st.session_state.end_time_val.strftime("%H:%M"),
+            st.session_state.current_loc, diff["origin"], lunch_config, pace_factor
+        )
+        st.session_state.last_route = route
+        st.session_state.last_closed = closed
+    st.session_state.pending_diff = None
+
     if st.session_state.last_route:
         route = st.session_state.last_route
         if st.session_state.last_closed and not is_park_closed: 
@@ -499,9 +552,13 @@ with tab_radar:
         market_data = []
         tz = pytz.timezone('Europe/Brussels')
         now_radar = datetime.datetime.now(tz)
+        open_rides = [ride_name for ride_name, data in live_data.items() if data['is_open']]
+        predicted_now = {}
+        if "AI" in benchmark_mode:
+            predicted_now = dict(zip(open_rides, predict_grid(park_keuze, open_rides, [now_radar])[:, 0].tolist()))
 
-        for ride_name, data in live_data.items():
-            if not data['is_open']: continue
+        for ride_name in open_rides:
+            data = live_data[ride_name]
 
             curr_wait = data['wait_time']
             meta = ATTRACTION_METADATA.get(ride_name, {})
@@ -511,9 +568,7 @@ with tab_radar:
             if score_filter == "8+ (Top Tier)" and score < 8: continue
 
             if "AI" in benchmark_mode:
-                predicted = get_wait_time_prediction(park_keuze, ride_name, now_radar, live_data_snapshot=None)
-                if isinstance(predicted, dict): predicted = 20
-                norm_wait = predicted
+                norm_wait = predicted_now[ride_name]
             else:
                 norm_wait = historical_averages.get(ride_name, curr_wait) 
             
@@ -631,21 +686,14 @@ with tab_best:
         st.divider()
 
         with st.spinner(f"Analyzing from {start_h}:00 to {end_h}:00..."):
-            for ride in target:
-                trend_list = []
-                min_w = 999
-                best_h = start_h
-
-                for h in hours_range:
-                    query_time = tz.localize(datetime.datetime.combine(today, datetime.time(h, 0)))
-                    w = get_wait_time_prediction(park_keuze, ride, query_time, live_data)
-                    val = w if isinstance(w, int) else 15
-                    
-                    trend_list.append(val)
-                    
-                    if val < min_w:
-                        min_w = val
-                        best_h = h
+            query_times = [tz.localize(datetime.datetime.combine(today, datetime.time(h, 0))) for h in hours_range]
+            wait_grid = predict_grid(park_keuze, target, query_times, live_data_snapshot=live_data)
+
+            for ride, wait_row in zip(target, wait_grid):
+                trend_list = wait_row.tolist()
+                best_idx = int(np.argmin(wait_row))
+                min_w = trend_list[best_idx]
+                best_h = hours_range[best_idx]
                 
                 current_val = live_data.get(ride, {}).get('wait_time', 0) if live_data else trend_list[0]
                 saving = max(0, current_val - min_w)
@@ -701,6 +749,40 @@ with tab_best:
             use_container_width=True
         )
 
+        # 3. BEST ARRIVAL TIME (ONE PLAN PER START TIME)
+        st.divider()
+        st.subheader("🕘 When Should We Arrive?")
+        st.caption("Plans your whole wishlist for every start time in the window and ranks them.")
+        sw1, sw2, sw3 = st.columns(3)
+        sweep_first = sw1.time_input("Earliest arrival", datetime.time(9, 0), key="sweep_first")
+        sweep_last = sw2.time_input("Latest arrival", datetime.time(13, 0), key="sweep_last")
+        sweep_step = sw3.selectbox("Every", [15, 30, 60], format_func=lambda m: f"{m} min", key="sweep_step")
+
+        if st.button("🔁 Compare Start Times", use_container_width=True):
+            with st.spinner("Planning every start time..."):
+                sweep_rows, _ = sweep_start_times(
+                    park_keuze, must_haves, should_haves, sweep_first.strftime("%H:%M"), sweep_last.strftime("%H:%M"),
+                    st.session_state.end_time_val.strftime("%H:%M"), sweep_step, st.session_state.current_loc, lunch_config, pace_factor
+                )
+            if not sweep_rows:
+                st.warning("No start time fits before closing.")
+            else:
+                best = sweep_rows[0]
+                st.success(f"🏆 Arrive at **{best['start']}**: {best['rides']} rides, {best['wait_min']} min waiting, done at {best['finish']}")
+                df_sweep = pd.DataFrame([{
+                    "Start": r['start'], "Rides": r['rides'], "Skipped": len(r['skipped']),
+                    "Total Wait": r['wait_min'], "Total Walk": r['walk_min'], "Finish": r['finish']
+                } for r in sweep_rows])
+                st.dataframe(
+                    df_sweep,
+                    column_config={
+                        "Total Wait": st.column_config.NumberColumn("Total Wait", format="%d min"),
+                        "Total Walk": st.column_config.NumberColumn("Total Walk", format="%d min"),
+                    },
+                    hide_index=True,
+                    use_container_width=True
+                )
+
 # TAB 4: FUTURE (INTELLIGENT PREP)
 # TAB 4: FUTURE (INTELLIGENT PREP)
 with tab_future:
@@ -737,26 +819,18 @@ with tab_future:
             best_start_ride = None
             min_start_wait = 999
             
-            for ride in top_rides:
-                total_wait = 0
-                count = 0
-                
-                start_time = datetime.datetime.combine(fut_date, datetime.time(10, 0))
-                start_w = get_wait_time_prediction(park_keuze, ride, start_time, weather_override={"temp_c": final_temp, "precip_mm": final_rain_mm, "condition": "Cloudy"})
-                if isinstance(start_w, dict): start_w = 15
+            # One model call for every ride x hour (10:00 is the first column)
+            day_times = [datetime.datetime.combine(fut_date, datetime.time(h, 0)) for h in hours_range]
+            wait_grid = predict_grid(park_keuze, top_rides, day_times, weather={"temp_c": final_temp, "precip_mm": final_rain_mm, "condition": "Cloudy"})
+            
+            for ride, wait_row in zip(top_rides, wait_grid):
+                start_w = int(wait_row[0])
                 
                 if start_w < min_start_wait:
                     min_start_wait = start_w
                     best_start_ride = ride
-
-                for h in hours_range:
-                    t = datetime.datetime.combine(fut_date, datetime.time(h, 0))
-                    w = get_wait_time_prediction(park_keuze, ride, t, weather_override={"temp_c": final_temp, "precip_mm": final_rain_mm, "condition": "Cloudy"})
-                    val = w if isinstance(w, int) else 15
-                    total_wait += val
-                    count += 1
                 
-                avg = total_wait / count if count > 0 else 0
+                avg = wait_row.mean() if len(wait_row) > 0 else 0
                 sim_results.append({"Attraction": ride, "Average Wait": int(avg)})
             
             df_res = pd.DataFrame(sim_results).sort_values("Average Wait", ascending=True)
@@ -815,6 +889,8 @@ with tab_perfect:
     else:
         st.caption("ℹ️ **Strategy:** Ignores your wishlist. Tries to visit **every single attraction** available in the park.")
         btn_label = "🌍 Calculate Full Loop"
+        zone_mode = st.checkbox("🗺️ Zone by zone (fast)", key="zone_mode",
+                                help="Orders the park's zones first, then the rides inside each zone. Much faster on long lists, slightly less optimal.")
 
     # 3. De Actie Knop
     if st.button(btn_label, type="primary", use_container_width=True):
@@ -825,13 +901,17 @@ with tab_perfect:
         # --- LOGICA VOOR HIGH SCORE ---
         if mode_selection == "💎 High Score Run":
             with st.spinner("AI finding winning strategy..."):
-                route, _, _ = solve_max_score_route(
+                # Anytime: starts from the greedy plan and shows every improvement while it searches
+                progress = st.empty()
+                route, _, _ = solve_max_score_anytime(
                     park_name=park_keuze,
                     start_str=s_str,
                     end_str=e_str,
                     start_location=st.session_state.current_loc,
-                    pace_factor=pace_factor
+                    pace_factor=pace_factor,
+                    on_improve=lambda plan, score: progress.caption(f"🔄 Best so far: {score:.1f} points in {len(plan)} rides")
                 )
+                progress.empty()
                 
                 if not route:
                     st.error("No route found. Park closed or time window too short?")
@@ -868,16 +948,23 @@ with tab_perfect:
                     st.success("You have already done everything! Go home! 😂")
                 else:
                     # 3. Solver aanroepen met ALLES als Must-Have
-                    route, closed, skipped = solve_route_with_priorities(
-                        park_name=park_keuze,
-                        must_haves=remaining_target, # Forceer alles
-                        should_haves=[],
-                        start_str=s_str,
-                        end_str=e_str, 
-                        start_location=st.session_state.current_loc,
-                        lunch_config=None,
-                        pace_factor=pace_factor 
-                    )
+                    if zone_mode:
+                        # Zones eerst, dan de ritten per zone
+                        route, closed, skipped = solve_route_zoned(
+                            park_keuze, remaining_target, [], s_str, e_str, st.session_state.current_loc, None, pace_factor
+                        )
+                    else:
+                        # Beam search start + seeded local search on every core
+                        route, closed, skipped, _ = solve_parallel(
+                            park_name=park_keuze,
+                            must_haves=remaining_target, # Forceer alles
+                            should_haves=[],
+                            start_str=s_str,
+                            end_str=e_str, 
+                            start_location=st.session_state.current_loc,
+                            lunch_config=None,
+                            pace_factor=pace_factor 
+                        )
                     
                     if not route and not skipped:
                         st.error("Time window too short to start.")
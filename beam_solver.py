@@ -0,0 +1,177 @@
+import time
+import numpy as np
+from queuequest_meta import ATTRACTION_METADATA
+from route_solver import solve_route_with_priorities
+from route_problem import problem_from_request, itinerary_step, lunch_step, CLOSED_WAIT
+
+# --- CONFIGURATIE ---
+BEAM_WIDTH = 64           # Aantal gedeeltelijke routes dat per stap bewaard blijft
+BEAM_DEPTH = None         # None = in één keer tot het einde plannen; anders vooruitkijken over zoveel ritten per stap
+TIME_BUDGET_S = 1.0       # Daarna wordt de rest van de dag greedy (breedte 1) ingevuld
+SHOULD_FACTOR = 1.3       # Zelfde weging als solve_route_with_priorities
+FUTURE_MIN = 120          # Urgentie: vergelijk met de wachttijd 2 uur later
+
+class BeamState:
+    """Een gedeeltelijke route: klok + locatie (minuten / locatie-id), bezochte ritten als bitmasker."""
+    __slots__ = ("score", "clock", "loc", "mask", "lunch_done", "last", "parent", "action")
+
+    def __init__(self, score, clock, loc, mask, lunch_done, last, parent=None, action=None):
+        self.score = score
+        self.clock = clock
+        self.loc = loc
+        self.mask = mask
+        self.lunch_done = lunch_done
+        self.last = last
+        self.parent = parent
+        self.action = action
+
+    def path(self):
+        actions, state = [], self
+        while state.parent is not None:
+            actions.append(state.action)
+            state = state.parent
+        return actions[::-1]
+
+class BeamPlanner:
+    """Beam search over een RouteProblem met de scoreregels van solve_route_with_priorities."""
+
+    def __init__(self, problem, width=BEAM_WIDTH, depth=BEAM_DEPTH):
+        if problem.n > 62: raise ValueError("Beam search ondersteunt maximaal 62 attracties")
+        self.problem = problem
+        self.width = width
+        self.depth = depth
+        self.ids = np.arange(problem.n)
+        self.full_mask = (1 << problem.n) - 1
+        self.must_mask = sum(1 << i for i in range(problem.n) if problem.is_must[i])
+        self.weight = np.where(problem.is_must, 1.0, SHOULD_FACTOR)
+        quality = np.array([ATTRACTION_METADATA.get(r, {}).get('score', 5) for r in problem.rides])
+        self.repeat_penalty = np.where(quality < 7, 500, 20)
+
+    def settle(self, state):
+        """Lunch invoegen zodra het tijd is (zelfde volgorde van checks als de greedy loop)."""
+        lunch = self.problem.lunch
+        while state.mask != self.full_mask and state.clock < self.problem.horizon:
+            if not lunch or state.lunch_done or state.clock < lunch['minute']: break
+            walk = int(self.problem.transit[state.loc, lunch['loc']])
+            state = BeamState(state.score, state.clock + walk + lunch['duration'], lunch['loc'], state.mask, True, None,
+                              state, ("LUNCH", state.clock, walk))
+        return state
+
+    def is_terminal(self, state):
+        return state.mask == self.full_mask or state.clock >= self.problem.horizon
+
+    def expand(self, layer):
+        """Alle haalbare opvolgers van alle states in `layer`, als (states, rit, stapscore) arrays."""
+        p = self.problem
+        clocks = np.array([s.clock for s in layer])
+        masks = np.array([s.mask for s in layer], dtype=np.int64)
+        transit = p.transit[[s.loc for s in layer]][:, 1:p.n + 1]
+        arrival = clocks[:, None] + transit
+        ok = (((masks[:, None] >> self.ids) & 1) == 0) & (arrival < p.horizon)
+        arrival = np.minimum(arrival, p.horizon - 1)
+        wait = p.waits[self.ids, arrival]
+        future = p.waits[self.ids, arrival + FUTURE_MIN]
+        ok &= wait < CLOSED_WAIT
+
+        # calculate_dynamic_score + anti-repetitie + should-weging, voor alle kandidaten tegelijk
+        urgency = np.where(future > wait + 15, -20, np.where(future < wait - 10, 15, 0))
+        score = np.maximum(transit, transit + wait + urgency).astype(float)
+        for row, state in enumerate(layer):
+            if state.last is not None: score[row, state.last] += self.repeat_penalty[state.last]
+        score *= self.weight
+        rows, rides = np.nonzero(ok)
+        return rows, rides, score[rows, rides], transit, arrival, wait
+
+    def search(self, root, depth=None, deadline=None):
+        """Beam search vanaf `root`; geeft de beste state na `depth` ritten (of eerder, als alles klaar is)."""
+        p = self.problem
+        best = None
+        layer = [self.settle(root)]
+        for _ in range(depth if depth is not None else p.n):
+            open_states = [s for s in layer if not self.is_terminal(s)]
+            rows, rides, step_score, transit, arrival, wait = self.expand(open_states) if open_states else ([], [], [], None, None, None)
+            done_rows = set(range(len(open_states))) - set(np.asarray(rows).tolist())
+            for s in [s for s in layer if self.is_terminal(s)] + [open_states[r] for r in done_rows]:
+                best = self.better(best, s)
+            if len(rows) == 0: layer = []; break
+
+            totals = np.array([open_states[r].score for r in rows]) + step_score
+            keep = np.argsort(totals, kind='stable')[:self.width]
+            layer = []
+            for k in keep:
+                r, i = rows[k], rides[k]
+                parent = open_states[r]
+                end = int(arrival[r, i] + wait[r, i] + p.durations[i])
+                child = BeamState(float(totals[k]), end, i + 1, parent.mask | (1 << int(i)), parent.lunch_done, int(i),
+                                  parent, ("RIDE", int(i), parent.clock, int(transit[r, i]), int(arrival[r, i]), int(wait[r, i])))
+                layer.append(self.settle(child))
+            if deadline is not None and time.perf_counter() > deadline: break
+        for s in layer:
+            best = self.better(best, s)
+        return best
+
+    def better(self, a, b):
+        """Meer must-haves, dan meer ritten, dan de laagste totaalscore."""
+        if a is None: return b
+        key = lambda s: (-bin(s.mask & self.must_mask).count("1"), -bin(s.mask).count("1"), s.score)
+        return b if key(b) < key(a) else a
+
+    def plan(self, deadline=None, start=0):
+        """
+        Zonder diepte: één beam search tot het einde. Met diepte: vooruitkijken over `depth` ritten,
+        de eerste stap vastleggen en opnieuw zoeken. Na de deadline wordt elke stap greedy (breedte 1).
+        `start` = vertrekminuut vanaf de startlocatie (0 = t0 van het probleem).
+        """
+        root = BeamState(0.0, start, 0, 0, False, None)
+        if self.depth is None:
+            best = self.search(root, deadline=deadline)
+            if deadline is None or time.perf_counter() <= deadline or self.is_terminal(best): return best
+            root = best
+        state = self.settle(root)
+        while not self.is_terminal(state):
+            out_of_time = deadline is not None and time.perf_counter() > deadline
+            if out_of_time: self.width = 1
+            best = self.search(state, 1 if out_of_time else (self.depth or 1), deadline)
+            if best is state: break
+            # Alleen de eerste rit na `state` vastleggen
+            while best.parent is not state:
+                best = best.parent
+            state = self.settle(best)
+        return state
+
+def emit_itinerary(problem, state):
+    return emit_actions(problem, state.path())
+
+def emit_actions(problem, actions):
+    itinerary = []
+    for action in actions:
+        if action[0] == "LUNCH":
+            itinerary.append(lunch_step(problem, action[1], action[2]))
+        else:
+            _, ride, depart, transit, arrival, wait = action
+            itinerary.append(itinerary_step(problem, ride, depart, transit, arrival, wait))
+    return itinerary
+
+# --- SOLVER (ZELFDE INTERFACE ALS solve_route_with_priorities) ---
+def solve_route_beam(park_name, must_haves, should_haves, start_str, end_str, start_location="Unknown", lunch_config=None, pace_factor=1.0,
+                     beam_width=BEAM_WIDTH, depth=BEAM_DEPTH, time_budget_s=TIME_BUDGET_S, now=None):
+    args = (park_name, must_haves, should_haves, start_str, end_str, start_location, lunch_config, pace_factor, now)
+    deadline = time.perf_counter() + time_budget_s
+    problem, closed_rides = problem_from_request(*args)
+    if problem is None: return [], closed_rides, []
+    if problem.n > 62: return solve_route_with_priorities(*args)
+    best = BeamPlanner(problem, beam_width, depth).plan(deadline)
+    skipped = [r for i, r in enumerate(problem.rides) if not (best.mask >> i) & 1]
+    return emit_itinerary(problem, best), closed_rides, skipped
+
+if __name__ == "__main__":
+    # "Doe alles"-dag: greedy tegenover beam search met verschillende breedtes
+    park = "EFTELING"
+    everything = [r for r, m in ATTRACTION_METADATA.items() if m['park'] == park and m.get('type') not in ['Restaurant', 'Snack']]
+    t0 = time.perf_counter()
+    route, _, skipped = solve_route_with_priorities(park, everything, [], "10:00", "16:00")
+    print(f"Greedy       | {len(route)} ritten | {len(skipped)} overgeslagen | {sum(s['wait_min'] for s in route)} min wachten | {time.perf_counter() - t0:.2f}s")
+    for width, depth in [(1, None), (8, None), (64, None), (8, 4)]:
+        t0 = time.perf_counter()
+        route, _, skipped = solve_route_beam(park, everything, [], "10:00", "16:00", beam_width=width, depth=depth)
+        print(f"Beam {width:>2} / {str(depth):<4} | {len(route)} ritten | {len(skipped)} overgeslagen | {sum(s['wait_min'] for s in route)} min wachten | {time.perf_counter() - t0:.2f}s")
@@ -1,4 +1,6 @@
 import math
+import threading
+import numpy as np
 from queuequest_meta import ATTRACTION_METADATA
 
 # --- CONFIGURATIE ---
@@ -26,6 +28,24 @@ ZONE_LOCATIONS = {
     }
 }
 
+# Phantasialand Loopmatrix (zones i.p.v. GPS, het park is te verweven voor vogelvlucht)
+PHL_LOCATIONS = {
+    "Ingang": "Berlin", "Maus au Chocolat": "Berlin",
+    "Taron": "Klugheim", "Raik": "Klugheim",
+    "River Quest": "Mystery", "Mystery Castle": "Mystery",
+    "F.L.Y.": "Rookburgh", "Black Mamba": "Africa", "Deep in Africa": "Africa",
+    "Talocan": "Mexico", "Chiapas": "Mexico", "Colorado Adventure": "Mexico",
+    "Winja's Fear": "Wuze Town", "Winja's Force": "Wuze Town", "Crazy Bats": "Wuze Town",
+    "Feng Ju Palace": "China", "Geister Rikscha": "China"
+}
+
+PHL_WALK_MATRIX = {
+    ("Berlin", "Rookburgh"): 2, ("Berlin", "Mexico"): 5, ("Berlin", "China"): 8, 
+    ("Berlin", "Klugheim"): 6, ("Berlin", "Africa"): 8, ("Klugheim", "Mexico"): 3,
+    ("Klugheim", "China"): 4, ("Klugheim", "Africa"): 4, ("Klugheim", "Rookburgh"): 8, 
+    ("Mexico", "Africa"): 3, ("Rookburgh", "Wuze Town"): 6
+}
+
 def haversine_distance(coord1, coord2):
     """Berekent afstand in meters (vogelvlucht)."""
     R = 6371000 
@@ -67,6 +87,10 @@ def get_travel_time(loc_a, loc_b):
     # Als een van de twee "Ingang" is, moeten we weten welk park
     park_name = meta_a['park'] if meta_a else (meta_b['park'] if meta_b else "EFTELING")
     
+    # Snel pad: voorberekende GPS-matrix van het park
+    minutes = get_transit_matrix(park_name, use_zones=False).travel_time(loc_a, loc_b)
+    if minutes is not None: return minutes
+    
     coord_a = get_coordinates(park_name, loc_a)
     coord_b = get_coordinates(park_name, loc_b)
     
@@ -78,6 +102,84 @@ def get_travel_time(loc_a, loc_b):
     speed_m_min = (WALKING_SPEED_KMH * 1000) / 60
     return int(math.ceil(real_dist / speed_m_min))
 
+def haversine_matrix(lats, lons):
+    """Vectorized haversine: afstand in meters tussen alle paren (rij = van, kolom = naar)."""
+    R = 6371000
+    lat, lon = np.radians(lats), np.radians(lons)
+    dlat = lat[None, :] - lat[:, None]
+    dlon = lon[None, :] - lon[:, None]
+    a = np.sin(dlat/2)**2 + np.cos(lat)[:, None] * np.cos(lat)[None, :] * np.sin(dlon/2)**2
+    c = 2 * np.arctan2(np.sqrt(a), np.sqrt(1 - a))
+    return R * c
+
+def phl_zone_minutes(zone_a, zone_b):
+    """Looptijd tussen twee Phantasialand zones volgens PHL_WALK_MATRIX (4 binnen een zone, 12 als onbekend)."""
+    if zone_a == zone_b: return 4
+    return PHL_WALK_MATRIX.get((zone_a, zone_b), PHL_WALK_MATRIX.get((zone_b, zone_a), 12))
+
+# --- TRANSIT MATRIX (EÉN KEER PER PARK OPGEBOUWD) ---
+class TransitMatrix:
+    """
+    Looptijden (minuten, bij tempo 1.0) tussen alle locaties van één park.
+    Locatie-id 0 is de Ingang, daarna alle attracties/restaurants in ATTRACTION_METADATA volgorde.
+    """
+
+    def __init__(self, park_name, locations, base_minutes):
+        self.park_name = park_name
+        self.locations = list(locations)
+        self.index = {name: i for i, name in enumerate(self.locations)}
+        self.base_minutes = base_minutes
+        self._paced = {}
+
+    @classmethod
+    def build(cls, park_name, use_zones=None):
+        """use_zones: Phantasialand-zones i.p.v. GPS (standaard alleen voor Phantasialand)."""
+        if use_zones is None: use_zones = park_name == "PHANTASIALAND"
+        locations = ["Ingang"] + [name for name, m in ATTRACTION_METADATA.items() if m.get('park') == park_name]
+        if use_zones:
+            zones = [PHL_LOCATIONS.get(name, "Berlin") for name in locations]
+            base = np.array([[phl_zone_minutes(za, zb) for zb in zones] for za in zones], dtype=float)
+        else:
+            coords = [get_coordinates(park_name, name) for name in locations]
+            lats = np.array([c[0] if c else np.nan for c in coords])
+            lons = np.array([c[1] if c else np.nan for c in coords])
+            real_dist = haversine_matrix(lats, lons) * DETOUR_FACTOR
+            speed_m_min = (WALKING_SPEED_KMH * 1000) / 60
+            minutes = np.ceil(real_dist / speed_m_min)
+            base = np.where(np.isnan(minutes), 10, minutes)   # Geen GPS: veilige fallback
+        np.fill_diagonal(base, 0)
+        return cls(park_name, locations, base.astype(np.int32))
+
+    def minutes(self, pace=1.0):
+        """Matrix met int(basis * tempo), per tempo één keer uitgerekend."""
+        paced = self._paced.get(pace)
+        if paced is None:
+            paced = (self.base_minutes * pace).astype(np.int32)
+            self._paced[pace] = paced
+        return paced
+
+    def travel_time(self, loc_a, loc_b, pace=1.0):
+        """Looptijd tussen twee locaties, of None als een van beide niet in dit park bekend is."""
+        i, j = self.index.get(loc_a), self.index.get(loc_b)
+        if i is None or j is None: return None
+        return int(self.minutes(pace)[i, j])
+
+_matrices = {}
+_matrices_lock = threading.Lock()
+
+def get_transit_matrix(park_name, use_zones=None):
+    key = (park_name, use_zones)
+    matrix = _matrices.get(key)
+    if matrix is None:
+        with _matrices_lock:
+            matrix = _matrices.get(key)
+            if matrix is None:
+                matrix = _matrices[key] = TransitMatrix.build(park_name, use_zones)
+    return matrix
+
 if __name__ == "__main__":
     print(f"Baron -> Python: {get_travel_time('Baron 1898', 'Python')} min")
-    print(f"Ingang -> Droomvlucht: {get_travel_time('Ingang', 'Droomvlucht')} min")
\ No newline at end of file
+    print(f"Ingang -> Droomvlucht: {get_travel_time('Ingang', 'Droomvlucht')} min")
+    for park in ["EFTELING", "PHANTASIALAND", "WALIBI_BELGIUM"]:
+        matrix = get_transit_matrix(park)
+        print(f"{park:<15} | {len(matrix.locations)} locaties | max {matrix.base_minutes.max()} min")
@@ -0,0 +1,87 @@
+import time
+import numpy as np
+from route_solver import solve_route_with_priorities
+from route_problem import problem_from_request, emit_order, INF_MIN
+
+# --- CONFIGURATIE ---
+MAX_EXACT_RIDES = 15      # 2^15 deelverzamelingen x 15 laatste ritten: nog ruim onder de seconde
+TIME_BUDGET_S = 0.5       # Daarna (of bij een lunch) neemt de greedy solver het over
+
+# --- HELD-KARP (TIJDSAFHANKELIJK) ---
+def held_karp(problem, deadline=None):
+    """
+    Dynamisch programmeren over (bezochte ritten als bitmasker, laatste rit) -> vroegste eindtijd in minuten.
+    Wachttijden hangen af van de aankomstminuut; omdat je een rij ook later mag aansluiten (best_end)
+    is 'vroeger klaar' nooit slechter en is de vroegste eindtijd per toestand genoeg voor een exact antwoord.
+    Geeft de volgorde (rit-indices) van de beste haalbare route, of None als de deadline verstreek.
+    """
+    n = problem.n
+    best_end = problem.best_end()
+    horizon = problem.horizon
+    n_masks = 1 << n
+    masks = np.arange(n_masks)
+    bits = (masks[:, None] >> np.arange(n)) & 1
+    popcount = bits.sum(axis=1)
+
+    finish = np.full((n_masks, n), INF_MIN, dtype=np.int64)
+    parent = np.full((n_masks, n), -1, dtype=np.int8)
+    first_arrival = np.minimum(problem.transit[0, 1:n + 1], horizon)
+    finish[1 << np.arange(n), np.arange(n)] = best_end[np.arange(n), first_arrival]
+
+    ride_transit = problem.ride_transit.astype(np.int64)
+    for size in range(1, n):
+        if deadline is not None and time.perf_counter() > deadline: return None
+        layer = masks[popcount == size]
+        for j in range(n):
+            source = layer[bits[layer, j] == 0]
+            if len(source) == 0: continue
+            done = finish[source]                                   # (masks, laatste rit)
+            arrival = np.minimum(done + ride_transit[:, j][None, :], horizon)
+            ends = best_end[j][arrival]
+            last = ends.argmin(axis=1)
+            finish[source | (1 << j), j] = ends[np.arange(len(source)), last]
+            parent[source | (1 << j), j] = last
+
+    # Beste eindtoestand: zoveel mogelijk must-haves, dan should-haves, dan zo vroeg mogelijk klaar
+    reachable = finish.min(axis=1) < INF_MIN
+    if not reachable.any(): return []
+    n_must = bits[:, problem.is_must].sum(axis=1)
+    value = np.where(reachable, n_must * (n + 1) + (popcount - n_must), -1)
+    candidates = np.flatnonzero(value == value.max())
+    mask = int(candidates[finish[candidates].min(axis=1).argmin()])
+    last = int(finish[mask].argmin())
+
+    order = []
+    while mask:
+        order.append(last)
+        mask, last = mask ^ (1 << last), int(parent[mask, last])
+    return order[::-1]
+
+# --- SOLVER (ZELFDE INTERFACE ALS solve_route_with_priorities) ---
+def solve_route_exact(park_name, must_haves, should_haves, start_str, end_str, start_location="Unknown", lunch_config=None, pace_factor=1.0, time_budget_s=TIME_BUDGET_S, now=None):
+    args = (park_name, must_haves, should_haves, start_str, end_str, start_location, lunch_config, pace_factor, now)
+    rides = list(dict.fromkeys(must_haves + should_haves))
+    if lunch_config or len(rides) > MAX_EXACT_RIDES: return solve_route_with_priorities(*args)
+    deadline = time.perf_counter() + time_budget_s
+    problem, closed_rides = problem_from_request(*args)
+    if problem is None: return [], closed_rides, []
+    order = held_karp(problem, deadline)
+    if order is None:
+        print(f"⏱️ Exacte solver over tijdsbudget ({time_budget_s}s), greedy neemt over.")
+        return solve_route_with_priorities(*args)
+    itinerary, skipped = emit_order(problem, order)
+    return itinerary, closed_rides, skipped
+
+if __name__ == "__main__":
+    # Vergelijk greedy en exact op een wensenlijst van 12 attracties
+    from route_solver import ATTRACTION_METADATA
+    park = "EFTELING"
+    wishlist = [r for r, m in ATTRACTION_METADATA.items() if m['park'] == park and m.get('type') not in ['Restaurant', 'Snack']][:12]
+    t0 = time.perf_counter()
+    greedy, _, g_skipped = solve_route_with_priorities(park, wishlist, [], "10:00", "18:00")
+    t1 = time.perf_counter()
+    exact, _, e_skipped = solve_route_exact(park, wishlist, [], "10:00", "18:00")
+    t2 = time.perf_counter()
+    for name, route, skipped, secs in [("Greedy", greedy, g_skipped, t1 - t0), ("Exact", exact, e_skipped, t2 - t1)]:
+        end = route[-1]['ride_end'] if route else "-"
+        print(f"{name:<7} | {len(route)} ritten, klaar om {end} | {sum(s['wait_min'] for s in route)} min wachten | {len(skipped)} overgeslagen | {secs:.2f}s")
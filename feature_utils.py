@@ -0,0 +1,93 @@
+import numpy as np
+from queuequest_meta import ATTRACTION_METADATA
+
+# --- CONFIGURATIE ---
+# Code voor categorieën die het model nooit gezien heeft (i.p.v. stilletjes klasse 0)
+UNKNOWN_CODE = -1
+
+# Encoder naam -> kolom in de trainingsdata
+ENCODED_COLUMNS = {
+    'park': 'park_name',
+    'ride': 'attraction_name',
+    'type': 'type',
+    'weather': 'weather_condition'
+}
+
+# --- ENCODING TABELLEN ---
+def build_encoding_table(classes):
+    """
+    Zet de classes_ van één LabelEncoder om in een opzoektabel.
+    'keys' is gesorteerd (voor np.searchsorted), 'codes' de bijbehorende label-codes.
+    Niet-tekst klassen (bijv. NaN voor een ontbrekende parknaam) krijgen geen sleutel.
+    """
+    pairs = sorted((str(c), code) for code, c in enumerate(classes) if isinstance(c, str))
+    keys = np.array([k for k, _ in pairs], dtype=str)
+    codes = np.array([code for _, code in pairs], dtype=np.int64)
+    return {"keys": keys, "codes": codes, "index": dict(pairs)}
+
+def build_encoding_tables(encoders):
+    """Eén tabel per encoder uit train_model.prepare_data ('park', 'ride', 'type', 'weather')."""
+    return {name: build_encoding_table(list(enc.classes_)) for name, enc in encoders.items() if enc is not None}
+
+def encode_value(table, value):
+    if table is None: return UNKNOWN_CODE
+    return table["index"].get(value, UNKNOWN_CODE)
+
+def encode_values(table, values):
+    """Vectorized encoding van een hele kolom; onbekende waarden worden UNKNOWN_CODE."""
+    values = np.asarray(values, dtype=str)
+    if table is None or len(table["keys"]) == 0:
+        return np.full(len(values), UNKNOWN_CODE, dtype=np.int64)
+    keys = table["keys"]
+    pos = np.minimum(np.searchsorted(keys, values), len(keys) - 1)
+    return np.where(keys[pos] == values, table["codes"][pos], UNKNOWN_CODE)
+
+# --- FEATURE MATRIX (ZONDER PANDAS) ---
+# Cyclische tijd-features, identiek aan train_model.prepare_data (index = uur 0-23 / isoweekday 0-7)
+HOUR_SIN = np.sin(2 * np.pi * np.arange(24) / 24)
+HOUR_COS = np.cos(2 * np.pi * np.arange(24) / 24)
+DAY_SIN = np.sin(2 * np.pi * np.arange(8) / 7)
+DAY_COS = np.cos(2 * np.pi * np.arange(8) / 7)
+
+def ride_attributes(rides):
+    """Type, capaciteit en indoor-vlag per attractie, met dezelfde defaults als prepare_data."""
+    metas = [ATTRACTION_METADATA.get(r, {}) for r in rides]
+    types = [m.get('type', 'Unknown') for m in metas]
+    capacity = np.array([m.get('capacity', 0) for m in metas], dtype=np.float32)
+    is_indoor = np.array([m.get('is_indoor', 0) for m in metas], dtype=np.float32)
+    return types, capacity, is_indoor
+
+def build_feature_matrix(features, tables, park_name, rides, days, hours, holidays, temp_c=15.0, precip_mm=0.0, weather_condition='Cloudy', out=None):
+    """
+    Schrijft de model-input voor alle (attractie, tijdstip) combinaties direct in een float32 matrix.
+    Kolommen in de volgorde van `features`, rijen ride-major: rij i * len(hours) + j = (rides[i], tijdstip j).
+    """
+    days = np.asarray(days, dtype=int)
+    hours = np.asarray(hours, dtype=int)
+    n_r, n_t, n_f = len(rides), len(hours), len(features)
+    X = out if out is not None else np.empty((n_r * n_t, n_f), dtype=np.float32)
+    view = X.reshape(n_r, n_t, n_f)
+    tables = tables or {}
+
+    types, capacity, is_indoor = ride_attributes(rides)
+    per_ride = {
+        'capacity': capacity, 'is_indoor': is_indoor,
+        'ride_encoded': encode_values(tables.get('ride'), rides),
+        'type_encoded': encode_values(tables.get('type'), types)
+    }
+    per_time = {
+        'day_of_week': days, 'hour_of_day': hours, 'is_holiday': np.asarray(holidays, dtype=int),
+        'hour_sin': HOUR_SIN[hours], 'hour_cos': HOUR_COS[hours],
+        'day_sin': DAY_SIN[days], 'day_cos': DAY_COS[days]
+    }
+    constants = {
+        'temp_c': temp_c, 'precip_mm': precip_mm,
+        'park_encoded': encode_value(tables.get('park'), park_name),
+        'weather_encoded': encode_value(tables.get('weather'), weather_condition)
+    }
+    for j, name in enumerate(features):
+        if name in per_ride: view[:, :, j] = np.asarray(per_ride[name])[:, None]
+        elif name in per_time: view[:, :, j] = per_time[name][None, :]
+        elif name in constants: view[:, :, j] = constants[name]
+        else: raise KeyError(f"Onbekende feature '{name}'")
+    return X
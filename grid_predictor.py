@@ -0,0 +1,163 @@
+import hashlib
+import json
+import os
+import numpy as np
+from queuequest_meta import ATTRACTION_METADATA
+from feature_utils import build_feature_matrix
+from predict_cache import TEMP_BUCKET_C, PRECIP_BUCKET_MM
+
+# --- CONFIGURATIE ---
+GRID_FILE = "queuequest_grid.npy"        # uint8 [ride, dag, uur, feestdag, weer-bucket] in stappen van 5 min, memory-mapped
+GRID_INDEX_FILE = "queuequest_grid.json" # Assen + model-hash + afwijking t.o.v. het volledige model
+HOLDOUT_WEATHERS = 40                     # Willekeurig weer tussen de buckets om die afwijking te meten
+GRID_TEMPS = [float(t) for t in range(-5, 36)]   # Hele graden (zelfde afronding als de MemoPredictor)
+GRID_PRECIPS = [0.0, 2.0]                         # Droog / regen (zoals weather_utils en de app rekenen)
+GRID_CONDITIONS = ['Cloudy']                      # De conditie die de app altijd meestuurt
+DAYS = np.arange(1, 8)
+HOURS = np.arange(24)
+
+def grid_rides():
+    """Alle attracties (geen eten) van alle parken; de index in deze lijst is de ride-as van het grid."""
+    return [r for r, m in ATTRACTION_METADATA.items() if m.get('type') not in ['Restaurant', 'Snack']]
+
+def weather_buckets():
+    return [(t, p, c) for c in GRID_CONDITIONS for p in GRID_PRECIPS for t in GRID_TEMPS]
+
+def bucket_key(temp_c, precip_mm, condition):
+    """Dezelfde afronding als predict_cache.bucket_weather, zodat grid en memo hetzelfde antwoorden."""
+    return (float(np.round(temp_c / TEMP_BUCKET_C) * TEMP_BUCKET_C), float(np.round(precip_mm / PRECIP_BUCKET_MM) * PRECIP_BUCKET_MM), condition)
+
+def file_sha1(path):
+    digest = hashlib.sha1()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1 << 20), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+# --- EXPORT ---
+def export_grid(pipeline, model_file, out_dir="."):
+    """
+    Evalueert de booster één keer over het hele grid en schrijft het als uint8 .npy + JSON index.
+    Elke cel is round(max(0, voorspelling) / 5): precies wat de app na afronden op 5 min gebruikt.
+    Geeft de index terug, met max_deviation_min (zie holdout_deviation) en rounding_deviation_min
+    (alleen de afrondingsfout op de bucket-waarden zelf, altijd < 2.5).
+    """
+    rides = grid_rides()
+    buckets = weather_buckets()
+    predict = pipeline["predictor"].predict_fn
+    days, hours = np.repeat(DAYS, 24), np.tile(HOURS, 7)
+    grid = np.empty((len(rides), 7, 24, 2, len(buckets)), dtype=np.uint8)
+    rounding_dev = 0.0
+
+    for holiday in (0, 1):
+        holidays = np.full(len(days), holiday)
+        for b, (temp, precip, cond) in enumerate(buckets):
+            full = np.empty((len(rides), len(days)), dtype=np.float32)
+            for park in {ATTRACTION_METADATA[r]['park'] for r in rides}:
+                idx = [i for i, r in enumerate(rides) if ATTRACTION_METADATA[r]['park'] == park]
+                X = build_feature_matrix(pipeline["features"], pipeline["encoding_tables"], park, [rides[i] for i in idx], days, hours, holidays, temp, precip, cond)
+                full[idx] = np.asarray(predict(X), dtype=np.float32).reshape(len(idx), len(days))
+            clamped = np.maximum(full, 0)
+            steps = np.minimum(np.round(clamped / 5), 255)
+            grid[:, :, :, holiday, b] = steps.astype(np.uint8).reshape(len(rides), 7, 24)
+            rounding_dev = max(rounding_dev, float(np.abs(5 * steps - clamped).max()))
+
+    np.save(os.path.join(out_dir, GRID_FILE), grid)
+    index = {
+        "rides": rides, "weather_buckets": buckets,
+        "model_sha1": file_sha1(model_file),
+        "max_deviation_min": holdout_deviation(pipeline, grid, rides, buckets),
+        "rounding_deviation_min": rounding_dev, "cells": int(grid.size)
+    }
+    with open(os.path.join(out_dir, GRID_INDEX_FILE), "w", encoding="utf-8") as f:
+        json.dump(index, f, ensure_ascii=False)
+    return index
+
+def holdout_deviation(pipeline, grid, rides, buckets, n_weathers=HOLDOUT_WEATHERS, seed=0):
+    """
+    Max. |grid - model| in minuten op weer dat niet op een bucket ligt maar er wel naar afgerond wordt
+    (bijv. 17.3 °C en 0.2 mm -> bucket 17 °C / droog): de fout die een grid-lookup in de app echt maakt.
+    Per willekeurige weerwaarde alle ritten x dagen x uren, met een willekeurige feestdag-vlag.
+    """
+    rng = np.random.default_rng(seed)
+    predict = pipeline["predictor"].predict_fn
+    bucket_index = {tuple(b): i for i, b in enumerate(buckets)}
+    days, hours = np.repeat(DAYS, 24), np.tile(HOURS, 7)
+    worst = 0.0
+    for _ in range(n_weathers):
+        temp = float(rng.uniform(GRID_TEMPS[0] - TEMP_BUCKET_C / 2, GRID_TEMPS[-1] + TEMP_BUCKET_C / 2))
+        precip = max(0.0, float(rng.choice(GRID_PRECIPS) + rng.uniform(-PRECIP_BUCKET_MM / 2, PRECIP_BUCKET_MM / 2)))
+        cond = str(rng.choice(GRID_CONDITIONS))
+        b = bucket_index.get(bucket_key(temp, precip, cond))
+        if b is None: continue
+        holiday = int(rng.integers(2))
+        for park in {ATTRACTION_METADATA[r]['park'] for r in rides}:
+            idx = [i for i, r in enumerate(rides) if ATTRACTION_METADATA[r]['park'] == park]
+            X = build_feature_matrix(pipeline["features"], pipeline["encoding_tables"], park, [rides[i] for i in idx], days, hours, np.full(len(days), holiday), temp, precip, cond)
+            model = np.maximum(np.asarray(predict(X), dtype=np.float32).reshape(len(idx), len(days)), 0)
+            looked_up = 5 * grid[idx, :, :, holiday, b].reshape(len(idx), len(days)).astype(np.float32)
+            worst = max(worst, float(np.abs(looked_up - model).max()))
+    return worst
+
+# --- RUNTIME ---
+class GridPredictor:
+    """
+    Beantwoordt voorspellingen met één array-index in het voorberekende grid.
+    Attracties of weer buiten het grid gaan naar `fallback` (het volledige model).
+    """
+
+    def __init__(self, grid, rides, buckets, fallback=None, max_deviation=None):
+        self.grid = grid
+        self.ride_index = {r: i for i, r in enumerate(rides)}
+        self.bucket_index = {tuple(b): i for i, b in enumerate(buckets)}
+        self.fallback = fallback
+        self.max_deviation = max_deviation
+        self.grid_hits = 0
+        self.fallback_rows = 0
+
+    @classmethod
+    def load(cls, model_file, grid_dir=".", fallback=None):
+        """Laadt het grid als memory-map, of None als het ontbreekt of bij een ander model hoort."""
+        try:
+            with open(os.path.join(grid_dir, GRID_INDEX_FILE), encoding="utf-8") as f:
+                index = json.load(f)
+            if index.get("model_sha1") != file_sha1(model_file):
+                print("⚠️ Grid hoort bij een ander model; wordt genegeerd.")
+                return None
+            grid = np.load(os.path.join(grid_dir, GRID_FILE), mmap_mode="r")
+        except FileNotFoundError:
+            return None
+        return cls(grid, index["rides"], index["weather_buckets"], fallback, index.get("max_deviation_min"))
+
+    def predict(self, park_name, rides, days, hours, holidays, temp_c=15.0, precip_mm=0.0, weather_condition='Cloudy'):
+        """Voorspellingen met vorm (len(rides), len(hours)); uit het grid al afgerond op 5 min."""
+        days = np.asarray(days, dtype=int)
+        hours = np.asarray(hours, dtype=int)
+        holidays = np.asarray(holidays, dtype=int)
+        b = self.bucket_index.get(bucket_key(temp_c, precip_mm, weather_condition))
+        rows = np.array([self.ride_index.get(r, -1) if ATTRACTION_METADATA.get(r, {}).get('park') == park_name else -1 for r in rides], dtype=int)
+        on_grid = rows >= 0 if b is not None else np.zeros(len(rides), dtype=bool)
+
+        out = np.empty((len(rides), len(hours)), dtype=np.float32)
+        if on_grid.any():
+            out[on_grid] = 5 * self.grid[rows[on_grid][:, None], days[None, :] - 1, hours[None, :], holidays[None, :], b].astype(np.float32)
+            self.grid_hits += int(on_grid.sum()) * len(hours)
+        if not on_grid.all():
+            if self.fallback is None: raise KeyError("Query buiten het grid en geen fallback-model")
+            off = [r for r, ok in zip(rides, on_grid) if not ok]
+            out[~on_grid] = self.fallback(park_name, off, days, hours, holidays, temp_c, precip_mm, weather_condition)
+            self.fallback_rows += len(off) * len(hours)
+        return out
+
+if __name__ == "__main__":
+    # Exporteer het grid voor het huidige model (in de registry-map van de actieve versie)
+    import time
+    import model_store
+    pipeline = model_store.get_pipeline()
+    version = model_store.get_version()
+    out_dir = os.path.join(model_store.REGISTRY_DIR, version) if version else "."
+    model_file = os.path.join(out_dir, model_store.MODEL_FILE)
+    t0 = time.perf_counter()
+    index = export_grid(pipeline, model_file, out_dir)
+    print(f"✅ Grid geëxporteerd naar '{out_dir}': {index['cells']} cellen in {time.perf_counter() - t0:.1f}s")
+    print(f"   Max. afwijking t.o.v. het model bij weer tussen de buckets: {index['max_deviation_min']:.2f} min (afronding alleen: {index['rounding_deviation_min']:.2f} min)")
@@ -0,0 +1,138 @@
+import asyncio
+import os
+import random
+import threading
+import httpx
+
+# --- CONFIGURATIE ---
+MAX_CONNECTIONS = 10
+MAX_KEEPALIVE = 5
+PER_HOST_LIMIT = 3          # Eén trage host (bijv. queue-times) mag niet de hele pool bezetten
+TIMEOUT_S = 5.0
+RETRIES = 2
+BACKOFF_BASE_S = 0.25       # Exponentieel met volledige jitter: uniform(0, min(max, base * 2^poging))
+BACKOFF_MAX_S = 4.0
+RETRY_STATUS = {429, 500, 502, 503, 504}
+
+class AsyncHttpClient:
+    """
+    Eén gedeelde httpx.AsyncClient (connection pool + keep-alive) op een eigen event loop-thread, zodat zowel
+    async code als gewone threads (Streamlit, de live poller) hem kunnen gebruiken. Per host een limiet op het
+    aantal gelijktijdige requests, revalidatie met ETag / Last-Modified (304 = vorige body) en retries met jitter.
+    """
+
+    def __init__(self, max_connections=MAX_CONNECTIONS, max_keepalive=MAX_KEEPALIVE, per_host=PER_HOST_LIMIT, retries=RETRIES):
+        self.limits = httpx.Limits(max_connections=max_connections, max_keepalive_connections=max_keepalive)
+        self.per_host = per_host
+        self.retries = retries
+        self._client = None
+        self._loop = None
+        self._pid = None
+        self._host_limits = {}
+        self._validators = {}       # url -> (etag, last_modified, json body)
+        self._lock = threading.Lock()
+        self.stats = {"requests": 0, "not_modified": 0, "retries": 0, "errors": 0}
+
+    def _ensure_loop(self):
+        with self._lock:
+            # Na een fork bestaat de loop-thread niet meer: opnieuw opbouwen
+            if self._loop is None or self._pid != os.getpid():
+                self._loop = asyncio.new_event_loop()
+                self._client, self._host_limits, self._pid = None, {}, os.getpid()
+                threading.Thread(target=self._loop.run_forever, name="http-client", daemon=True).start()
+            return self._loop
+
+    def run(self, coro):
+        """Voert een coroutine uit op de loop van de client en wacht op het resultaat (vanuit gewone threads)."""
+        timeout = (TIMEOUT_S + BACKOFF_MAX_S) * (self.retries + 1) + 1
+        return asyncio.run_coroutine_threadsafe(coro, self._ensure_loop()).result(timeout)
+
+    async def get_json(self, url, headers=None, timeout=TIMEOUT_S, retries=None):
+        """
+        GET + JSON. Geeft de body (bij 304 de vorige), of None als het na alle pogingen niet lukt.
+        `retries` overschrijft die van de client (0 = één poging, voor aanroepen waar de gebruiker op wacht).
+        """
+        if self._client is None:
+            self._client = httpx.AsyncClient(limits=self.limits, timeout=TIMEOUT_S, follow_redirects=True)
+        host = httpx.URL(url).host
+        if host not in self._host_limits: self._host_limits[host] = asyncio.Semaphore(self.per_host)
+        request_headers = dict(headers or {})
+        cached = self._validators.get(url)
+        if cached:
+            if cached[0]: request_headers['If-None-Match'] = cached[0]
+            if cached[1]: request_headers['If-Modified-Since'] = cached[1]
+
+        error = None
+        for attempt in range((self.retries if retries is None else retries) + 1):
+            if attempt:
+                self.stats["retries"] += 1
+                await asyncio.sleep(random.uniform(0, min(BACKOFF_MAX_S, BACKOFF_BASE_S * 2 ** attempt)))
+            try:
+                async with self._host_limits[host]:
+                    self.stats["requests"] += 1
+                    resp = await self._client.get(url, headers=request_headers, timeout=timeout)
+                if resp.status_code == 304 and cached:
+                    self.stats["not_modified"] += 1
+                    return cached[2]
+                if resp.status_code == 200:
+                    body = resp.json()
+                    etag, modified = resp.headers.get('ETag'), resp.headers.get('Last-Modified')
+                    if etag or modified: self._validators[url] = (etag, modified, body)
+                    return body
+                error = f"status {resp.status_code}"
+                if resp.status_code not in RETRY_STATUS: break
+            except (httpx.TransportError, ValueError) as e:
+                error = e
+        self.stats["errors"] += 1
+        print(f"❌ HTTP Fout ({url}): {error}")
+        return None
+
+    def fetch_json(self, url, headers=None, timeout=TIMEOUT_S, retries=None):
+        return self.run(self.get_json(url, headers, timeout, retries))
+
+    def fetch_many(self, calls):
+        """[(url, headers), ...] tegelijk; geeft de bodies (of None) in dezelfde volgorde."""
+        async def gather():
+            return await asyncio.gather(*(self.get_json(url, headers) for url, headers in calls))
+        return self.run(gather())
+
+    def close(self):
+        if self._client is not None and self._loop is not None:
+            self.run(self._client.aclose())
+            self._client = None
+
+HTTP = AsyncHttpClient()
+
+if __name__ == "__main__":
+    # Lokale server met ETag en af en toe een 503: revalidatie, retries en per-host limiet
+    import json
+    import time
+    from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+    active, peak, calls = [0], [0], [0]
+
+    class StandIn(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+        def do_GET(self):
+            calls[0] += 1
+            active[0] += 1; peak[0] = max(peak[0], active[0])
+            time.sleep(0.1)
+            active[0] -= 1
+            if calls[0] == 1:
+                self.send_response(503); self.send_header("Content-Length", "0"); self.end_headers(); return
+            if self.headers.get("If-None-Match") == '"v1"':
+                self.send_response(304); self.send_header("Content-Length", "0"); self.end_headers(); return
+            body = json.dumps({"path": self.path}).encode()
+            self.send_response(200); self.send_header("ETag", '"v1"'); self.send_header("Content-Length", str(len(body))); self.end_headers()
+            self.wfile.write(body)
+        def log_message(self, *args): pass
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), StandIn)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    base = f"http://127.0.0.1:{server.server_port}"
+    print("Eerste request (503, dan retry):", HTTP.fetch_json(f"{base}/a"))
+    print("Tweede request (304):", HTTP.fetch_json(f"{base}/a"))
+    t0 = time.perf_counter()
+    bodies = HTTP.fetch_many([(f"{base}/park/{i}", None) for i in range(9)])
+    print(f"9 tegelijk in {time.perf_counter() - t0:.2f}s, max {peak[0]} gelijktijdig (limiet {PER_HOST_LIMIT}) | {HTTP.stats}")
+    HTTP.close()
+    server.shutdown()
@@ -0,0 +1,210 @@
+import os
+import threading
+import time
+import numpy as np
+from http_client import HTTP
+from ride_resolver import RideResolver
+from wait_history import WAIT_HISTORY
+
+# --- CONFIGURATIE ---
+LIVE_BASE_URL = os.environ.get("QUEUEQUEST_LIVE_URL", "https://queue-times.com")   # Te vervangen door een lokale test-server
+POLL_INTERVAL_S = 300
+REQUEST_TIMEOUT_S = 5
+HEADERS = {'User-Agent': 'Mozilla/5.0 (QueueQuestBot/2.0)', 'Accept': 'application/json'}
+PARK_IDS = {"EFTELING": 160, "PHANTASIALAND": 56, "WALIBI_BELGIUM": 14}
+
+# API Mappings
+API_NAME_MAPPING = {
+    "Fairytale Forest": "Sprookjesbos", "The Six Swans": "De Zes Zwanen",
+    "Stoomtrein Marerijk": "Stoomtrein", "Stoomtrein Ruigrijk": "Stoomtrein",
+    "Max & Moritz": "Max & Moritz", "Symbolica: Paleis der Fantasie": "Symbolica",
+    "Black Mamba ": "Black Mamba", "Taron ": "Taron",
+    "Cobra": "Cobra", "Pulsar": "Pulsar"
+}
+
+# --- 1. OPHALEN & PARSEN ---
+_resolvers = {}
+_resolvers_lock = threading.Lock()
+
+def resolver_for(park_name):
+    """De RideResolver van een park (één keer opgebouwd, daarna met de cache van upstream ids)."""
+    with _resolvers_lock:
+        if park_name not in _resolvers: _resolvers[park_name] = RideResolver(park_name, API_NAME_MAPPING)
+        return _resolvers[park_name]
+
+def parse_queue_times(data, park_name):
+    """queue_times.json -> {attractie: {"is_open", "wait_time"}} met onze eigen attractienamen."""
+    resolver = resolver_for(park_name)
+    return resolver.to_rides(resolver.parse(data))
+
+def park_url(park_name, base_url=LIVE_BASE_URL):
+    return f"{base_url}/parks/{PARK_IDS[park_name]}/queue_times.json"
+
+def fetch_parks(parks, base_url=LIVE_BASE_URL):
+    """
+    Alle parken tegelijk via de gedeelde HTTP-client (pool, ETag-revalidatie, retries). Geeft {park: snapshot-array}
+    (zie RideResolver.parse), met None voor een park dat mislukte (de vorige snapshot blijft dan staan).
+    """
+    parks = [p for p in parks if p in PARK_IDS]
+    bodies = HTTP.fetch_many([(park_url(p, base_url), HEADERS) for p in parks])
+    return {p: (resolver_for(p).parse(body) if body is not None else None) for p, body in zip(parks, bodies)}
+
+# --- 2. SNAPSHOT STORE ---
+class Snapshot:
+    """
+    Live data van één park; `version` gaat alleen omhoog als de inhoud echt veranderd is. `waits` is de meting
+    als int16-array in de rit-volgorde van het park (= de rijen van WaitForecast, zie RideResolver.parse).
+    """
+    __slots__ = ("park_name", "version", "fetched_at", "waits", "_rides")
+
+    def __init__(self, park_name, version, fetched_at, waits, rides=None):
+        self.park_name = park_name
+        self.version = version
+        self.fetched_at = fetched_at
+        self.waits = waits
+        self._rides = rides
+
+    @property
+    def rides(self):
+        """Dezelfde data als dict per naam voor de planners; pas bij het eerste gebruik opgebouwd (niet per poll)."""
+        if self._rides is None: self._rides = resolver_for(self.park_name).to_rides(self.waits)
+        return self._rides
+
+class SnapshotStore:
+    """
+    In-process store met de laatste snapshot per park. Lezen raakt nooit het netwerk; refresh_many(parks) haalt de
+    parken tegelijk op, en gelijktijdige refreshes van hetzelfde park wachten op dat ene request (single-flight).
+    """
+
+    def __init__(self, base_url=LIVE_BASE_URL):
+        self.base_url = base_url
+        self._snapshots = {}
+        self._inflight = {}
+        self._lock = threading.Lock()
+        self._listeners = []
+        self.fetches = 0
+
+    def get(self, park_name):
+        return self._snapshots.get(park_name)
+
+    def rides(self, park_name):
+        snapshot = self._snapshots.get(park_name)
+        return snapshot.rides if snapshot else {}
+
+    def put(self, park_name, rides=None, waits=None):
+        """Nieuwe meting: `waits` (snapshot-array, zoals de poller) of anders `rides` als dict (tests, handmatig)."""
+        if waits is None: waits = resolver_for(park_name).encode(rides)
+        with self._lock:
+            old = self._snapshots.get(park_name)
+            version = old.version if old is not None and np.array_equal(old.waits, waits) else (old.version + 1 if old else 1)
+            snapshot = self._snapshots[park_name] = Snapshot(park_name, version, time.time(), waits, rides)
+        for callback in list(self._listeners):
+            try: callback(snapshot)
+            except Exception as e: print(f"❌ Snapshot listener Fout ({park_name}): {e}")
+        return snapshot
+
+    def subscribe(self, callback):
+        """callback(snapshot) na elke geslaagde meting, ook als de inhoud gelijk bleef."""
+        self._listeners.append(callback)
+
+    def refresh(self, park_name):
+        """Haalt het park nu op (of wacht op een request dat al loopt) en geeft de nieuwste snapshot."""
+        return self.refresh_many([park_name])[park_name]
+
+    def refresh_many(self, parks):
+        """
+        Haalt de parken tegelijk op. Voor een park waarvoor al een request loopt wordt geen tweede gestart:
+        we wachten op het lopende (single-flight). Geeft {park: nieuwste snapshot of None}.
+        """
+        own, others = {}, []
+        with self._lock:
+            for park in parks:
+                if park in self._inflight: others.append(self._inflight[park])
+                else: own[park] = self._inflight[park] = threading.Event()
+        try:
+            if own:
+                self.fetches += len(own)
+                for park, waits in fetch_parks(list(own), self.base_url).items():
+                    if waits is not None: self.put(park, waits=waits)
+        finally:
+            with self._lock:
+                for park in own:
+                    del self._inflight[park]
+            for done in own.values():
+                done.set()
+        for done in others:
+            done.wait(REQUEST_TIMEOUT_S * 2)
+        return {park: self.get(park) for park in parks}
+
+# --- 3. ACHTERGROND POLLER ---
+class LivePoller:
+    """
+    Eén daemon-thread die alle parken om de `interval_s` seconden ververst. Elke geslaagde meting gaat ook naar
+    `history` (een WaitHistory, None = niet bewaren), ook als de inhoud gelijk bleef: dat is ook een meetpunt.
+    """
+
+    def __init__(self, store, parks=None, interval_s=POLL_INTERVAL_S, history=None):
+        self.store = store
+        self.parks = list(parks or PARK_IDS)
+        self.interval_s = interval_s
+        self.history = history
+        self._recorded = {}
+        self._stop = threading.Event()
+        self._thread = None
+
+    def poll_once(self):
+        snapshots = self.store.refresh_many(self.parks)
+        if self.history is None: return
+        for park, snapshot in snapshots.items():
+            # Mislukte fetch = nog de oude snapshot: die is al weggeschreven
+            if snapshot is None or snapshot.fetched_at <= self._recorded.get(park, 0): continue
+            try:
+                self.history.append_waits(park, snapshot.fetched_at, resolver_for(park).rides, snapshot.waits)
+                self._recorded[park] = snapshot.fetched_at
+            except OSError as e:
+                print(f"❌ Historiek Fout ({park}): {e}")
+
+    def _run(self):
+        while not self._stop.is_set():
+            self.poll_once()
+            self._stop.wait(self.interval_s)
+
+    def start(self):
+        if self.running: return self
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="live-poller", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._stop.set()
+        if self._thread is not None: self._thread.join(timeout=REQUEST_TIMEOUT_S * 2)
+
+    @property
+    def running(self):
+        return self._thread is not None and self._thread.is_alive()
+
+LIVE_STORE = SnapshotStore()
+_poller = None
+_poller_lock = threading.Lock()
+
+def ensure_poller():
+    """Start de poller één keer per proces (bij het eerste gebruik, niet bij het importeren)."""
+    global _poller
+    with _poller_lock:
+        if _poller is None: _poller = LivePoller(LIVE_STORE, history=WAIT_HISTORY).start()
+    return _poller
+
+def on_snapshot(callback):
+    """Registreert callback(snapshot) die na elke nieuwe meting van LIVE_STORE wordt aangeroepen."""
+    LIVE_STORE.subscribe(callback)
+
+def live_snapshot(park_name):
+    """Laatste snapshot van een park (of None zolang er nog geen is); nooit via het netwerk."""
+    ensure_poller()
+    return LIVE_STORE.get(park_name)
+
+def refresh_park(park_name):
+    """Refresh-knop: alleen dit park, nu, en gedeeld met andere sessies die tegelijk op refresh drukken."""
+    snapshot = LIVE_STORE.refresh(park_name)
+    return snapshot.rides if snapshot else {}
@@ -0,0 +1,132 @@
+import math
+import random
+import time
+from route_problem import problem_from_request, emit_order, INF_MIN
+
+# --- CONFIGURATIE ---
+TIME_BUDGET_S = 0.3
+START_TEMP = 30.0          # Simulated annealing: in het begin mag een zet ~30 min slechter uitpakken
+END_TEMP = 0.5
+RIDE_BONUS = 10_000        # Eén rit extra weegt zwaarder dan elke tijdwinst (een dag heeft < 10.000 minuten)
+MUST_BONUS = 1_000_000     # En een must-have zwaarder dan elke andere rit
+
+class OrderEvaluator:
+    """
+    Rekent een volgorde van rit-ids door met exact de regels van route_problem.emit_order, maar met gewone
+    Python lijsten (geen numpy scalars) en vanaf een opgeslagen tussenstand: tienduizenden volgordes per seconde.
+    Kosten = eindtijd - ritten * RIDE_BONUS - must-haves * MUST_BONUS (lager is beter).
+    """
+
+    def __init__(self, problem):
+        self.horizon = problem.horizon
+        self.transit = problem.transit.tolist()
+        self.best_end = problem.best_end().tolist()
+        self.is_must = [bool(m) for m in problem.is_must]
+        self.lunch = problem.lunch
+        self.evaluations = 0
+
+    def root(self):
+        return (0, 0, False, 0, 0)   # klok, locatie, lunch gehad, ritten, must-haves
+
+    def run(self, order, start=0, state=None, prefix=None):
+        """Kosten van `order`, beginnend bij positie `start` met tussenstand `state`; vult optioneel `prefix` aan."""
+        self.evaluations += 1
+        clock, loc, lunch_done, rides, musts = state or self.root()
+        horizon, transit, best_end, lunch = self.horizon, self.transit, self.best_end, self.lunch
+        for ride in order[start:]:
+            if prefix is not None: prefix.append((clock, loc, lunch_done, rides, musts))
+            if clock >= horizon: continue
+            if lunch and not lunch_done and clock >= lunch['minute']:
+                clock, loc, lunch_done = clock + transit[loc][lunch['loc']] + lunch['duration'], lunch['loc'], True
+                if clock >= horizon: continue
+            arrival = clock + transit[loc][ride + 1]
+            end = best_end[ride][arrival if arrival < horizon else horizon]
+            if end >= INF_MIN: continue
+            clock, loc = end, ride + 1
+            rides += 1
+            musts += self.is_must[ride]
+        return clock - rides * RIDE_BONUS - musts * MUST_BONUS
+
+# --- BUURTEN (alleen posities >= lo veranderen) ---
+def two_opt(order, rng, lo=0):
+    i, j = sorted(rng.sample(range(lo, len(order) + 1), 2))
+    return order[:i] + order[i:j][::-1] + order[j:], i
+
+def or_opt(order, rng, lo=0):
+    length = rng.randint(1, min(3, len(order) - lo - 1))
+    i = rng.randrange(lo, len(order) - length + 1)
+    segment, rest = order[i:i + length], order[:i] + order[i + length:]
+    k = rng.randrange(lo, len(rest) + 1)
+    return rest[:k] + segment + rest[k:], min(i, k)
+
+def swap(order, rng, lo=0):
+    i, j = sorted(rng.sample(range(lo, len(order)), 2))
+    new = list(order)
+    new[i], new[j] = new[j], new[i]
+    return new, i
+
+MOVES = (two_opt, or_opt, swap)
+
+def improve_order(problem, order, time_budget_s=TIME_BUDGET_S, seed=0, fixed=0):
+    """
+    Simulated annealing met 2-opt, or-opt en swaps tot het tijdsbudget op is; de eerste `fixed` ritten blijven staan.
+    Geeft (beste volgorde, statistieken); de beste volgorde is nooit slechter dan de startvolgorde.
+    """
+    evaluator = OrderEvaluator(problem)
+    rng = random.Random(seed)
+    current = list(order)
+    prefix = []
+    current_cost = evaluator.run(current, prefix=prefix)
+    best, best_cost, start_cost = list(current), current_cost, current_cost
+    t_start = time.perf_counter()
+    deadline = t_start + time_budget_s
+    accepted = 0
+
+    while len(current) - fixed > 1:
+        now = time.perf_counter()
+        if now > deadline: break
+        temp = START_TEMP * (END_TEMP / START_TEMP) ** ((now - t_start) / time_budget_s)
+        for _ in range(200):   # klok niet bij elke zet uitlezen
+            candidate, first = rng.choice(MOVES)(current, rng, fixed)
+            cost = evaluator.run(candidate, first, prefix[first])
+            delta = cost - current_cost
+            if delta <= 0 or rng.random() < math.exp(-delta / temp):
+                current, current_cost = candidate, cost
+                # Tussenstanden vanaf de eerste gewijzigde positie opnieuw opbouwen
+                state = prefix[first]
+                del prefix[first:]
+                evaluator.run(current, first, state, prefix)
+                accepted += 1
+                if cost < best_cost: best, best_cost = list(current), cost
+
+    elapsed = time.perf_counter() - t_start
+    return best, {
+        "evaluations": evaluator.evaluations, "per_second": int(evaluator.evaluations / elapsed) if elapsed else 0,
+        "accepted": accepted, "start_cost": start_cost, "best_cost": best_cost
+    }
+
+def improve_route(park_name, route, must_haves, should_haves, start_str, end_str, start_location="Unknown", lunch_config=None, pace_factor=1.0, time_budget_s=TIME_BUDGET_S, seed=0, now=None):
+    """
+    Verbetert een itinerary van een van de solvers (zelfde aanvraag-parameters). Overgeslagen ritten gaan
+    achteraan mee, zodat de zoektocht ze alsnog kan inpassen. Geeft (itinerary, overgeslagen, statistieken).
+    """
+    problem, closed_rides = problem_from_request(park_name, must_haves, should_haves, start_str, end_str, start_location, lunch_config, pace_factor, now)
+    if problem is None: return route, [], {}
+    index = {r: i for i, r in enumerate(problem.rides)}
+    order = [index[step['ride']] for step in route if step['ride'] in index]
+    order += [i for i in range(problem.n) if i not in order]
+    best, stats = improve_order(problem, order, time_budget_s, seed)
+    itinerary, skipped = emit_order(problem, best)
+    return itinerary, skipped, stats
+
+if __name__ == "__main__":
+    # Greedy route van een drukke dag, daarna 0.3s local search
+    from queuequest_meta import ATTRACTION_METADATA
+    from route_solver import solve_route_with_priorities
+    park = "EFTELING"
+    wishlist = [r for r, m in ATTRACTION_METADATA.items() if m['park'] == park and m.get('type') not in ['Restaurant', 'Snack']]
+    route, _, skipped = solve_route_with_priorities(park, wishlist, [], "10:00", "16:00")
+    better, better_skipped, stats = improve_route(park, route, wishlist, [], "10:00", "16:00")
+    for name, r, s in [("Greedy", route, skipped), ("Local search", better, better_skipped)]:
+        print(f"{name:<13} | {len(r)} ritten, klaar om {r[-1]['ride_end'] if r else '-'} | {len(s)} overgeslagen")
+    print(f"{stats['evaluations']} volgordes geëvalueerd ({stats['per_second']}/s), {stats['accepted']} zetten geaccepteerd")
@@ -0,0 +1,228 @@
+import datetime
+import hashlib
+import json
+import os
+import shutil
+import threading
+import time
+import numpy as np
+from feature_utils import build_encoding_tables, build_encoding_table, build_feature_matrix
+from predict_cache import MemoPredictor, booster_predict_fn
+from queuequest_meta import ATTRACTION_METADATA
+from grid_predictor import GridPredictor
+
+# --- CONFIGURATIE ---
+MODEL_FILE = "queuequest_model.ubj"          # Booster in XGBoost's eigen (UBJSON) formaat
+SIDECAR_FILE = "queuequest_model.json"       # Features + encoder klassen
+LEGACY_MODEL_FILE = "queuequest_model.pkl"   # Oude joblib pipeline (fallback)
+FORMAT_VERSION = 1
+REGISTRY_DIR = "model_registry"              # Eén submap per versie (v0001, v0002, ...) + CURRENT
+CURRENT_FILE = "CURRENT"
+META_FILE = "meta.json"
+CHECK_INTERVAL_S = 5.0                       # Hoe vaak een draaiende app naar een nieuwe versie kijkt
+PARKS = ["EFTELING", "PHANTASIALAND", "WALIBI_BELGIUM"]
+FINGERPRINT_WEATHER = (15.0, 0.0, 'Cloudy')   # = het standaardweer van predict_grid (forecasts zonder weer)
+
+_lock = threading.Lock()
+_pipeline = None
+_loaded = False
+_version = None
+_last_check = 0.0
+_listeners = []
+
+# --- OPSLAAN ---
+def save_pipeline(model, encoders, features, model_file=MODEL_FILE, sidecar_file=SIDECAR_FILE):
+    """Slaat de booster op als UBJSON en de encoders/features als kleine JSON sidecar."""
+    booster = model.get_booster() if hasattr(model, 'get_booster') else model
+    booster.save_model(model_file)
+    sidecar = {
+        "format_version": FORMAT_VERSION,
+        "features": list(features),
+        # NaN (ontbrekende parknaam) wordt null, zodat de label-codes op hun plek blijven
+        "encoder_classes": {name: [c if isinstance(c, str) else None for c in enc.classes_] for name, enc in encoders.items()}
+    }
+    with open(sidecar_file, "w", encoding="utf-8") as f:
+        json.dump(sidecar, f, ensure_ascii=False, indent=1)
+
+# --- LADEN (LAZY, ÉÉN KEER PER PROCES) ---
+def _load_native(model_file, sidecar_file):
+    import xgboost as xgb
+    with open(sidecar_file, encoding="utf-8") as f:
+        sidecar = json.load(f)
+    booster = xgb.Booster()
+    booster.load_model(model_file)
+    return {
+        "model": booster,
+        "features": sidecar["features"],
+        "encoding_tables": {name: build_encoding_table(classes) for name, classes in sidecar["encoder_classes"].items()}
+    }
+
+def _load_legacy(legacy_file):
+    import joblib
+    pipeline = joblib.load(legacy_file)
+    return {
+        "model": pipeline["model"],
+        "features": pipeline["features"],
+        "encoding_tables": pipeline.get("encoding_tables") or build_encoding_tables(pipeline["encoders"])
+    }
+
+def load_pipeline(model_file=MODEL_FILE, sidecar_file=SIDECAR_FILE, legacy_file=LEGACY_MODEL_FILE):
+    """Laadt het native formaat; valt terug op de oude .pkl. Geeft None als er geen model is."""
+    try:
+        return _load_native(model_file, sidecar_file)
+    except FileNotFoundError:
+        pass
+    try:
+        return _load_legacy(legacy_file)
+    except FileNotFoundError:
+        print(f"⚠️ Geen model gevonden ('{model_file}' of '{legacy_file}'). Fallback naar heuristiek.")
+    return None
+
+def get_pipeline():
+    """De pipeline van dit proces (model, features, encoding_tables, predictor), pas geladen bij eerste gebruik."""
+    global _pipeline, _loaded, _version
+    if _loaded: return _pipeline
+    with _lock:
+        if not _loaded:
+            version = current_version()
+            try:
+                pipeline = load_version(version) if version else load_pipeline()
+                if pipeline: _attach_predictors(pipeline, version)
+            except Exception as e:
+                print(f"⚠️ WAARSCHUWING: Model niet geladen. Fallback naar heuristiek. Fout: {e}")
+                pipeline, version = None, None
+            _pipeline, _version, _loaded = pipeline, version, True
+    return _pipeline
+
+def get_version():
+    return _version
+
+def _attach_predictors(pipeline, version):
+    """Memo-predictor voor het volledige model, plus het lookup-grid als dat voor dit model geëxporteerd is."""
+    predictor = MemoPredictor(pipeline["model"], pipeline["features"])
+    pipeline["predictor"] = predictor
+
+    def full_model(park_name, rides, days, hours, holidays, temp_c, precip_mm, weather_condition):
+        X = build_feature_matrix(pipeline["features"], pipeline["encoding_tables"], park_name, rides, days, hours, holidays, temp_c, precip_mm, weather_condition)
+        return predictor.predict(X).reshape(len(rides), len(hours))
+
+    model_dir = os.path.join(REGISTRY_DIR, version) if version else "."
+    pipeline["grid"] = GridPredictor.load(os.path.join(model_dir, MODEL_FILE), model_dir, fallback=full_model)
+    return pipeline
+
+# --- MODEL REGISTRY (VERSIES + ATOMISCHE HOT-SWAP) ---
+def forecast_fingerprints(model, tables, features):
+    """
+    Hash per park van alle forecasts zonder weer: elke (attractie, dag, uur, vakantie) bij FINGERPRINT_WEATHER,
+    afgerond op 5 min zoals predict_grid. Gelijke hash = die forecasts zijn exact gelijk; voor ander weer en de
+    ruwe (onafgeronde) voorspellingen zegt hij niets.
+    """
+    predict = booster_predict_fn(model)
+    days, hours = np.repeat(np.arange(1, 8), 48), np.tile(np.arange(24), 14)
+    holidays = np.tile(np.repeat([0, 1], 24), 7)
+    temp, precip, cond = FINGERPRINT_WEATHER
+    prints = {}
+    for park in PARKS:
+        rides = [r for r, m in ATTRACTION_METADATA.items() if m.get('park') == park]
+        X = build_feature_matrix(features, tables, park, rides, days, hours, holidays, temp, precip, cond)
+        rounded = (5 * np.round(np.maximum(np.asarray(predict(X)), 0) / 5)).astype(np.int16)
+        prints[park] = hashlib.sha1(rounded.tobytes()).hexdigest()
+    return prints
+
+def current_version(registry_dir=REGISTRY_DIR):
+    try:
+        with open(os.path.join(registry_dir, CURRENT_FILE), encoding="utf-8") as f:
+            return f.read().strip() or None
+    except FileNotFoundError:
+        return None
+
+def list_versions(registry_dir=REGISTRY_DIR):
+    if not os.path.isdir(registry_dir): return []
+    return sorted(d for d in os.listdir(registry_dir) if d.startswith("v") and d[1:].isdigit())
+
+def load_version(version, registry_dir=REGISTRY_DIR):
+    version_dir = os.path.join(registry_dir, version)
+    pipeline = _load_native(os.path.join(version_dir, MODEL_FILE), os.path.join(version_dir, SIDECAR_FILE))
+    with open(os.path.join(version_dir, META_FILE), encoding="utf-8") as f:
+        pipeline["meta"] = json.load(f)
+    return pipeline
+
+def publish_version(model, encoders, features, metadata=None, registry_dir=REGISTRY_DIR, activate=True):
+    """
+    Schrijft een nieuwe versie naar de registry en (optioneel) zet CURRENT erop.
+    Eerst naar een tijdelijke map, dan rename: een lezer ziet nooit een half geschreven versie.
+    """
+    os.makedirs(registry_dir, exist_ok=True)
+    existing = list_versions(registry_dir)
+    version = f"v{(int(existing[-1][1:]) + 1 if existing else 1):04d}"
+    tmp_dir = os.path.join(registry_dir, f".{version}.tmp")
+    shutil.rmtree(tmp_dir, ignore_errors=True)
+    os.makedirs(tmp_dir)
+
+    save_pipeline(model, encoders, features, os.path.join(tmp_dir, MODEL_FILE), os.path.join(tmp_dir, SIDECAR_FILE))
+    meta = dict(metadata or {})
+    meta.update({
+        "version": version,
+        "created_at": datetime.datetime.now(datetime.timezone.utc).isoformat(timespec="seconds"),
+        "features": list(features),
+        "forecast_fingerprints": forecast_fingerprints(model, build_encoding_tables(encoders), list(features))
+    })
+    with open(os.path.join(tmp_dir, META_FILE), "w", encoding="utf-8") as f:
+        json.dump(meta, f, ensure_ascii=False, indent=1)
+
+    os.rename(tmp_dir, os.path.join(registry_dir, version))
+    if activate: activate_version(version, registry_dir)
+    return version
+
+def activate_version(version, registry_dir=REGISTRY_DIR):
+    """Zet CURRENT atomisch op `version` (ook bruikbaar om terug te rollen)."""
+    if version not in list_versions(registry_dir):
+        raise ValueError(f"Onbekende modelversie '{version}'")
+    tmp_file = os.path.join(registry_dir, f".{CURRENT_FILE}.tmp")
+    with open(tmp_file, "w", encoding="utf-8") as f:
+        f.write(version)
+    os.replace(tmp_file, os.path.join(registry_dir, CURRENT_FILE))
+
+def on_swap(callback):
+    """
+    Registreert callback(changed_parks) die na elke hot-swap wordt aangeroepen. changed_parks = parken waarvan de
+    forecasts zonder weer veranderden (None = alle parken); alles wat van weer of ruwe voorspellingen afhangt is altijd verouderd.
+    """
+    _listeners.append(callback)
+
+def _changed_parks(old, new):
+    old_prints = ((old or {}).get("meta") or {}).get("forecast_fingerprints")
+    new_prints = (new.get("meta") or {}).get("forecast_fingerprints")
+    if not old_prints or not new_prints or old["features"] != new["features"]: return None
+    return {park for park in set(old_prints) | set(new_prints) if old_prints.get(park) != new_prints.get(park)}
+
+def check_for_update(force=False):
+    """
+    Kijkt (hooguit elke CHECK_INTERVAL_S) of CURRENT naar een andere versie wijst en wisselt dan atomisch.
+    Geeft de set parken terug waarvan de forecasts veranderden (leeg als er niets wisselde). Lukt het laden niet,
+    dan volgt een exception en blijft de oude pipeline gewoon actief.
+    """
+    global _pipeline, _version, _loaded, _last_check
+    now = time.monotonic()
+    if not force and now - _last_check < CHECK_INTERVAL_S: return set()
+    _last_check = now
+    version = current_version()
+    if not version or version == _version: return set()
+
+    # Laden buiten de lock: lopende voorspellingen gebruiken gewoon nog de oude pipeline.
+    # De nieuwe versie begint met een lege memo: ruwe voorspellingen van het oude model zijn nooit gegarandeerd gelijk.
+    new = _attach_predictors(load_version(version), version)
+    with _lock:
+        changed = _changed_parks(_pipeline, new)
+        _pipeline, _version, _loaded = new, version, True
+    print(f"🔄 Model gewisseld naar {version} (gewijzigde parken: {'alle' if changed is None else sorted(changed) or 'geen'})")
+    for callback in list(_listeners):
+        callback(changed)
+    return changed if changed is not None else set(PARKS)
+
+if __name__ == "__main__":
+    # Zet een bestaande joblib pipeline om naar een registry-versie
+    import joblib
+    old = joblib.load(LEGACY_MODEL_FILE)
+    version = publish_version(old["model"], old["encoders"], old["features"], {"source": LEGACY_MODEL_FILE})
+    print(f"✅ '{LEGACY_MODEL_FILE}' gepubliceerd als {version} in '{REGISTRY_DIR}'")
@@ -0,0 +1,108 @@
+import threading
+import numpy as np
+
+# --- CONFIGURATIE ---
+ALPHA = 0.3               # EMA-gewicht van de nieuwste meting (bij een poll per 5 min: ~15 min geheugen)
+DECAY_TAU_MIN = 60.0      # Correctie = bias * exp(-minuten na de meting / tau) ...
+HORIZON_MIN = 120         # ... en 0 vanaf 2 uur na de meting: daarna weer puur het model
+MAX_BIAS = 60             # Eén vreemde meting (storing, 0 van een rit zonder wachtrij-sensor) mag niet alles scheeftrekken
+
+def decay(minutes):
+    """Gewicht van de correctie `minutes` na de meting: 1 -> 0 over de horizon, 0 ervoor en erna."""
+    minutes = np.asarray(minutes, dtype=float)
+    return np.where((minutes >= 0) & (minutes < HORIZON_MIN), np.exp(-np.maximum(minutes, 0) / DECAY_TAU_MIN), 0.0)
+
+class Nowcast:
+    """
+    Online bias-correctie per attractie: het verschil tussen gemeten (live) en voorspelde wachttijd,
+    exponentieel gladgestreken per poll (O(1) per rit). Loopt het park vandaag 'warm' of 'koud', dan schuift
+    de forecast voor de komende 2 uur mee, met een correctie die uitdooft naarmate we verder vooruit kijken.
+    """
+
+    def __init__(self, alpha=ALPHA):
+        self.alpha = alpha
+        self._bias = {}           # park -> {rit: (bias in minuten, epoch-seconden van de meting)}
+        self._generation = {}     # park -> teller, gaat omhoog als een afgeronde bias verandert (voor cache-sleutels)
+        self._lock = threading.Lock()
+
+    def observe(self, park_name, observed_at, rides, waits, predicted, closed=999):
+        """
+        Eén meting van het park als arrays over `rides`: `waits` zoals Snapshot.waits (negatief = niet gemeld,
+        `closed` = dicht; beide overgeslagen) en `predicted` de forecast op het meetmoment, in dezelfde volgorde.
+        """
+        waits, predicted = np.asarray(waits, dtype=int), np.asarray(predicted, dtype=int)
+        measured = np.flatnonzero((waits >= 0) & (waits < closed))
+        if not len(measured): return
+        residuals = np.clip(waits[measured] - predicted[measured], -MAX_BIAS, MAX_BIAS).tolist()
+        with self._lock:
+            state = self._bias.setdefault(park_name, {})
+            changed = False
+            for i, residual in zip(measured.tolist(), residuals):
+                ride = rides[i]
+                old = state.get(ride)
+                # De eerste meting (of één van een vorige dag) start de EMA opnieuw
+                if old is None or observed_at - old[1] > HORIZON_MIN * 60: state[ride] = (residual, observed_at)
+                else: state[ride] = (old[0] + self.alpha * (residual - old[0]), observed_at)
+                changed |= old is None or round(old[0]) != round(state[ride][0])
+            # Alleen een nieuwe generatie (en dus verlopen live plannen) als een correctie op hele minuten verschuift
+            if changed: self._generation[park_name] = self._generation.get(park_name, 0) + 1
+
+    def corrections(self, park_name, rides, times):
+        """Correctie (minuten, float) per (rit, tijdstip) met vorm (len(rides), len(times)); `times` in epoch-seconden."""
+        times = np.asarray(times, dtype=float)
+        out = np.zeros((len(rides), len(times)))
+        state = self._bias.get(park_name)
+        if not state: return out
+        for i, ride in enumerate(rides):
+            entry = state.get(ride)
+            if entry is not None: out[i] = entry[0] * decay((times - entry[1]) / 60)
+        return out
+
+    def adjust(self, park_name, rides, times, waits, live_window, closed=999):
+        """
+        Telt de afgeronde correctie op bij `waits` (int-array rides x times, in-place) en geeft die terug.
+        Niet binnen het live-venster (daar geldt de meting zelf) en niet bij gesloten ritten; nooit onder 0.
+        """
+        if park_name not in self._bias: return waits
+        nudge = np.rint(self.corrections(park_name, rides, times)).astype(waits.dtype)
+        ok = ~np.asarray(live_window, dtype=bool)[None, :] & (waits < closed)
+        waits[ok] = np.maximum(waits + nudge, 0)[ok]
+        return waits
+
+    def generation(self, park_name):
+        return self._generation.get(park_name, 0)
+
+    def bias(self, park_name):
+        """{rit: huidige bias} van een park (voor weergave/debug)."""
+        return {r: b for r, (b, _) in self._bias.get(park_name, {}).items()}
+
+    def reset(self, parks=None):
+        """Na een nieuw model horen de residuen niet meer bij de forecast: opnieuw beginnen (None = alle parken)."""
+        with self._lock:
+            for park in [p for p in self._bias if parks is None or p in parks]:
+                del self._bias[park]
+                self._generation[park] = self._generation.get(park, 0) + 1
+
+NOWCAST = Nowcast()
+
+if __name__ == "__main__":
+    # Park loopt 20 min 'warmer' dan voorspeld: bias na een paar polls, en hoe die uitdooft over 2 uur
+    import math
+    nowcast = Nowcast()
+    rides, forecast = ["Baron 1898", "Python", "Fata Morgana"], [40, 25, 15]
+    t0 = 1_800_000_000
+    for k, extra in enumerate([12, 18, 22, 20, 21]):
+        # Python is dicht, Fata Morgana niet gemeld
+        nowcast.observe("EFTELING", t0 + 300 * k, rides, [40 + extra, 999, -1], forecast)
+        print(f"poll {k + 1}: gemeten +{extra} -> bias {nowcast.bias('EFTELING')['Baron 1898']:.1f} min")
+    last = t0 + 300 * 4
+    horizon = [0, 15, 30, 60, 90, 119, 120]
+    row = nowcast.corrections("EFTELING", rides, [last + 60 * m for m in horizon])
+    print("Correctie na " + ", ".join(f"{m} min: {c:+.1f}" for m, c in zip(horizon, row[0])), "| Python (gesloten):", row[1].tolist())
+    assert math.isclose(row[0, 0], nowcast.bias("EFTELING")["Baron 1898"]) and row[0, -1] == 0 and not row[1:].any()
+    # Stabiel park: polls die de afgeronde bias niet veranderen laten de generatie (en de plan-cache) met rust
+    generation = nowcast.generation("EFTELING")
+    for k in range(5, 10):
+        nowcast.observe("EFTELING", t0 + 300 * k, rides, [40 + round(nowcast.bias("EFTELING")["Baron 1898"]), 999, -1], forecast)
+    print(f"5 stabiele polls: generatie {generation} -> {nowcast.generation('EFTELING')}")
+    assert nowcast.generation("EFTELING") == generation
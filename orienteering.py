@@ -0,0 +1,109 @@
+import random
+import time
+import numpy as np
+from queuequest_meta import ATTRACTION_METADATA
+from route_solver import fetch_live_data, get_wait_forecast, resolve_time_window
+from route_problem import build_problem, itinerary_step, CLOSED_WAIT
+
+# --- CONFIGURATIE ---
+TIME_BUDGET_S = 1.0
+DECAY = 0.7                                   # Elke herhaling van een rit telt 0.7x zo zwaar
+DECAY_TABLE = [DECAY ** k for k in range(200)]  # In Python gebouwd: exact dezelfde floats als solve_max_score_route
+MIN_COST_MIN = 5
+NO_REPEAT_BELOW = 7                           # Ritten met score < 7 niet twee keer na elkaar
+GRASP_ALPHA = (0.05, 0.35)                    # Kies willekeurig uit de kandidaten binnen alpha van de beste ROI
+
+class OrienteeringPlanner:
+    """
+    Maximaliseert de totale (afnemende) score binnen het venster: elke rit mag vaker, met score * 0.7^k.
+    De eerste oplossing is precies de greedy ROI-keuze van solve_max_score_route; daarna volgen
+    gerandomiseerde herstarts (GRASP) en wordt alleen een strikt betere route gerapporteerd.
+    """
+
+    def __init__(self, problem, seed=0):
+        self.problem = problem
+        self.rng = random.Random(seed)
+        self.ids = np.arange(problem.n)
+        self.quality = np.array([ATTRACTION_METADATA[r].get('score', 5) for r in problem.rides], dtype=float)
+        self.no_repeat = self.quality < NO_REPEAT_BELOW
+        self.decay = np.array(DECAY_TABLE)
+        self.restarts = 0
+
+    def construct(self, alpha=0.0):
+        """Bouwt één route; alpha = 0 is exact de greedy keuze (eerste kandidaat met de hoogste ROI)."""
+        p = self.problem
+        clock, loc, last = 0, 0, None
+        counts = np.zeros(p.n, dtype=int)
+        steps, total = [], 0.0
+        while clock < p.horizon:
+            transit = p.transit[loc, 1:p.n + 1]
+            arrival = clock + transit
+            ok = arrival < p.horizon
+            wait = p.waits[self.ids, np.minimum(arrival, p.horizon - 1)]
+            ok &= wait < CLOSED_WAIT
+            if last is not None and self.no_repeat[last]: ok[last] = False
+            if not ok.any(): break
+            cost = np.maximum(MIN_COST_MIN, transit + wait + p.durations)
+            roi = np.where(ok, (self.quality * self.decay[counts]) / cost, -1.0)
+            if alpha:
+                best = roi.max()
+                choice = self.rng.choice(np.flatnonzero(ok & (roi >= (1 - alpha) * best)).tolist())
+            else:
+                choice = int(roi.argmax())
+            end = int(arrival[choice] + wait[choice] + p.durations[choice])
+            steps.append((choice, clock, int(transit[choice]), int(arrival[choice]), int(wait[choice]), int(counts[choice])))
+            total += self.quality[choice] * self.decay[counts[choice]]
+            clock, loc, last = end, choice + 1, choice
+            counts[choice] += 1
+        return total, steps
+
+    def solve(self, time_budget_s=TIME_BUDGET_S, on_improve=None):
+        """Anytime: on_improve(score, steps) meteen met de greedy route en daarna bij elke verbetering."""
+        deadline = time.perf_counter() + time_budget_s
+        best_score, best_steps = self.construct()
+        if on_improve: on_improve(best_score, best_steps)
+        while time.perf_counter() < deadline:
+            self.restarts += 1
+            score, steps = self.construct(self.rng.uniform(*GRASP_ALPHA))
+            if score > best_score + 1e-9:
+                best_score, best_steps = score, steps
+                if on_improve: on_improve(best_score, best_steps)
+        return best_score, best_steps
+
+def emit_itinerary(problem, steps):
+    return [itinerary_step(problem, ride, depart, transit, arrival, wait, note=f"Rit #{count + 1}", kind="SCORE")
+            for ride, depart, transit, arrival, wait, count in steps]
+
+def max_score_problem(park_name, start_str, end_str, start_location="Ingang", pace_factor=1.0, now=None):
+    """Dezelfde kandidaten, sluitingen en startlocatie als solve_max_score_route, als RouteProblem."""
+    now, current_time, park_close = resolve_time_window(start_str, end_str, now)
+    is_simulating_now = (abs((current_time - now).total_seconds()) < 3600)
+    live_data = fetch_live_data(park_name) if is_simulating_now else {}
+    candidates = [r for r, m in ATTRACTION_METADATA.items() if m.get('park') == park_name and m.get('score', 0) > 0 and m.get('type') not in ['Restaurant', 'Snack']]
+    if is_simulating_now and live_data:
+        candidates = [c for c in candidates if live_data.get(c, {}).get('is_open', True)]
+    if not candidates: return None
+    start = start_location if start_location != "Unknown" else "Ingang"
+    return build_problem(park_name, candidates, start, current_time, park_close, pace_factor,
+                         get_wait_forecast(park_name, current_time.date()), live_data, now=now)
+
+# --- SOLVER (ZELFDE INTERFACE ALS solve_max_score_route) ---
+def solve_max_score_anytime(park_name, start_str, end_str, start_location="Ingang", pace_factor=1.0, time_budget_s=TIME_BUDGET_S, seed=0, on_improve=None, now=None):
+    """on_improve(itinerary, score) krijgt elke tussenoplossing; de eerste is de greedy route, elke volgende is beter."""
+    problem = max_score_problem(park_name, start_str, end_str, start_location, pace_factor, now)
+    if problem is None: return [], [], []
+    report = (lambda score, steps: on_improve(emit_itinerary(problem, steps), score)) if on_improve else None
+    _, steps = OrienteeringPlanner(problem, seed).solve(time_budget_s, report)
+    return emit_itinerary(problem, steps), [], []
+
+if __name__ == "__main__":
+    from route_solver import solve_max_score_route
+    for park in ["EFTELING", "PHANTASIALAND", "WALIBI_BELGIUM"]:
+        t0 = time.perf_counter()
+        greedy, _, _ = solve_max_score_route(park, "10:00", "18:00")
+        t1 = time.perf_counter()
+        progress = []
+        anytime, _, _ = solve_max_score_anytime(park, "10:00", "18:00", on_improve=lambda route, score: progress.append(score))
+        t2 = time.perf_counter()
+        same = solve_max_score_anytime(park, "10:00", "18:00", time_budget_s=0)[0] == greedy
+        print(f"{park:<15} | greedy {progress[0]:.1f} ({t1 - t0:.2f}s) -> anytime {progress[-1]:.1f} ({t2 - t1:.2f}s, {len(progress) - 1} verbeteringen) | start = greedy: {'✅' if same else '❌'}")
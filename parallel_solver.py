@@ -0,0 +1,184 @@
+import multiprocessing
+import os
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor, wait as wait_futures
+from multiprocessing import shared_memory
+import numpy as np
+from route_problem import RouteProblem, problem_from_request, emit_order
+from orienteering import OrienteeringPlanner, max_score_problem, emit_itinerary as emit_score_itinerary
+from beam_solver import BeamPlanner
+from local_search import improve_order
+
+# --- CONFIGURATIE ---
+TIME_BUDGET_S = 1.0
+STARTUP_GRACE_S = 10.0     # Eerste keer: workers moeten nog opstarten en modules importeren
+SHARED_ARRAYS = ("transit", "waits", "durations", "is_must", "best_end")
+PARALLEL_MIN_WORK = 20_000 # ritten x minuten in het venster; een heel park (17 ritten, 10-19u) is ~9.000
+IN_PROCESS_BUDGET_S = 0.2  # Daaronder: één zoektocht in dit proces, op een paar minuten na even goed als 4 workers x 1 s
+
+_pool = None
+_pool_size = 0
+_pool_lock = threading.RLock()
+_warm_size = 0             # Aantal workers dat echt draait (na warm_pool); 0 = de pool is (nog) koud
+_warming = False
+
+def get_pool(n_workers):
+    """
+    Eén blijvende pool per proces (spawn: veilig naast de threads van Streamlit). Een kapotte pool (een worker
+    is gestorven: BrokenProcessPool) wordt opnieuw opgebouwd, anders faalt elke volgende aanroep.
+    """
+    global _pool, _pool_size, _warm_size
+    with _pool_lock:
+        if _pool is None or _pool_size != n_workers or getattr(_pool, "_broken", False):
+            if _pool is not None: _pool.shutdown(wait=False, cancel_futures=True)
+            _pool = ProcessPoolExecutor(max_workers=n_workers, mp_context=multiprocessing.get_context("spawn"))
+            _pool_size, _warm_size = n_workers, 0
+        return _pool
+
+def _ping():
+    time.sleep(0.1)   # Even bezet houden: zo start elke ping een eigen worker
+    return os.getpid()
+
+def warm_pool(n_workers):
+    """Start de workers (spawn + imports) op een achtergrondthread, zodat geen aanvraag op een koude pool wacht."""
+    global _warming
+    with _pool_lock:
+        if _warming or pool_ready(n_workers): return
+        _warming = True
+
+    def warm():
+        global _warm_size, _warming
+        try:
+            pool = get_pool(n_workers)
+            for f in [pool.submit(_ping) for _ in range(n_workers)]: f.result()
+            with _pool_lock:
+                if _pool is pool: _warm_size = n_workers
+        except Exception as e:
+            print(f"⚠️ Process pool opstarten mislukt: {e}")
+        finally:
+            _warming = False
+    threading.Thread(target=warm, name="pool-warmup", daemon=True).start()
+
+def pool_ready(n_workers):
+    """True als er een opgewarmde, werkende pool met n_workers klaarstaat."""
+    return _pool is not None and _pool_size == _warm_size == n_workers and not getattr(_pool, "_broken", False)
+
+# --- SHARED MEMORY ---
+def share_problem(problem):
+    """Zet de arrays van een RouteProblem in één shared memory blok; geeft (blok, spec voor de workers)."""
+    arrays = {name: np.ascontiguousarray(problem.best_end() if name == "best_end" else getattr(problem, name)) for name in SHARED_ARRAYS}
+    layout, offset = {}, 0
+    for name, arr in arrays.items():
+        offset = -(-offset // 8) * 8
+        layout[name] = (offset, arr.shape, arr.dtype.str)
+        offset += arr.nbytes
+    shm = shared_memory.SharedMemory(create=True, size=max(offset, 1))
+    for name, arr in arrays.items():
+        start, shape, dtype = layout[name]
+        np.ndarray(shape, dtype, buffer=shm.buf, offset=start)[...] = arr
+    spec = {
+        "shm": shm.name, "layout": layout, "park_name": problem.park_name, "rides": problem.rides,
+        "start_loc": problem.start_loc, "horizon": problem.horizon, "is_live": problem.is_live, "lunch": problem.lunch
+    }
+    return shm, spec
+
+def attach_problem(shm, spec):
+    """RouteProblem met arrays die rechtstreeks in het shared memory blok kijken (geen kopie, geen pickle)."""
+    views = {name: np.ndarray(shape, dtype, buffer=shm.buf, offset=start) for name, (start, shape, dtype) in spec["layout"].items()}
+    problem = RouteProblem(spec["park_name"], spec["rides"], spec["start_loc"], None, spec["horizon"], views["transit"],
+                           views["waits"], views["durations"], views["is_must"], spec["is_live"], spec["lunch"])
+    problem._best_end = views["best_end"]
+    return problem
+
+# --- WORKERS ---
+def _run(problem, mode, seed, time_budget_s, order):
+    """Eén gezaaide variant; geeft alleen gewone Python data terug (score, oplossing, statistieken)."""
+    t0 = time.perf_counter()
+    if mode == "max_score":
+        planner = OrienteeringPlanner(problem, seed)
+        score, solution = planner.solve(time_budget_s)
+        score, stats = float(score), {"restarts": planner.restarts}
+    else:
+        solution, result = improve_order(problem, order, time_budget_s, seed)
+        score, stats = -float(result["best_cost"]), {"evaluations": result["evaluations"], "cost": result["best_cost"]}
+    stats.update({"pid": os.getpid(), "seed": seed, "score": score, "elapsed_s": round(time.perf_counter() - t0, 3)})
+    return score, solution, stats
+
+def solve_worker(spec, mode, seed, time_budget_s, order=None):
+    # Workers zijn kinderen van dit proces en delen zijn resource tracker: alleen de ouder doet unlink()
+    shm = shared_memory.SharedMemory(name=spec["shm"])
+    try:
+        return _run(attach_problem(shm, spec), mode, seed, time_budget_s, order)
+    finally:
+        shm.close()
+
+# --- ENTRY POINT ---
+def solve_parallel(park_name, must_haves, should_haves, start_str, end_str, start_location="Unknown", lunch_config=None, pace_factor=1.0,
+                   mode="wishlist", n_workers=None, time_budget_s=TIME_BUDGET_S, base_seed=0, now=None):
+    """
+    Multi-start over een process pool. mode "wishlist": simulated annealing vanaf de beam-search route,
+    met een andere seed per worker. mode "max_score": gerandomiseerde orienteering-herstarts per worker
+    (de wensenlijst telt dan niet). Geeft (itinerary, closed_rides, skipped, worker_stats).
+    Onder PARALLEL_MIN_WORK draait één korte zoektocht in dit proces; daarboven alleen via een al opgewarmde pool
+    (is die nog koud, dan warmt hij op de achtergrond op en rekent deze aanvraag nog in dit proces).
+    """
+    n_workers = n_workers or os.cpu_count() or 1
+    if mode == "max_score":
+        problem, closed_rides, order = max_score_problem(park_name, start_str, end_str, start_location, pace_factor, now), [], None
+    else:
+        problem, closed_rides = problem_from_request(park_name, list(must_haves), list(should_haves), start_str, end_str, start_location, lunch_config, pace_factor, now)
+        if problem is not None:
+            state = BeamPlanner(problem).plan()
+            order = [action[1] for action in state.path() if action[0] == "RIDE"]
+            order += [i for i in range(problem.n) if i not in order]
+    if problem is None: return [], closed_rides, [], []
+
+    if n_workers > 1 and problem.n * problem.horizon < PARALLEL_MIN_WORK:
+        results = [_run(problem, mode, base_seed, min(time_budget_s, IN_PROCESS_BUDGET_S), order)]
+    elif n_workers == 1 or not pool_ready(n_workers):
+        if n_workers > 1: warm_pool(n_workers)
+        results = [_run(problem, mode, base_seed, time_budget_s, order)]
+    else:
+        shm, spec = share_problem(problem)
+        try:
+            pool = get_pool(n_workers)
+            futures = [pool.submit(solve_worker, spec, mode, base_seed + i, time_budget_s, order) for i in range(n_workers)]
+            done, pending = wait_futures(futures, timeout=time_budget_s + STARTUP_GRACE_S)
+            for f in pending: f.cancel()
+            results = [f.result() for f in done if f.exception() is None]
+        except Exception as e:
+            print(f"⚠️ Process pool niet beschikbaar ({e}), één worker in dit proces.")
+            results = []
+        finally:
+            shm.close()
+            shm.unlink()
+        if not results: results = [_run(problem, mode, base_seed, time_budget_s, order)]
+
+    score, solution, _ = max(results, key=lambda r: r[0])
+    worker_stats = [r[2] for r in results]
+    if mode == "max_score":
+        return emit_score_itinerary(problem, solution), closed_rides, [], worker_stats
+    itinerary, skipped = emit_order(problem, solution)
+    return itinerary, closed_rides, skipped, worker_stats
+
+if __name__ == "__main__":
+    from queuequest_meta import ATTRACTION_METADATA
+    park = "EFTELING"
+    everything = [r for r, m in ATTRACTION_METADATA.items() if m['park'] == park and m.get('type') not in ['Restaurant', 'Snack']]
+    def run(label, mode, wishlist, workers, **kwargs):
+        t0 = time.perf_counter()
+        route, _, skipped, stats = solve_parallel(park, wishlist, [], "10:00", "16:00", mode=mode, n_workers=workers, **kwargs)
+        print(f"{mode:<9} | {label:<20} | {len(route)} ritten, {len(skipped)} overgeslagen, klaar om {route[-1]['ride_end']} | {time.perf_counter() - t0:.2f}s")
+        for s in stats:
+            result = f"kosten {s['cost']}" if mode == "wishlist" else f"score {s['score']:.1f}"
+            print(f"    pid {s['pid']} seed {s['seed']}: {result} in {s['elapsed_s']}s")
+
+    for mode, wishlist, kwargs in [("wishlist", everything, {}), ("max_score", [], {"start_location": "Ingang"})]:
+        run("1 worker", mode, wishlist, 1, **kwargs)
+        run("4 (klein: in proces)", mode, wishlist, 4, **kwargs)
+    # Boven de drempel: de eerste aanvraag warmt de pool op de achtergrond op, de volgende gebruikt hem
+    PARALLEL_MIN_WORK = 0
+    run("4 (pool koud)", "wishlist", everything, 4)
+    while not pool_ready(4): time.sleep(0.1)
+    run("4 (pool warm)", "wishlist", everything, 4)
@@ -0,0 +1,126 @@
+import threading
+from collections import OrderedDict
+from copy import deepcopy
+import model_store
+from route_solver import resolve_time_window
+from live_data import live_snapshot
+from nowcast import NOWCAST
+
+# --- CONFIGURATIE ---
+MAX_ENTRIES = 512
+
+def plan_key(solve_fn, park_name, date, must_haves, should_haves, start_str, end_str, start_location, lunch_config, pace_factor, live, **options):
+    """
+    Genormaliseerde aanvraag: de volgorde van de wensenlijst telt niet, tijden als HH:MM, pace op 2 decimalen.
+    `live` is None (forecast) of (snapshot-versie, nowcast-generatie).
+    """
+    hhmm = lambda t: "%02d:%02d" % tuple(map(int, t.split(':'))) if t else None
+    lunch = (lunch_config['time'].strftime('%H:%M'), int(lunch_config['duration']), lunch_config['restaurant']) if lunch_config else None
+    return (park_name, date.isoformat(), f"{solve_fn.__module__}.{solve_fn.__qualname__}",
+            tuple(sorted(set(must_haves))), tuple(sorted(set(should_haves))), hhmm(start_str), hhmm(end_str),
+            start_location, lunch, round(float(pace_factor), 2), live, tuple(sorted(options.items())))
+
+class PlanCache:
+    """
+    LRU-cache van berekende routes. Plannen op basis van live data horen bij één snapshot-versie per park:
+    komt er voor dat park een nieuwe snapshot binnen, dan vervallen (alleen) de live plannen van dat park.
+    """
+
+    def __init__(self, max_entries=MAX_ENTRIES):
+        self.max_entries = max_entries
+        self._items = OrderedDict()
+        self._versions = {}
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.invalidations = 0
+
+    def _observe(self, park_name, version):
+        """Nieuwe snapshot voor dit park: live plannen van de vorige snapshot weggooien."""
+        if version is None or self._versions.get(park_name) == version: return
+        self._versions[park_name] = version
+        stale = [k for k, (v, _) in self._items.items() if k[0] == park_name and v is not None and v != version]
+        for key in stale:
+            del self._items[key]
+        self.invalidations += len(stale)
+
+    def get_or_solve(self, key, version, solve):
+        """
+        Geeft een kopie van het bewaarde plan voor `key`, of berekent het met solve() en bewaart het.
+        `version` is de live versie (snapshot, nowcast) waarop het plan steunt (None = alleen forecast). De sleutel bevat als eerste het park.
+        """
+        park_name = key[0]
+        with self._lock:
+            self._observe(park_name, version)
+            entry = self._items.get(key)
+            if entry is not None:
+                self._items.move_to_end(key)
+                self.hits += 1
+                return deepcopy(entry[1])
+            self.misses += 1
+        plan = solve()
+        with self._lock:
+            # Niet bewaren als er intussen een nieuwere snapshot is binnengekomen
+            if version is None or self._versions.get(park_name) == version:
+                self._items[key] = (version, deepcopy(plan))
+                while len(self._items) > self.max_entries:
+                    self._items.popitem(last=False)
+        return plan
+
+    def invalidate(self, parks=None):
+        """Gooit de plannen van `parks` weg (None = alles)."""
+        with self._lock:
+            for key in [k for k in self._items if parks is None or k[0] in parks]:
+                del self._items[key]
+
+    def stats(self):
+        total = self.hits + self.misses
+        return {
+            "hits": self.hits, "misses": self.misses, "hit_rate": self.hits / total if total else 0.0,
+            "entries": len(self._items), "invalidations": self.invalidations
+        }
+
+    def clear(self):
+        with self._lock:
+            self._items.clear()
+            self._versions.clear()
+
+    def __len__(self):
+        return len(self._items)
+
+PLAN_CACHE = PlanCache()
+# Plannen steunen op de forecasts zonder weer: na een hot-swap dezelfde parken weggooien als de forecast-cache (None = alle)
+model_store.on_swap(lambda changed_parks: PLAN_CACHE.invalidate(changed_parks))
+
+def cached_plan(solve_fn, park_name, must_haves, should_haves, start_str, end_str, start_location="Unknown", lunch_config=None, pace_factor=1.0, now=None, **options):
+    """
+    solve_fn(park_name, must_haves, should_haves, start_str, end_str, start_location, lunch_config, pace_factor, now=..., **options)
+    via PLAN_CACHE. De klok wordt hier één keer vastgezet en aan de solver meegegeven, zodat sleutel en plan bij elkaar horen.
+    """
+    now, current_time, _ = resolve_time_window(start_str, end_str, now)
+    live = None
+    if abs((current_time - now).total_seconds()) < 3600:
+        snapshot = live_snapshot(park_name)
+        # Geen klok in de sleutel: een live plan blijft geldig tot de snapshot of de (afgeronde) nowcast verandert
+        if snapshot and snapshot.rides: live = (snapshot.version, NOWCAST.generation(park_name))
+    key = plan_key(solve_fn, park_name, current_time.date(), must_haves, should_haves, start_str, end_str, start_location, lunch_config, pace_factor, live, **options)
+    return PLAN_CACHE.get_or_solve(key, live, lambda: solve_fn(
+        park_name, must_haves, should_haves, start_str, end_str, start_location, lunch_config, pace_factor, now=now, **options))
+
+if __name__ == "__main__":
+    import time
+    import datetime
+    from live_data import LIVE_STORE
+    from route_solver import solve_route_with_priorities
+    now = datetime.datetime(2026, 7, 14, 9, 0)
+    must = ["Baron 1898", "Symbolica", "Python", "Droomvlucht"]
+    for label, wishlist in [("eerste aanvraag", must), ("zelfde, andere volgorde", must[::-1]), ("nog eens", must)]:
+        t0 = time.perf_counter()
+        route, _, _ = cached_plan(solve_route_with_priorities, "EFTELING", wishlist, ["Pagode"], "10:00", "19:00", now=now)
+        print(f"{label:<24} | {len(route)} ritten | {1000 * (time.perf_counter() - t0):.2f} ms")
+
+    # Live: een nieuwe snapshot voor het park laat alleen de live plannen van dat park vervallen
+    for wait in (10, 10, 40):
+        LIVE_STORE.put("EFTELING", {"Python": {"is_open": True, "wait_time": wait}})
+        cached_plan(solve_route_with_priorities, "EFTELING", must, [], "10:00", "19:00", now=datetime.datetime(2026, 7, 14, 10, 0))
+    print(PLAN_CACHE.stats())
@@ -0,0 +1,78 @@
+import threading
+from collections import OrderedDict
+import numpy as np
+
+# --- CONFIGURATIE ---
+MAX_ENTRIES = 50000
+TEMP_BUCKET_C = 1.0       # Temperatuur afronden op hele graden
+PRECIP_BUCKET_MM = 0.5    # Neerslag afronden op halve millimeters
+
+def booster_predict_fn(model):
+    """Geeft de snelste voorspel-functie voor een XGBRegressor of kale Booster (inplace_predict)."""
+    booster = model.get_booster() if hasattr(model, 'get_booster') else model
+    return booster.inplace_predict
+
+def bucket_weather(X, features, temp_step=TEMP_BUCKET_C, precip_step=PRECIP_BUCKET_MM):
+    """Rondt de weer-kolommen af zodat bijna-gelijke weersituaties dezelfde sleutel (en voorspelling) krijgen."""
+    X = np.array(X, dtype=np.float32)
+    for name, step in (('temp_c', temp_step), ('precip_mm', precip_step)):
+        if name in features:
+            j = features.index(name)
+            X[:, j] = np.round(X[:, j] / step) * step
+    return X
+
+class MemoPredictor:
+    """
+    Memoriseert model-voorspellingen op de gecodeerde feature-tuple (een rij van de float32 matrix).
+    Alleen rijen die nog niet in de cache zitten gaan (samen, in één call) naar het model.
+    """
+
+    def __init__(self, model, features, max_entries=MAX_ENTRIES):
+        self.predict_fn = booster_predict_fn(model)
+        self.features = list(features)
+        self.max_entries = max_entries
+        self._cache = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.model_calls = 0
+
+    def predict(self, X):
+        X = bucket_weather(X, self.features)
+        keys = list(map(tuple, X.tolist()))
+        preds = np.empty(len(keys), dtype=np.float32)
+        todo = {}
+        with self._lock:
+            for i, key in enumerate(keys):
+                cached = self._cache.get(key)
+                if cached is None:
+                    todo.setdefault(key, []).append(i)
+                else:
+                    self._cache.move_to_end(key)
+                    preds[i] = cached
+            n_missing = sum(len(rows) for rows in todo.values())
+            self.hits += len(keys) - n_missing
+            self.misses += n_missing
+
+        if todo:
+            first_rows = [rows[0] for rows in todo.values()]
+            fresh = np.asarray(self.predict_fn(X[first_rows])).ravel()
+            with self._lock:
+                self.model_calls += 1
+                for (key, rows), value in zip(todo.items(), fresh):
+                    preds[rows] = value
+                    self._cache[key] = value
+                while len(self._cache) > self.max_entries:
+                    self._cache.popitem(last=False)
+        return preds
+
+    def stats(self):
+        total = self.hits + self.misses
+        return {
+            "hits": self.hits, "misses": self.misses, "model_calls": self.model_calls,
+            "hit_rate": self.hits / total if total else 0.0, "entries": len(self._cache)
+        }
+
+    def clear(self):
+        with self._lock:
+            self._cache.clear()
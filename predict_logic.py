@@ -1,24 +1,13 @@
-import joblib
-import pandas as pd
-import numpy as np
 import datetime
 from queuequest_meta import ATTRACTION_METADATA
 from holiday_utils import is_crowd_risk_day
 from distance_utils import get_travel_time
+from feature_utils import build_feature_matrix
+import model_store
 
 # --- CONFIGURATIE & MODEL LADEN ---
-MODEL_FILE = "queuequest_model.pkl"
-
-print(f"⚙️ Model laden uit '{MODEL_FILE}'...")
-try:
-    PIPELINE = joblib.load(MODEL_FILE)
-    MODEL = PIPELINE["model"]
-    ENCODERS = PIPELINE["encoders"]
-    FEATURES = PIPELINE["features"]
-    print("✅ Model succesvol geladen!")
-except FileNotFoundError:
-    print(f"❌ FOUT: Kan '{MODEL_FILE}' niet vinden.")
-    exit()
+# Het model wordt pas bij de eerste voorspelling geladen (model_store.get_pipeline)
+MODEL_FILE = model_store.MODEL_FILE
 
 # --- DEEL 1: VOORSPEL LOGICA (AI) ---
 
@@ -26,55 +15,28 @@ def get_future_wait_times(park_name, ride_list, query_time):
     """
     Voorspelt wachttijden met behulp van het XGBoost model.
     """
-    is_holiday = is_crowd_risk_day(query_time)
-    input_rows = []
-    
-    for ride_name in ride_list:
-        meta = ATTRACTION_METADATA.get(ride_name, {})
-        if meta.get('park') != park_name: continue
-
-        input_rows.append({
-            'attraction_name': ride_name,
-            'park_name': park_name,
-            'temp_c': 15.0,        # Fictief weer
-            'precip_mm': 0.0,      
-            'weather_condition': 'Cloudy', 
-            'day_of_week': query_time.isoweekday(),
-            'hour_of_day': query_time.hour,
-            'is_holiday': is_holiday,
-            'type': meta.get('type', 'Unknown'),
-            'zone': meta.get('zone', 'Unknown'),
-            'capacity': meta.get('capacity', 0),
-            'is_indoor': meta.get('is_indoor', 0),
-            'hour_sin': np.sin(2 * np.pi * query_time.hour / 24),
-            'hour_cos': np.cos(2 * np.pi * query_time.hour / 24),
-            'day_sin': np.sin(2 * np.pi * query_time.isoweekday() / 7),
-            'day_cos': np.cos(2 * np.pi * query_time.isoweekday() / 7)
-        })
-
-    if not input_rows: return {}
+    rides = [r for r in ride_list if ATTRACTION_METADATA.get(r, {}).get('park') == park_name]
+    if not rides: return {}
+    pipeline = model_store.get_pipeline()
+    if not pipeline:
+        print(f"❌ FOUT: Geen model beschikbaar ('{MODEL_FILE}').")
+        return {}
 
-    # DataFrame maken en encoden
-    df = pd.DataFrame(input_rows)
     try:
-        def safe_transform(encoder, col_name):
-            return df[col_name].map(lambda x: encoder.transform([x])[0] if x in encoder.classes_ else 0)
-
-        df['park_encoded'] = safe_transform(ENCODERS['park'], 'park_name')
-        df['ride_encoded'] = safe_transform(ENCODERS['ride'], 'attraction_name')
-        df['type_encoded'] = safe_transform(ENCODERS['type'], 'type')
-        df['weather_encoded'] = safe_transform(ENCODERS['weather'], 'weather_condition')
-        
-        # Voorspellen
-        X = df[FEATURES]
-        predictions = MODEL.predict(X)
+        # Feature matrix direct in numpy opbouwen (fictief weer: 15 graden, droog, bewolkt)
+        X = build_feature_matrix(
+            pipeline["features"], pipeline["encoding_tables"], park_name, rides,
+            days=[query_time.isoweekday()], hours=[query_time.hour], holidays=[is_crowd_risk_day(query_time)],
+            temp_c=15.0, precip_mm=0.0, weather_condition='Cloudy'
+        )
+        predictions = pipeline["predictor"].predict(X)
     except Exception as e:
         print(f"Fout in voorspelling: {e}")
         return {}
     
     result = {}
-    for i, ride_name in enumerate(df['attraction_name']):
-        raw = max(0, predictions[i])
+    for ride_name, pred in zip(rides, predictions):
+        raw = max(0, pred)
         result[ride_name] = int(5 * round(raw / 5)) # Afronden op 5 min
         
     return result
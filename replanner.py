@@ -0,0 +1,97 @@
+import time
+from route_problem import problem_from_request, emit_order, LIVE_WINDOW_MIN
+from local_search import improve_order
+
+# --- CONFIGURATIE ---
+TIME_BUDGET_S = 0.3          # Voor een volledig nieuwe suffix; kleinere suffixen krijgen naar verhouding minder
+WAIT_CHANGE_MIN = 10         # Een live wachttijd die zoveel afwijkt van het plan raakt de route vanaf die rit
+
+def apply_wait_overrides(problem, waits):
+    """Waargenomen wachttijden gelden (net als live data) voor de komende 30 minuten vanaf de start van het probleem."""
+    index = {r: i for i, r in enumerate(problem.rides)}
+    for ride, wait in waits.items():
+        if ride in index: problem.waits[index[ride], :LIVE_WINDOW_MIN] = wait
+    problem._best_end = None
+
+def within_live_window(problem, previous_route, waits):
+    """Alleen ritten die het oude plan binnen het live-venster bereikt: verder weg telt de forecast."""
+    t0 = problem.at(0)
+    def minute(hhmm):
+        h, m = map(int, hhmm.split(':'))
+        return (h - t0.hour) * 60 + m - t0.minute
+    arrival = {s['ride']: minute(s['arrival_time']) for s in previous_route if s['type'] != 'LUNCH'}
+    return {r: w for r, w in waits.items() if arrival.get(r, 0) < LIVE_WINDOW_MIN}
+
+def affected_from(order, previous_route, previous_loc, current_loc, diff):
+    """
+    Eerste positie in `order` waar de oude route niet meer klopt: een andere voorganger (een rit is gedaan,
+    gesloten of nieuw), of een wachttijd die WAIT_CHANGE_MIN afwijkt van wat het plan verwachtte.
+    """
+    planned_rides = [s['ride'] for s in previous_route if s['type'] != 'LUNCH']
+    planned_wait = {s['ride']: s['wait_min'] for s in previous_route if s['type'] != 'LUNCH'}
+    old_prev = {}
+    for before, ride in zip([previous_loc] + planned_rides, planned_rides):
+        old_prev[ride] = before
+    waits = diff.get("waits", {})
+    # De laatst gedane rit van het oude plan is de plek waar we nu (zouden moeten) staan
+    done_in_plan = [r for r in planned_rides if r in diff.get("done", ())]
+    expected_loc = done_in_plan[-1] if done_in_plan else previous_loc
+
+    before = current_loc
+    for k, ride in enumerate(order):
+        if ride not in old_prev: return k
+        if old_prev[ride] != before and not (before == current_loc and old_prev[ride] == expected_loc): return k
+        if ride in waits and abs(waits[ride] - planned_wait.get(ride, waits[ride])) >= WAIT_CHANGE_MIN: return k
+        before = ride
+    return len(order)
+
+def replan(park_name, previous_route, diff, must_haves, should_haves, start_str, end_str, current_loc, previous_loc="Unknown",
+           lunch_config=None, pace_factor=1.0, time_budget_s=TIME_BUDGET_S, seed=0, now=None):
+    """
+    Herstelt een bestaande route na een wijziging in plaats van opnieuw te beginnen.
+    diff = {"done": [...], "closed": [...], "waits": {rit: waargenomen wachttijd}}.
+    Het deel van de oude volgorde vóór de eerste geraakte rit blijft staan (alleen opnieuw getimed);
+    alleen de suffix vanaf daar gaat door de local search. Forecasts komen uit de cache.
+    Geeft (itinerary, closed_rides, skipped, statistieken).
+    """
+    t0 = time.perf_counter()
+    done, closed = set(diff.get("done", ())), set(diff.get("closed", ()))
+    must = [r for r in must_haves if r not in done and r not in closed]
+    should = [r for r in should_haves if r not in done and r not in closed]
+    problem, closed_rides = problem_from_request(park_name, must, should, start_str, end_str, current_loc, lunch_config, pace_factor, now)
+    closed_rides = list(dict.fromkeys(closed_rides + [r for r in closed if r in must_haves or r in should_haves]))
+    if problem is None: return [], closed_rides, [], {"kept": 0, "repaired": 0}
+    if diff.get("waits"):
+        diff = dict(diff, waits=within_live_window(problem, previous_route, diff["waits"]))
+        apply_wait_overrides(problem, diff["waits"])
+
+    planned = [s['ride'] for s in previous_route if s['type'] != 'LUNCH']
+    index = {r: i for i, r in enumerate(problem.rides)}
+    names = [r for r in planned if r in index] + [r for r in problem.rides if r not in planned]
+    order = [index[r] for r in names]
+    start_loc = problem.start_loc
+    k = affected_from(names, previous_route, previous_loc, start_loc, diff)
+
+    stats = {"kept": k, "repaired": len(order) - k, "evaluations": 0}
+    if len(order) - k > 1:
+        budget = time_budget_s * (len(order) - k) / len(order)
+        order, search = improve_order(problem, order, budget, seed, fixed=k)
+        stats["evaluations"] = search["evaluations"]
+    itinerary, skipped = emit_order(problem, order)
+    stats["elapsed_s"] = round(time.perf_counter() - t0, 4)
+    return itinerary, closed_rides, skipped, stats
+
+if __name__ == "__main__":
+    # Een route plannen, dan de eerste rit afvinken en een attractie laten sluiten
+    from route_solver import solve_route_with_priorities
+    park = "EFTELING"
+    must = ["Baron 1898", "Symbolica", "Python", "Droomvlucht", "Vogel Rok", "Joris en de Draak"]
+    should = ["Pagode", "Sirocco", "Villa Volta"]
+    route, _, _ = solve_route_with_priorities(park, must, should, "10:00", "18:00", "Ingang")
+    print("Plan:      ", [s['ride'] for s in route])
+    first = route[0]
+    for name, diff in [("Gedaan", {"done": [first['ride']]}),
+                       ("+ gesloten", {"done": [first['ride']], "closed": [route[3]['ride']]}),
+                       ("+ drukte", {"done": [first['ride']], "waits": {route[1]['ride']: route[1]['wait_min'] + 40}})]:
+        new, closed, skipped, stats = replan(park, route, diff, must, should, first['ride_end'], "18:00", first['ride'], "Ingang")
+        print(f"{name:<11}", [s['ride'] for s in new], f"| {stats['kept']} behouden, {stats['repaired']} hersteld, {stats['elapsed_s']}s")
@@ -0,0 +1,106 @@
+import difflib
+import re
+import threading
+import unicodedata
+import numpy as np
+from wait_forecast import get_park_rides
+
+# --- CONFIGURATIE ---
+FUZZY_CUTOFF = 0.85        # difflib-ratio op genormaliseerde namen; lager geeft valse treffers (Winja's Fear / Force)
+NOT_REPORTED = -1          # In de snapshot-array: de API noemde deze rit niet
+CLOSED_WAIT = 999          # Zelfde betekenis als in route_solver: attractie dicht
+
+def normalize(name):
+    """'  Psyké  Underground ' -> 'psyke underground': zonder accenten, hoofdletters en leestekens."""
+    name = unicodedata.normalize('NFKD', name).encode('ascii', 'ignore').decode()
+    return " ".join(re.sub(r"[^0-9a-z&]+", " ", name.casefold()).split())
+
+class RideResolver:
+    """
+    Eén keer per park opgebouwd: API-naam -> onze rit-index (de volgorde van get_park_rides, dus dezelfde rij als
+    in WaitForecast). Eerst exact op de genormaliseerde naam of een alias, dan op het deel voor ':' of ' - '
+    ('Symbolica: Paleis der Fantasie'), dan fuzzy. Het resultaat wordt per upstream ride-id bewaard, zodat elke
+    volgende poll alleen nog een dict-lookup per rit kost. Namen die nergens op lijken komen in `unmatched`.
+    """
+
+    def __init__(self, park_name, aliases=None):
+        self.park_name = park_name
+        self.rides = get_park_rides(park_name)
+        self.index = {r: i for i, r in enumerate(self.rides)}
+        self._aliases = {normalize(r): i for i, r in enumerate(self.rides)}
+        for raw, ours in (aliases or {}).items():
+            if ours in self.index: self._aliases.setdefault(normalize(raw), self.index[ours])
+        self._by_upstream = {}
+        self._lock = threading.Lock()
+        self.unmatched = {}        # API-naam -> upstream id, voor namen zonder treffer
+
+    def match(self, name):
+        """Rit-index voor een API-naam, of None (zonder cache; zie resolve)."""
+        key = normalize(name)
+        if key in self._aliases: return self._aliases[key]
+        head = normalize(re.split(r":| - | – ", name, maxsplit=1)[0])
+        if head in self._aliases: return self._aliases[head]
+        close = difflib.get_close_matches(key, list(self._aliases), n=1, cutoff=FUZZY_CUTOFF)
+        return self._aliases[close[0]] if close else None
+
+    def resolve(self, upstream_id, name):
+        """Zoals match, maar onthouden per upstream id (of naam als de API geen id geeft); -1 = onbekend."""
+        key = upstream_id if upstream_id is not None else name
+        idx = self._by_upstream.get(key)
+        if idx is None:
+            with self._lock:
+                found = self.match(name)
+                idx = self._by_upstream[key] = NOT_REPORTED if found is None else found
+                if found is None:
+                    print(f"⚠️ Onbekende attractie in de API ({self.park_name}): '{name.strip()}'")
+                    self.unmatched[name.strip()] = upstream_id
+        return idx
+
+    def parse(self, data):
+        """
+        queue_times.json in één pass naar een int16-array over self.rides: wachttijd, CLOSED_WAIT als dicht,
+        NOT_REPORTED als de API de rit niet noemt. Zowel de ritten per land als die zonder land tellen mee.
+        """
+        waits = np.full(len(self.rides), NOT_REPORTED, dtype=np.int16)
+        groups = [land.get('rides', []) for land in data.get('lands', [])] + [data.get('rides', [])]
+        for group in groups:
+            for ride in group:
+                idx = self.resolve(ride.get('id'), ride['name'])
+                if idx < 0: continue
+                waits[idx] = (ride.get('wait_time') or 0) if ride['is_open'] else CLOSED_WAIT
+        return waits
+
+    def encode(self, rides):
+        """Omgekeerde richting: {rit: {"is_open", "wait_time"}} (met onze namen) naar de snapshot-array."""
+        waits = np.full(len(self.rides), NOT_REPORTED, dtype=np.int16)
+        for name, data in rides.items():
+            idx = self.index.get(name)
+            if idx is not None: waits[idx] = (data.get('wait_time') or 0) if data.get('is_open') else CLOSED_WAIT
+        return waits
+
+    def to_rides(self, waits):
+        """Snapshot-array -> {rit: {"is_open", "wait_time"}} voor de bestaande planners (alleen gemelde ritten)."""
+        return {self.rides[i]: {"is_open": w != CLOSED_WAIT, "wait_time": int(w) if w != CLOSED_WAIT else 0}
+                for i, w in enumerate(waits.tolist()) if w != NOT_REPORTED}
+
+if __name__ == "__main__":
+    # Namen zoals queue-times ze kan sturen: spaties, hoofdletters, accenten, ondertitels, tikfouten, onbekend
+    aliases = {"Symbolica: Paleis der Fantasie": "Symbolica", "Taron ": "Taron", "Pulsar": "PULSAR"}
+    payload = {"lands": [{"rides": [
+        {"id": 1, "name": "Baron 1898", "is_open": True, "wait_time": 35},
+        {"id": 2, "name": "Symbolica: Paleis der Fantasie", "is_open": True, "wait_time": 20},
+        {"id": 3, "name": "Joris en de Draak - Vuur", "is_open": False, "wait_time": 0},
+        {"id": 4, "name": "Pirana", "is_open": True, "wait_time": 15},
+        {"id": 5, "name": "Villa  Volta ", "is_open": True, "wait_time": None},
+        {"id": 6, "name": "Fabula", "is_open": True, "wait_time": 5},
+    ]}], "rides": [{"id": 7, "name": "Droomvluch", "is_open": True, "wait_time": 10}]}
+    resolver = RideResolver("EFTELING", aliases)
+    waits = resolver.parse(payload)
+    print(resolver.to_rides(waits))
+    print("Onbekend:", resolver.unmatched)
+    resolver.parse(payload)
+    print("Tweede poll, uit de cache:", len(resolver._by_upstream), "ids |", resolver.unmatched)
+    assert (resolver.encode(resolver.to_rides(waits)) == waits).all()
+    for park, name in [("WALIBI_BELGIUM", "Pulsar"), ("PHANTASIALAND", "Winjas Fear"), ("PHANTASIALAND", "Winja's Force")]:
+        other = RideResolver(park, aliases)
+        print(f"{park} '{name}' -> {other.rides[other.match(name)]}")
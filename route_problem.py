@@ -0,0 +1,190 @@
+import datetime
+import numpy as np
+from queuequest_meta import ATTRACTION_METADATA
+import pytz
+from route_solver import calculate_transit_time, predict_grid, format_time, fetch_live_data, get_wait_forecast, resolve_time_window, resolve_start_location
+from wait_forecast import SLOT_MINUTES
+from nowcast import NOWCAST
+
+# --- CONFIGURATIE ---
+CLOSED_WAIT = 999            # Zelfde betekenis als in route_solver: attractie dicht
+LOOKAHEAD_MIN = 120          # Wachttijden ook na sluitingstijd kennen (voor de '+2 uur' urgentie)
+LIVE_WINDOW_MIN = 30         # Live data overschrijft de voorspelling voor de komende 30 minuten
+INF_MIN = 1 << 28            # "Onbereikbaar" in int32 minuten-arrays
+
+class RouteProblem:
+    """
+    Een routeprobleem in hele minuten vanaf de starttijd t0 (minuut 0) tot sluitingstijd (minuut `horizon`).
+    Locatie 0 is de startlocatie, locatie i + 1 is rides[i] (en locatie n + 1 het lunch-restaurant, als er een lunch is).
+    transit[a, b] = looptijd tussen locaties, waits[i, m] = wachttijd bij aankomst op minuut m (CLOSED_WAIT = dicht).
+    """
+
+    def __init__(self, park_name, rides, start_loc, t0, horizon, transit, waits, durations, is_must, is_live=False, lunch=None):
+        self.park_name = park_name
+        self.rides = list(rides)
+        self.start_loc = start_loc
+        self.t0 = t0
+        self.horizon = horizon
+        self.transit = transit
+        self.waits = waits
+        self.durations = durations
+        self.is_must = is_must
+        self.is_live = is_live
+        self.lunch = lunch          # None of {"restaurant", "loc", "minute", "duration"}
+        self._best_end = None
+
+    @property
+    def n(self):
+        return len(self.rides)
+
+    @property
+    def ride_transit(self):
+        """Looptijden tussen de ritten onderling (zonder start en lunch)."""
+        return self.transit[1:self.n + 1, 1:self.n + 1]
+
+    def at(self, minute):
+        return self.t0 + datetime.timedelta(minutes=int(minute))
+
+    def best_end(self):
+        """
+        best_end[i, m]: vroegste einde van rit i bij aankomst op minuut m, als je ook even mag uitstellen
+        (wachten tot de rij korter is). Kolom `horizon` is INF_MIN: na sluitingstijd kan je niet meer aankomen.
+        """
+        if self._best_end is None:
+            m = np.arange(self.horizon)
+            waits = self.waits[:, :self.horizon]
+            ends = np.where(waits >= CLOSED_WAIT, INF_MIN, m[None, :] + waits + self.durations[:, None])
+            suffix_min = np.minimum.accumulate(ends[:, ::-1], axis=1)[:, ::-1]
+            self._best_end = np.hstack([suffix_min, np.full((self.n, 1), INF_MIN)]).astype(np.int32)
+        return self._best_end
+
+    def step(self, ride, depart, arrival_at=None, location=0):
+        """
+        Eén stap zonder beslissingen: vertrek op `depart` vanaf `location`, aankomen (of later aansluiten op
+        `arrival_at`), wachten, rijden. Geeft (transit, aankomst, wachttijd, einde) of None als het niet kan.
+        """
+        transit = int(self.transit[location, ride + 1])
+        arrival = depart + transit if arrival_at is None else max(arrival_at, depart + transit)
+        if arrival >= self.horizon: return None
+        wait = int(self.waits[ride, arrival])
+        if wait >= CLOSED_WAIT: return None
+        return transit, arrival, wait, arrival + wait + int(self.durations[ride])
+
+def ride_waits_per_minute(park_name, rides, t0, n_minutes, forecast, live_data=None, now=None):
+    """
+    Wachttijd per attractie per minuut vanaf t0, met exact de regels van route_solver.forecast_wait:
+    live data binnen 30 minuten van nu, anders de forecast-tensor (of het model per uur) plus de nowcast-correctie.
+    """
+    waits = np.empty((len(rides), n_minutes), dtype=np.int32)
+    minutes = np.arange(n_minutes)
+    base = (t0.date() - forecast.date).days * 1440 + t0.hour * 60 + t0.minute if forecast else 0
+    missing = []
+    for i, ride in enumerate(rides):
+        row = forecast.ride_index.get(ride) if forecast else None
+        if row is None:
+            missing.append(i); continue
+        waits[i] = forecast.waits[row, np.clip((base + minutes) // SLOT_MINUTES, 0, forecast.waits.shape[1] - 1)]
+
+    if missing:
+        # Niet in de tensor (bijv. eten): het model kijkt alleen naar het uur, dus één voorspelling per uur
+        hour_of = (t0.minute + minutes) // 60
+        hours = [t0.replace(minute=0) + datetime.timedelta(hours=int(h)) for h in range(int(hour_of[-1]) + 1)]
+        hourly = predict_grid(park_name, [rides[i] for i in missing], hours)
+        waits[missing] = hourly[:, hour_of]
+
+    if live_data:
+        if now is None: now = datetime.datetime.now(t0.tzinfo)
+        delta = minutes - (now - t0).total_seconds() / 60
+        window = (delta >= 0) & (delta < LIVE_WINDOW_MIN)
+        NOWCAST.adjust(park_name, rides, t0.timestamp() + 60 * minutes, waits, window, CLOSED_WAIT)
+        if window.any():
+            for i, ride in enumerate(rides):
+                data = live_data.get(ride)
+                if data is not None: waits[i, window] = data['wait_time'] if data['is_open'] else CLOSED_WAIT
+    return waits
+
+def build_problem(park_name, rides, start_loc, start_time, park_close, pace, forecast, live_data=None, must_haves=(), lunch_config=None, now=None):
+    """Zet een wensenlijst om naar een RouteProblem (transit-matrix + wachttijd per minuut)."""
+    horizon = int((park_close - start_time).total_seconds() // 60)
+    locations = [start_loc] + list(rides) + ([lunch_config['restaurant']] if lunch_config else [])
+    transit = np.array([[calculate_transit_time(park_name, a, b, pace) for b in locations] for a in locations], dtype=np.int32)
+    waits = ride_waits_per_minute(park_name, rides, start_time, horizon + LOOKAHEAD_MIN, forecast, live_data, now)
+    durations = np.array([ATTRACTION_METADATA.get(r, {}).get('duration_min', 5) for r in rides], dtype=np.int32)
+    is_must = np.array([r in must_haves for r in rides], dtype=bool)
+    lunch = None
+    if lunch_config:
+        lunch_dt = pytz.timezone('Europe/Brussels').localize(datetime.datetime.combine(start_time.date(), lunch_config['time']))
+        lunch = {"restaurant": lunch_config['restaurant'], "loc": len(rides) + 1, "duration": lunch_config['duration'],
+                 "minute": int((lunch_dt - start_time).total_seconds() // 60)}
+    return RouteProblem(park_name, rides, start_loc, start_time, horizon, transit, waits, durations, is_must, is_live=bool(live_data), lunch=lunch)
+
+def problem_from_request(park_name, must_haves, should_haves, start_str, end_str, start_location="Unknown", lunch_config=None, pace_factor=1.0, now=None):
+    """
+    Dezelfde voorbereiding als solve_route_with_priorities (tijdvenster, live data, gesloten attracties,
+    startlocatie), maar als RouteProblem. Geeft (problem, closed_rides); problem is None als er niets te plannen valt.
+    `now` wordt doorgegeven aan resolve_time_window (vaste klok = reproduceerbaar probleem).
+    """
+    now, current_time, park_close = resolve_time_window(start_str, end_str, now)
+    is_simulating_now = (abs((current_time - now).total_seconds()) < 3600)
+    live_data = fetch_live_data(park_name) if is_simulating_now else {}
+    rides = list(dict.fromkeys(must_haves + should_haves))
+    closed_rides = [r for r in rides if is_simulating_now and r in live_data and not live_data[r]['is_open']]
+    rides = [r for r in rides if r not in closed_rides]
+    if not rides: return None, closed_rides
+    problem = build_problem(park_name, rides, resolve_start_location(park_name, start_location), current_time, park_close,
+                            pace_factor, get_wait_forecast(park_name, current_time.date()), live_data, must_haves, lunch_config, now)
+    return problem, closed_rides
+
+def itinerary_step(problem, ride, depart, transit, arrival, wait, note=None, kind=None):
+    """Een stap in hetzelfde formaat als de greedy solvers (pas hier worden minuten weer kloktijden)."""
+    ride_start = arrival + wait
+    ride_end = ride_start + int(problem.durations[ride])
+    return {
+        "ride": problem.rides[ride], "type": kind or ("MUST" if problem.is_must[ride] else "SHOULD"),
+        "start_walk": format_time(problem.at(depart)), "walk_min": int(transit),
+        "arrival_time": format_time(problem.at(arrival)), "wait_min": int(wait),
+        "ride_start": format_time(problem.at(ride_start)), "ride_end": format_time(problem.at(ride_end)),
+        "note": note or ("⚡ Live" if problem.is_live else "🔮 Forecast")
+    }
+
+def lunch_step(problem, depart, walk):
+    arrival = depart + walk
+    return {
+        "ride": f"🍽️ Lunch: {problem.lunch['restaurant']}", "type": "LUNCH", "start_walk": format_time(problem.at(depart)),
+        "walk_min": int(walk), "arrival_time": format_time(problem.at(arrival)), "wait_min": 0,
+        "ride_start": format_time(problem.at(arrival)), "ride_end": format_time(problem.at(arrival + problem.lunch['duration'])),
+        "note": "Pauze"
+    }
+
+def emit_order(problem, order):
+    """
+    Rekent een vaste volgorde door (lunch op hetzelfde moment als de greedy loop, elke rij aansluiten op het
+    moment dat het vroegst klaar is) en geeft (itinerary, overgeslagen ritten) in het formaat van de solvers.
+    Ritten die niet meer passen of de hele dag dicht zijn worden overgeslagen.
+    """
+    best_end = problem.best_end()
+    lunch = problem.lunch
+    itinerary, skipped, done = [], [], set()
+    clock, location, lunch_done = 0, 0, False
+    for ride in order:
+        if clock >= problem.horizon: break
+        if lunch and not lunch_done and clock >= lunch['minute']:
+            walk = int(problem.transit[location, lunch['loc']])
+            itinerary.append(lunch_step(problem, clock, walk))
+            clock, location, lunch_done = clock + walk + lunch['duration'], lunch['loc'], True
+            if clock >= problem.horizon: break
+        earliest = clock + int(problem.transit[location, ride + 1])
+        target = best_end[ride, min(earliest, problem.horizon)]
+        if target >= INF_MIN: continue
+        # Eerste aankomstminuut die dat vroegste einde echt haalt (zo min mogelijk uitstel)
+        minutes = np.arange(earliest, problem.horizon)
+        ends = minutes + problem.waits[ride, earliest:problem.horizon] + problem.durations[ride]
+        arrival = earliest + int(np.argmax((ends == target) & (problem.waits[ride, earliest:problem.horizon] < CLOSED_WAIT)))
+        transit, arrival, wait, end = problem.step(ride, clock, arrival_at=arrival, location=location)
+        depart = arrival - transit
+        note = ("⚡ Live" if problem.is_live else "🔮 Forecast") + (f" · ⏸️ {depart - clock} min pauze" if depart > clock else "")
+        itinerary.append(itinerary_step(problem, ride, depart, transit, arrival, wait, note))
+        clock, location = end, ride + 1
+        done.add(ride)
+    skipped = [r for i, r in enumerate(problem.rides) if i not in done]
+    return itinerary, skipped
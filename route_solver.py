@@ -1,256 +1,228 @@
-import pandas as pd
 import numpy as np
 import datetime
-import requests
-import joblib
 import pytz
-import streamlit as st  # Nodig voor Caching
-from copy import deepcopy
+from wait_forecast import ForecastCache
+from feature_utils import build_feature_matrix
+import model_store
+from live_data import live_snapshot, on_snapshot
+from nowcast import NOWCAST
 
 # --- 0. CONFIGURATIE & IMPORTS ---
-MODEL_FILE = "queuequest_model.pkl"
-PARK_IDS = {"EFTELING": 160, "PHANTASIALAND": 56, "WALIBI_BELGIUM": 14}
-
 # Probeer helpers te laden
 try:
     from queuequest_meta import ATTRACTION_METADATA
     from holiday_utils import is_crowd_risk_day
-    from distance_utils import get_travel_time
+    from distance_utils import get_travel_time, get_transit_matrix, phl_zone_minutes, PHL_LOCATIONS
 except ImportError:
     ATTRACTION_METADATA = {}
+    PHL_LOCATIONS = {}
     def is_crowd_risk_day(date): return False
     def get_travel_time(start, end): return 10
+    def get_transit_matrix(park_name, use_zones=None): return None
+    def phl_zone_minutes(zone_a, zone_b): return 4 if zone_a == zone_b else 12
 
-# API Mappings
-API_NAME_MAPPING = {
-    "Fairytale Forest": "Sprookjesbos", "The Six Swans": "De Zes Zwanen",
-    "Stoomtrein Marerijk": "Stoomtrein", "Stoomtrein Ruigrijk": "Stoomtrein",
-    "Max & Moritz": "Max & Moritz", "Symbolica: Paleis der Fantasie": "Symbolica", 
-    "Black Mamba ": "Black Mamba", "Taron ": "Taron",
-    "Cobra": "Cobra", "Pulsar": "Pulsar"
-}
-
-# Phantasialand Loopmatrix
-PHL_LOCATIONS = {
-    "Ingang": "Berlin", "Maus au Chocolat": "Berlin",
-    "Taron": "Klugheim", "Raik": "Klugheim",
-    "River Quest": "Mystery", "Mystery Castle": "Mystery",
-    "F.L.Y.": "Rookburgh", "Black Mamba": "Africa", "Deep in Africa": "Africa",
-    "Talocan": "Mexico", "Chiapas": "Mexico", "Colorado Adventure": "Mexico",
-    "Winja's Fear": "Wuze Town", "Winja's Force": "Wuze Town", "Crazy Bats": "Wuze Town",
-    "Feng Ju Palace": "China", "Geister Rikscha": "China"
-}
-
-PHL_WALK_MATRIX = {
-    ("Berlin", "Rookburgh"): 2, ("Berlin", "Mexico"): 5, ("Berlin", "China"): 8, 
-    ("Berlin", "Klugheim"): 6, ("Berlin", "Africa"): 8, ("Klugheim", "Mexico"): 3,
-    ("Klugheim", "China"): 4, ("Klugheim", "Africa"): 4, ("Klugheim", "Rookburgh"): 8, 
-    ("Mexico", "Africa"): 3, ("Rookburgh", "Wuze Town"): 6
-}
-
-# --- 1. MODEL LADEN (GEOPTIMALISEERD MET CACHING) ---
-MODEL = None
-ENCODERS = None
-FEATURES = None
+# --- 1. MODEL (LAZY: PAS GELADEN BIJ DE EERSTE VOORSPELLING, ÉÉN KEER PER PROCES) ---
+# Zie model_store.get_pipeline(); importeren van deze module laadt niets.
 
-@st.cache_resource(show_spinner=False)
-def load_model_pipeline():
-    print(f"📥 Proberen model te laden: {MODEL_FILE}...")
-    return joblib.load(MODEL_FILE)
-
-try:
-    PIPELINE = load_model_pipeline()
-    MODEL = PIPELINE["model"]
-    ENCODERS = PIPELINE["encoders"]
-    FEATURES = PIPELINE["features"]
-except Exception as e:
-    print(f"⚠️ WAARSCHUWING: Model niet geladen. Fallback naar heuristiek. Fout: {e}")
-    MODEL = None
-
-# --- 2. DATA FETCHING (GEOPTIMALISEERD MET CACHING) ---
-@st.cache_data(ttl=300, show_spinner=False)
+# --- 2. LIVE DATA (ACHTERGROND-POLLER, ZIE live_data.py) ---
 def fetch_live_data(park_name):
-    park_id = PARK_IDS.get(park_name)
-    if not park_id: return {}
-    headers = {'User-Agent': 'Mozilla/5.0 (QueueQuestBot/2.0)', 'Accept': 'application/json'}
-    try:
-        resp = requests.get(f"https://queue-times.com/parks/{park_id}/queue_times.json", headers=headers, timeout=5)
-        if resp.status_code != 200: return {}
-        data = resp.json()
-        live = {}
-        for land in data.get('lands', []):
-            for ride in land.get('rides', []):
-                raw_name = ride['name'].strip()
-                clean_name = API_NAME_MAPPING.get(raw_name, raw_name)
-                final_name = clean_name
-                if clean_name not in ATTRACTION_METADATA and raw_name in ATTRACTION_METADATA:
-                    final_name = raw_name
-                wait = ride.get('wait_time', 0)
-                live[final_name] = {"is_open": ride['is_open'], "wait_time": wait if wait is not None else 0}
-        return live
-    except Exception as e:
-        print(f"❌ API Fout: {e}")
-        return {}
+    """Laatste live snapshot van het park; de poller haalt op, een sessie raakt het netwerk nooit."""
+    snapshot = live_snapshot(park_name)
+    return snapshot.rides if snapshot else {}
 
 # --- 3. TRANSIT & UTILS (MET PACE FACTOR) ---
 def calculate_transit_time(park, start, end, pace=1.0):
+    # Snel pad: één array-lookup in de voorberekende matrix van het park
+    matrix = get_transit_matrix(park)
+    if matrix is not None:
+        minutes = matrix.travel_time(start, end, pace)
+        if minutes is not None: return minutes
+
+    # Locaties buiten de matrix (bijv. "Unknown")
     base_time = 10 
     if start == end: 
         base_time = 0
     elif start == "Unknown" or end == "Unknown": 
         base_time = 10
     elif park == "PHANTASIALAND":
-        zone_a = PHL_LOCATIONS.get(start, "Berlin")
-        zone_b = PHL_LOCATIONS.get(end, "Berlin")
-        if zone_a == zone_b: 
-            base_time = 4
-        else:
-            pair = tuple(sorted((zone_a, zone_b)))
-            found = False
-            for k, v in PHL_WALK_MATRIX.items():
-                if set(k) == set(pair): 
-                    base_time = v
-                    found = True
-                    break
-            if not found: base_time = 12
+        base_time = phl_zone_minutes(PHL_LOCATIONS.get(start, "Berlin"), PHL_LOCATIONS.get(end, "Berlin"))
     else:
         base_time = get_travel_time(start, end)
     return int(base_time * pace)
 
 def format_time(dt): return dt.strftime('%H:%M')
 
-# --- 4. PREDICTIE ENGINE ---
-def get_wait_time_prediction(park_name, ride_name, query_time, live_data_snapshot=None, weather_override=None):
-    tz = query_time.tzinfo
-    now = datetime.datetime.now(tz) if tz else datetime.datetime.now()
-    minutes_delta = (query_time - now).total_seconds() / 60
-    
-    if not weather_override and live_data_snapshot and 0 <= minutes_delta < 30:
-        if ride_name in live_data_snapshot:
-            data = live_data_snapshot[ride_name]
-            if not data['is_open']: return 999 
-            return data['wait_time']
+def resolve_time_window(start_str, end_str, now=None):
+    """
+    Start- en sluitingstijd als tz-aware datetimes (een starttijd > 6u geleden betekent: morgen).
+    `now` (klok + datum) kan worden meegegeven; zonder tijdzone geldt Brusselse tijd. Zelfde `now` = zelfde route.
+    """
+    if start_str is None: start_str = "10:00"
+    tz = pytz.timezone('Europe/Brussels')
+    if now is None: now = datetime.datetime.now(tz)
+    elif now.tzinfo is None: now = tz.localize(now)
+    sh, sm = map(int, start_str.split(':'))
+    eh, em = map(int, end_str.split(':'))
+    current_time = tz.localize(datetime.datetime.combine(now.date(), datetime.time(sh, sm)))
+    park_close = tz.localize(datetime.datetime.combine(now.date(), datetime.time(eh, em)))
+    if (now - current_time).total_seconds() > 6 * 3600:
+        current_time += datetime.timedelta(days=1)
+        park_close += datetime.timedelta(days=1)
+    if park_close <= current_time: park_close += datetime.timedelta(days=1)
+    return now, current_time, park_close
+
+def resolve_start_location(park_name, location):
+    """Zonder bekende locatie starten we bij de eerste attractie na de ingang."""
+    if location in ["Unknown", "Ingang"]:
+        return "Maus au Chocolat" if park_name == "PHANTASIALAND" else ("Fabula" if park_name == "EFTELING" else "Loup-Garou")
+    return location
 
-    if MODEL:
+# --- 4. PREDICTIE ENGINE ---
+def predict_grid(park_name, rides, times, weather=None, live_data_snapshot=None, now=None):
+    """
+    Voorspelt wachttijden voor alle (attractie, tijdstip) combinaties in één model-call.
+    Geeft een int-array terug met vorm (len(rides), len(times)); rij i hoort bij rides[i].
+    """
+    rides, times = list(rides), list(times)
+    n_r, n_t = len(rides), len(times)
+    hours = np.array([t.hour for t in times], dtype=int)
+    # Heuristiek als er geen (werkend) model is
+    grid = np.tile(np.where((hours >= 11) & (hours <= 16), 10, 10 + 25), (n_r, 1))
+    pipeline = model_store.get_pipeline() if n_r and n_t else None
+    if pipeline:
         try:
-            meta = ATTRACTION_METADATA.get(ride_name, {})
-            w_temp, w_precip, w_cond = (weather_override.get('temp_c', 15.0), weather_override.get('precip_mm', 0.0), weather_override.get('condition', 'Cloudy')) if weather_override else (15.0, 0.0, 'Cloudy')
-            input_data = {
-                'attraction_name': ride_name, 'park_name': park_name,
-                'temp_c': w_temp, 'precip_mm': w_precip, 'weather_condition': w_cond,
-                'day_of_week': query_time.isoweekday(), 'hour_of_day': query_time.hour,
-                'is_holiday': is_crowd_risk_day(query_time),
-                'type': meta.get('type', 'Unknown'), 'zone': meta.get('zone', 'Unknown'),
-                'capacity': meta.get('capacity', 1000), 'is_indoor': meta.get('is_indoor', 0),
-                'hour_sin': np.sin(2 * np.pi * query_time.hour / 24), 'hour_cos': np.cos(2 * np.pi * query_time.hour / 24),
-                'day_sin': np.sin(2 * np.pi * query_time.isoweekday() / 7), 'day_cos': np.cos(2 * np.pi * query_time.isoweekday() / 7)
-            }
-            row = pd.DataFrame([input_data])
-            def safe_transform(enc, val):
-                try: return enc.transform([val])[0] if val in enc.classes_ else 0
-                except: return 0
-            if ENCODERS:
-                row['park_encoded'] = safe_transform(ENCODERS.get('park'), park_name)
-                row['ride_encoded'] = safe_transform(ENCODERS.get('ride'), ride_name)
-                row['type_encoded'] = safe_transform(ENCODERS.get('type'), row['type'][0])
-                row['weather_encoded'] = safe_transform(ENCODERS.get('weather'), w_cond)
-            final_input = row[FEATURES] if FEATURES else row
-            pred = MODEL.predict(final_input)[0]
-            return int(5 * round(max(0, pred) / 5))
+            w_temp, w_precip, w_cond = (weather.get('temp_c', 15.0), weather.get('precip_mm', 0.0), weather.get('condition', 'Cloudy')) if weather else (15.0, 0.0, 'Cloudy')
+            days = np.array([t.isoweekday() for t in times], dtype=int)
+            holidays = np.array([is_crowd_risk_day(t) for t in times], dtype=int)
+            if pipeline.get("grid"):
+                # Voorberekend grid: één array-index (valt zelf terug op het model buiten het grid)
+                preds = pipeline["grid"].predict(park_name, rides, days, hours, holidays, w_temp, w_precip, w_cond)
+            else:
+                X = build_feature_matrix(pipeline["features"], pipeline["encoding_tables"], park_name, rides, days, hours, holidays, w_temp, w_precip, w_cond)
+                preds = pipeline["predictor"].predict(X).reshape(n_r, n_t)
+            grid = (5 * np.round(np.maximum(preds, 0) / 5)).astype(int)
         except: pass
-    return 10 if 11 <= query_time.hour <= 16 else 10 + 25
+
+    # Live data overschrijft de voorspelling voor de komende 30 minuten, daarna de nowcast-correctie (tot 2 uur)
+    if not weather and live_data_snapshot and n_t:
+        if now is None: now = datetime.datetime.now(times[0].tzinfo)
+        window = [0 <= (query_time - now).total_seconds() / 60 < 30 for query_time in times]
+        NOWCAST.adjust(park_name, rides, [t.timestamp() for t in times], grid, window)
+        for j, query_time in enumerate(times):
+            if not window[j]: continue
+            for i, ride_name in enumerate(rides):
+                if ride_name in live_data_snapshot:
+                    data = live_data_snapshot[ride_name]
+                    grid[i, j] = data['wait_time'] if data['is_open'] else 999
+    return grid
+
+def get_wait_time_prediction(park_name, ride_name, query_time, live_data_snapshot=None, weather_override=None, now=None):
+    return int(predict_grid(park_name, [ride_name], [query_time], weather=weather_override, live_data_snapshot=live_data_snapshot, now=now)[0, 0])
+
+# --- 4b. FORECAST CACHE (ride x 5-min slot per park/dag/weer) ---
+FORECAST_CACHE = ForecastCache()
+def on_model_swap(changed_parks):
+    """
+    Na een model hot-swap: forecasts zonder weer (en nowcast-residuen) alleen van parken met gewijzigde forecasts,
+    forecasts met een weerscenario altijd (die dekt de vingerafdruk niet).
+    """
+    FORECAST_CACHE.invalidate(changed_parks, with_weather=True)
+    NOWCAST.reset(changed_parks)
+
+model_store.on_swap(on_model_swap)
+
+def get_wait_forecast(park_name, date, weather=None):
+    return FORECAST_CACHE.get(park_name, date, predict_grid, weather=weather)
+
+def observe_live(snapshot):
+    """Elke live meting voedt de nowcast: het residu t.o.v. de forecast van vandaag op het meetmoment."""
+    moment = datetime.datetime.fromtimestamp(snapshot.fetched_at, pytz.timezone('Europe/Brussels'))
+    forecast = get_wait_forecast(snapshot.park_name, moment.date())
+    # Snapshot-array en forecast-tensor hebben dezelfde rit-volgorde (get_park_rides): één kolom, geen dict
+    NOWCAST.observe(snapshot.park_name, snapshot.fetched_at, forecast.rides, snapshot.waits, forecast.waits[:, forecast.slot(moment)])
+
+on_snapshot(observe_live)
+
+def forecast_wait(forecast, park_name, ride_name, query_time, live_data_snapshot=None, now=None):
+    """Zelfde antwoord als get_wait_time_prediction, maar uit de voorberekende forecast."""
+    in_window = False
+    if live_data_snapshot:
+        if now is None: now = datetime.datetime.now(query_time.tzinfo)
+        in_window = 0 <= (query_time - now).total_seconds() / 60 < 30
+        if in_window and ride_name in live_data_snapshot:
+            data = live_data_snapshot[ride_name]
+            return data['wait_time'] if data['is_open'] else 999
+    wait = forecast.lookup(ride_name, query_time) if forecast else None
+    if wait is None: return get_wait_time_prediction(park_name, ride_name, query_time, live_data_snapshot=live_data_snapshot, now=now)
+    if live_data_snapshot: wait = int(NOWCAST.adjust(park_name, [ride_name], [query_time.timestamp()], np.array([[wait]]), [in_window])[0, 0])
+    return wait
 
 # --- 5. SCORE CALCULATOR ---
-def calculate_dynamic_score(park_name, candidate, current_loc, arrival_time, live_data, pace=1.0):
+def calculate_dynamic_score(park_name, candidate, current_loc, arrival_time, live_data, pace=1.0, forecast=None, now=None):
     transit = calculate_transit_time(park_name, current_loc, candidate, pace)
-    wait_at_arrival = get_wait_time_prediction(park_name, candidate, arrival_time, live_data)
-    if wait_at_arrival >= 999: return float('inf'), transit, wait_at_arrival
     future_time = arrival_time + datetime.timedelta(hours=2)
-    wait_in_future = get_wait_time_prediction(park_name, candidate, future_time, live_data)
+    if forecast is None:
+        wait_at_arrival, wait_in_future = (int(w) for w in predict_grid(park_name, [candidate], [arrival_time, future_time], live_data_snapshot=live_data, now=now)[0])
+    else:
+        wait_at_arrival = forecast_wait(forecast, park_name, candidate, arrival_time, live_data, now)
+        wait_in_future = forecast_wait(forecast, park_name, candidate, future_time, live_data, now)
+    if wait_at_arrival >= 999: return float('inf'), transit, wait_at_arrival
     urgency_bonus = -20 if wait_in_future > (wait_at_arrival + 15) else (15 if wait_in_future < (wait_at_arrival - 10) else 0)
     total_score = max(transit, transit + wait_at_arrival + urgency_bonus)
     return total_score, transit, wait_at_arrival
 
 # --- 6. MAX SCORE SOLVER (MET ANTI-REPETITIE) ---
-def solve_max_score_route(park_name, start_str, end_str, start_location="Ingang", pace_factor=1.0):
-    if start_str is None: start_str = "10:00"
-    tz = pytz.timezone('Europe/Brussels')
-    now = datetime.datetime.now(tz)
-    sh, sm = map(int, start_str.split(':'))
-    eh, em = map(int, end_str.split(':'))
-    current_time = tz.localize(datetime.datetime.combine(now.date(), datetime.time(sh, sm)))
-    park_close = tz.localize(datetime.datetime.combine(now.date(), datetime.time(eh, em)))
-    if (now - current_time).total_seconds() > 6 * 3600:
-        current_time += datetime.timedelta(days=1)
-        park_close += datetime.timedelta(days=1)
-    if park_close <= current_time: park_close += datetime.timedelta(days=1)
+# Beide solvers rekenen in hele minuten vanaf de starttijd (route_problem.RouteProblem). Per stap worden alle
+# kandidaten tegelijk gescoord: één rij uit de transit-matrix, één gather uit de wachttijden, maskers voor
+# bezocht / dicht / na sluitingstijd. Bij gelijke scores wint de eerste kandidaat, net als in de oude lus.
+def solve_max_score_route(park_name, start_str, end_str, start_location="Ingang", pace_factor=1.0, now=None):
+    from route_problem import build_problem, itinerary_step  # route_problem importeert zelf deze module
+    now, current_time, park_close = resolve_time_window(start_str, end_str, now)
 
     is_simulating_now = (abs((current_time - now).total_seconds()) < 3600)
     live_data = fetch_live_data(park_name) if is_simulating_now else {}
     candidates = [r for r, m in ATTRACTION_METADATA.items() if m.get('park') == park_name and m.get('score', 0) > 0 and m.get('type') not in ['Restaurant', 'Snack']]
     if is_simulating_now and live_data:
         candidates = [c for c in candidates if live_data.get(c, {}).get('is_open', True)]
+    if not candidates: return [], [], []
 
-    itinerary = []
     current_loc = start_location if start_location != "Unknown" else "Ingang"
-    ride_counts = {c: 0 for c in candidates}
-
-    while current_time < park_close:
-        best_cand, best_roi, best_det = None, -1, {}
-        last_ride = itinerary[-1]['ride'] if itinerary else None
+    p = build_problem(park_name, candidates, current_loc, current_time, park_close, pace_factor,
+                      get_wait_forecast(park_name, current_time.date()), live_data, now=now)
+    ids = np.arange(p.n)
+    quality = np.array([ATTRACTION_METADATA[c].get('score', 5) for c in candidates])
+    no_repeat = quality < 7                       # Anti-repetitie: score < 7 niet twee keer na elkaar
+    ride_counts = np.zeros(p.n, dtype=int)
+    decay = np.ones(p.n)                          # 0.7 ** ride_counts, met Python-floats bijgehouden
 
-        for cand in candidates:
-            transit = calculate_transit_time(park_name, current_loc, cand, pace_factor)
-            arrival = current_time + datetime.timedelta(minutes=transit)
-            if arrival >= park_close: continue
-            wait = get_wait_time_prediction(park_name, cand, arrival, live_data)
-            if wait >= 999: continue
-            
-            # --- ANTI-REPETITIE LOGICA ---
-            ride_quality = ATTRACTION_METADATA[cand].get('score', 5)
-            if cand == last_ride and ride_quality < 7:
-                continue # Skip als score < 7 en herhaling
-
-            duration = ATTRACTION_METADATA[cand].get('duration_min', 5)
-            cost_minutes = max(5, transit + wait + duration)
-            decay = 0.7 ** ride_counts[cand] 
-            roi = (ride_quality * decay) / cost_minutes
-
-            if roi > best_roi:
-                best_roi, best_cand, best_det = roi, cand, {"transit": transit, "wait": wait, "arrival": arrival, "duration": duration}
+    itinerary = []
+    clock, loc, last_ride = 0, 0, None
+    while clock < p.horizon:
+        transit = p.transit[loc, 1:p.n + 1]
+        arrival = clock + transit
+        ok = arrival < p.horizon
+        wait = p.waits[ids, np.minimum(arrival, p.horizon - 1)]
+        ok &= wait < 999
+        if last_ride is not None and no_repeat[last_ride]: ok[last_ride] = False
+        if not ok.any(): break
 
-        if not best_cand: break
-        ride_start = best_det['arrival'] + datetime.timedelta(minutes=best_det['wait'])
-        ride_end = ride_start + datetime.timedelta(minutes=best_det['duration'])
-        itinerary.append({
-            "ride": best_cand, "type": "SCORE", "start_walk": format_time(current_time), 
-            "walk_min": int(best_det['transit']), "arrival_time": format_time(best_det['arrival']), 
-            "wait_min": int(best_det['wait']), "ride_start": format_time(ride_start), 
-            "ride_end": format_time(ride_end), "note": f"Rit #{ride_counts[best_cand] + 1}"
-        })
-        current_time, current_loc = ride_end, best_cand
-        ride_counts[best_cand] += 1
+        roi = np.where(ok, (quality * decay) / np.maximum(5, transit + wait + p.durations), -1.0)
+        best = int(roi.argmax())
+        itinerary.append(itinerary_step(p, best, clock, int(transit[best]), int(arrival[best]), int(wait[best]), note=f"Rit #{ride_counts[best] + 1}", kind="SCORE"))
+        clock, loc, last_ride = int(arrival[best] + wait[best] + p.durations[best]), best + 1, best
+        ride_counts[best] += 1
+        decay[best] = 0.7 ** int(ride_counts[best])
     return itinerary, [], []
 
 # --- 7. STANDAARD SOLVER (MET ANTI-REPETITIE) ---
-def solve_route_with_priorities(park_name, must_haves, should_haves, start_str, end_str, start_location="Unknown", lunch_config=None, pace_factor=1.0):
-    if start_str is None: start_str = "10:00"
-    tz = pytz.timezone('Europe/Brussels')
-    now = datetime.datetime.now(tz)
-    sh, sm = map(int, start_str.split(':'))
-    eh, em = map(int, end_str.split(':'))
-    current_time = tz.localize(datetime.datetime.combine(now.date(), datetime.time(sh, sm)))
-    park_close = tz.localize(datetime.datetime.combine(now.date(), datetime.time(eh, em)))
-    if (now - current_time).total_seconds() > 6 * 3600:
-        current_time += datetime.timedelta(days=1)
-        park_close += datetime.timedelta(days=1)
-    if park_close <= current_time: park_close += datetime.timedelta(days=1)
+def solve_route_with_priorities(park_name, must_haves, should_haves, start_str, end_str, start_location="Unknown", lunch_config=None, pace_factor=1.0, now=None):
+    from route_problem import build_problem, itinerary_step, lunch_step
+    now, current_time, park_close = resolve_time_window(start_str, end_str, now)
 
     is_simulating_now = (abs((current_time - now).total_seconds()) < 3600)
     live_data = fetch_live_data(park_name) if is_simulating_now else {}
     
-    lunch_done = False
-    lunch_dt = tz.localize(datetime.datetime.combine(current_time.date(), lunch_config['time'])) if lunch_config else None
+    # De (set-)volgorde bepaalt wie wint bij gelijke scores: niet veranderen
     unvisited = list(set(must_haves + should_haves))
     closed_rides = []
     
@@ -258,46 +230,45 @@ def solve_route_with_priorities(park_name, must_haves, should_haves, start_str,
         for ride in list(unvisited):
             if ride in live_data and not live_data[ride]['is_open']:
                 closed_rides.append(ride); unvisited.remove(ride)
+    if not unvisited: return [], closed_rides, []
 
-    itinerary, current_loc, skipped = [], start_location, []
-    if current_loc in ["Unknown", "Ingang"]:
-        current_loc = "Maus au Chocolat" if park_name == "PHANTASIALAND" else ("Fabula" if park_name == "EFTELING" else "Loup-Garou")
-
-    while unvisited:
-        if current_time >= park_close: skipped = list(unvisited); break
-        if lunch_config and not lunch_done and current_time >= lunch_dt:
-            rest = lunch_config['restaurant']
-            walk = calculate_transit_time(park_name, current_loc, rest, pace_factor)
-            arr = current_time + datetime.timedelta(minutes=walk)
-            fin = arr + datetime.timedelta(minutes=lunch_config['duration'])
-            itinerary.append({"ride": f"🍽️ Lunch: {rest}", "type": "LUNCH", "start_walk": format_time(current_time), "walk_min": int(walk), "arrival_time": format_time(arr), "wait_min": 0, "ride_start": format_time(arr), "ride_end": format_time(fin), "note": "Pauze"})
-            current_time, current_loc, lunch_done = fin, rest, True; continue
+    p = build_problem(park_name, unvisited, resolve_start_location(park_name, start_location), current_time, park_close, pace_factor,
+                      get_wait_forecast(park_name, current_time.date()), live_data, must_haves, lunch_config, now=now)
+    ids = np.arange(p.n)
+    quality = np.array([ATTRACTION_METADATA.get(r, {}).get('score', 5) for r in p.rides])
+    repeat_penalty = np.where(quality < 7, 500, 20)               # Anti-repetitie: lage kwaliteit zwaar bestraft
+    weight = np.array([1.3 if r in should_haves else 1.0 for r in p.rides])
+    note = "⚡ Live" if is_simulating_now else "🔮 Forecast"
 
-        best_cand, best_score, best_det = None, float('inf'), {}
-        last_ride = itinerary[-1]['ride'] if itinerary and itinerary[-1]['type'] != 'LUNCH' else None
+    itinerary = []
+    visited = np.zeros(p.n, dtype=bool)
+    clock, loc, last_ride, lunch_done = 0, 0, None, False
+    while not visited.all():
+        if clock >= p.horizon: break
+        if p.lunch and not lunch_done and clock >= p.lunch['minute']:
+            walk = int(p.transit[loc, p.lunch['loc']])
+            itinerary.append(lunch_step(p, clock, walk))
+            clock, loc, last_ride, lunch_done = clock + walk + p.lunch['duration'], p.lunch['loc'], None, True; continue
 
-        for candidate in unvisited:
-            temp_transit = calculate_transit_time(park_name, current_loc, candidate, pace_factor)
-            temp_arrival = current_time + datetime.timedelta(minutes=temp_transit)
-            if temp_arrival >= park_close: continue
-            score, transit, wait = calculate_dynamic_score(park_name, candidate, current_loc, temp_arrival, live_data, pace_factor)
-            
-            # --- ANTI-REPETITIE LOGICA ---
-            ride_quality = ATTRACTION_METADATA.get(candidate, {}).get('score', 5)
-            if candidate == last_ride:
-                if ride_quality < 7: score += 500 # Penalty voor lage kwaliteit herhaling
-                else: score += 20 # Kleine drempel voor hoge kwaliteit herhaling
+        transit = p.transit[loc, 1:p.n + 1]
+        arrival = clock + transit
+        ok = ~visited & (arrival < p.horizon)
+        arrival = np.minimum(arrival, p.horizon - 1)
+        wait = p.waits[ids, arrival]
+        ok &= wait < 999
+        if not ok.any(): break
 
-            if candidate in should_haves: score *= 1.3 
-            if score < best_score:
-                best_score, best_cand, best_det = score, candidate, {"transit": transit, "wait": wait, "arrival": temp_arrival}
+        # calculate_dynamic_score (wachttijd nu tegenover over 2 uur) + anti-repetitie + should-weging
+        future = p.waits[ids, arrival + 120]
+        urgency_bonus = np.where(future > wait + 15, -20, np.where(future < wait - 10, 15, 0))
+        score = np.maximum(transit, transit + wait + urgency_bonus).astype(float)
+        if last_ride is not None: score[last_ride] += repeat_penalty[last_ride]
+        score *= weight
+        best = int(np.where(ok, score, np.inf).argmin())
 
-        if not best_cand: skipped = list(unvisited); break 
-        dur = ATTRACTION_METADATA.get(best_cand, {}).get('duration_min', 5)
-        ride_start = best_det['arrival'] + datetime.timedelta(minutes=best_det['wait'])
-        ride_end = ride_start + datetime.timedelta(minutes=dur)
-        itinerary.append({"ride": best_cand, "type": "MUST" if best_cand in must_haves else "SHOULD", "start_walk": format_time(current_time), "walk_min": int(best_det['transit']), "arrival_time": format_time(best_det['arrival']), "wait_min": int(best_det['wait']), "ride_start": format_time(ride_start), "ride_end": format_time(ride_end), "note": "⚡ Live" if is_simulating_now else "🔮 Forecast"})
-        current_time, current_loc = ride_end, best_cand
-        unvisited.remove(best_cand)
+        itinerary.append(itinerary_step(p, best, clock, int(transit[best]), int(arrival[best]), int(wait[best]), note))
+        clock, loc, last_ride = int(arrival[best] + wait[best] + p.durations[best]), best + 1, best
+        visited[best] = True
 
-    return itinerary, closed_rides, skipped
\ No newline at end of file
+    skipped = [r for r, v in zip(p.rides, visited) if not v]
+    return itinerary, closed_rides, skipped
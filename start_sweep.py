@@ -0,0 +1,104 @@
+import os
+import time
+from concurrent.futures import wait as wait_futures
+from multiprocessing import shared_memory
+from route_problem import problem_from_request
+from beam_solver import BeamPlanner, emit_actions
+from parallel_solver import get_pool, share_problem, attach_problem, STARTUP_GRACE_S
+
+# --- CONFIGURATIE ---
+STEP_MIN = 15
+SWEEP_BEAM_WIDTH = 8       # Per starttijd een smalle beam: tientallen starttijden moeten samen snel blijven
+TIME_BUDGET_S = 10.0       # Voor de hele sweep; daarna rekent dit proces de ontbrekende starttijden zelf
+PARALLEL_MIN_WORK = 500_000  # starttijden x ritten x beam-breedte (~4 s in één proces); kleiner kost de pool meer dan hij wint
+
+def start_offsets(first_str, last_str, step_min=STEP_MIN):
+    """Minuten vanaf first_str: 09:00-13:00 per 15 min = [0, 15, ..., 240]."""
+    (fh, fm), (lh, lm) = (map(int, t.split(':')) for t in (first_str, last_str))
+    span = (lh * 60 + lm) - (fh * 60 + fm)
+    return list(range(0, max(span, 0) + 1, step_min))
+
+def plan_offsets(problem, offsets, width=SWEEP_BEAM_WIDTH, deadline=None):
+    """
+    Eén plan per startminuut op hetzelfde probleem; geeft gewone Python data (acties + bitmasker).
+    Na de deadline (perf_counter) plant BeamPlanner greedy verder: elke starttijd krijgt nog een route.
+    """
+    results = []
+    for offset in offsets:
+        state = BeamPlanner(problem, width).plan(deadline, start=offset)
+        results.append((offset, state.path(), state.mask))
+    return results
+
+def sweep_worker(spec, offsets, width, time_budget_s):
+    # Deadline pas in de worker zetten: de klok loopt vanaf het moment dat de taak echt start
+    shm = shared_memory.SharedMemory(name=spec["shm"])
+    try:
+        return plan_offsets(attach_problem(shm, spec), offsets, width, time.perf_counter() + time_budget_s)
+    finally:
+        shm.close()
+
+def summarize(problem, offset, actions, mask):
+    """Eén rij van de tabel: wachten, lopen en overgeslagen ritten voor deze starttijd."""
+    itinerary = emit_actions(problem, actions)
+    rides = [s for s in itinerary if s['type'] != 'LUNCH']
+    skipped = [r for i, r in enumerate(problem.rides) if not (mask >> i) & 1]
+    return {
+        "start": problem.at(offset).strftime('%H:%M'), "rides": len(rides), "skipped": skipped,
+        "must_skipped": sum(1 for i in range(problem.n) if problem.is_must[i] and not (mask >> i) & 1),
+        "wait_min": sum(s['wait_min'] for s in rides), "walk_min": sum(s['walk_min'] for s in itinerary),
+        "finish": itinerary[-1]['ride_end'] if itinerary else "-", "itinerary": itinerary
+    }
+
+def sweep_start_times(park_name, must_haves, should_haves, first_str, last_str, end_str, step_min=STEP_MIN, start_location="Unknown",
+                      lunch_config=None, pace_factor=1.0, n_workers=None, width=SWEEP_BEAM_WIDTH, now=None):
+    """
+    Plant dezelfde wensenlijst voor elke starttijd van first_str t/m last_str (stap step_min); pas boven
+    PARALLEL_MIN_WORK over de process pool, daaronder is één proces sneller (geen opstart, geen IPC).
+    Alle starttijden delen één RouteProblem (forecast + transit-matrix, via shared memory naar de workers);
+    een latere start is gewoon een latere vertrekminuut. Geeft (rijen, closed_rides), beste starttijd eerst:
+    minste overgeslagen must-haves, dan minste overgeslagen ritten, dan minste wachten + lopen.
+    """
+    problem, closed_rides = problem_from_request(park_name, list(must_haves), list(should_haves), first_str, end_str, start_location, lunch_config, pace_factor, now)
+    if problem is None: return [], closed_rides
+    offsets = [o for o in start_offsets(first_str, last_str, step_min) if o < problem.horizon]
+    n_workers = min(n_workers or os.cpu_count() or 1, len(offsets)) or 1
+    if len(offsets) * problem.n * width < PARALLEL_MIN_WORK: n_workers = 1
+
+    results = []
+    if n_workers > 1:
+        shm, spec = share_problem(problem)
+        try:
+            pool = get_pool(n_workers)
+            futures = [pool.submit(sweep_worker, spec, offsets[k::n_workers], width, TIME_BUDGET_S) for k in range(n_workers)]
+            done, pending = wait_futures(futures, timeout=TIME_BUDGET_S + STARTUP_GRACE_S)
+            # Nog niet gestarte taken vrijgeven (de pool wordt gedeeld met solve_parallel); lopende stoppen op hun deadline
+            for f in pending: f.cancel()
+            results = [r for f in done if f.exception() is None for r in f.result()]
+        except Exception as e:
+            print(f"⚠️ Process pool niet beschikbaar ({e}), sweep in dit proces.")
+        finally:
+            shm.close()
+            shm.unlink()
+    missing = sorted(set(offsets) - {r[0] for r in results})
+    results += plan_offsets(problem, missing, width)
+
+    rows = [summarize(problem, *r) for r in results]
+    rows.sort(key=lambda r: (r['must_skipped'], len(r['skipped']), r['wait_min'] + r['walk_min'], r['start']))
+    return rows, closed_rides
+
+if __name__ == "__main__":
+    import time
+    import datetime
+    now = datetime.datetime(2026, 7, 14, 8, 0)
+    must = ["Baron 1898", "Symbolica", "Python", "Droomvlucht", "Vogel Rok", "Joris en de Draak", "De Vliegende Hollander"]
+    for workers in (1, 4):
+        t0 = time.perf_counter()
+        rows, _ = sweep_start_times("EFTELING", must, ["Pagode"], "09:00", "13:00", "18:00", n_workers=workers, now=now)
+        print(f"{workers} workers: {len(rows)} starttijden in {time.perf_counter() - t0:.2f}s")
+    PARALLEL_MIN_WORK = 0    # Forceer de pool: zelfde rijen (ruim binnen de deadline), maar trager bij zo weinig werk
+    t0 = time.perf_counter()
+    pooled, _ = sweep_start_times("EFTELING", must, ["Pagode"], "09:00", "13:00", "18:00", n_workers=4, now=now)
+    print(f"4 workers (pool): {len(pooled)} starttijden in {time.perf_counter() - t0:.2f}s")
+    assert [r['itinerary'] for r in pooled] == [r['itinerary'] for r in rows]
+    for r in rows[:5]:
+        print(f"  {r['start']} | {r['rides']} ritten, {len(r['skipped'])} overgeslagen | {r['wait_min']} min wachten, {r['walk_min']} min lopen | klaar {r['finish']}")
@@ -1,32 +1,38 @@
-import requests
-import json
+import time
+from http_client import HTTP
+from live_data import LIVE_BASE_URL, HEADERS, PARK_IDS, park_url, resolver_for
+from weather_utils import weather_url
 
 print("1. Start test verbinding...")
 try:
-    headers = {
-        'User-Agent': 'Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36',
-        'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,image/avif,image/webp,*/*;q=0.8'
-    }
-    # Efteling ID = 160
-    url = "https://queue-times.com/parks/160/queue_times.json"
-    
-    print(f"2. Verzoek sturen naar {url}...")
-    resp = requests.get(url, headers=headers, timeout=10)
-    
-    print(f"3. Status Code: {resp.status_code}")
-    
-    if resp.status_code == 200:
-        data = resp.json()
-        print(f"4. ✅ SUCCES! {len(str(data))} bytes ontvangen.")
-        
+    # Alle parken + het weer tegelijk over de gedeelde client
+    calls = [(park_url(park), HEADERS) for park in PARK_IDS] + [(weather_url("EFTELING"), None)]
+    print(f"2. {len(calls)} verzoeken tegelijk naar {LIVE_BASE_URL} en Open-Meteo...")
+    t0 = time.perf_counter()
+    bodies = HTTP.fetch_many(calls)
+    print(f"3. Klaar in {time.perf_counter() - t0:.2f}s | {HTTP.stats}")
+
+    for park, data in zip(PARK_IDS, bodies):
+        if data is None:
+            print(f"4. ❌ {park}: Mislukt.")
+            continue
+        print(f"4. ✅ {park}: {len(str(data))} bytes ontvangen.")
+        resolver = resolver_for(park)
+        matched = resolver.to_rides(resolver.parse(data))
+        print(f"   🔗 {len(matched)}/{len(resolver.rides)} attracties herkend | onbekend in de API: {sorted(resolver.unmatched) or '-'}")
         # Check Symbolica
-        for land in data['lands']:
+        for land in data.get('lands', []):
             for ride in land['rides']:
                 if "Symbolica" in ride['name']:
                     print(f"   🎢 Gevonden: {ride['name']} - Wacht: {ride['wait_time']} min")
-    else:
-        print("4. ❌ Mislukt: Geen 200 OK.")
-        print(resp.text[:200])
+
+    weather = bodies[-1]
+    if weather: print(f"5. ✅ Weer: {weather.get('daily', {}).get('temperature_2m_max', [])[:3]} °C")
+    else: print("5. ❌ Weer: Mislukt.")
+
+    # Tweede ronde: met ETag / Last-Modified antwoordt de server met 304 als er niets veranderd is
+    HTTP.fetch_many(calls)
+    print(f"6. Tweede ronde | {HTTP.stats}")
 
 except Exception as e:
-    print(f"4. 💥 CRASH: {e}")
\ No newline at end of file
+    print(f"💥 CRASH: {e}")
\ No newline at end of file
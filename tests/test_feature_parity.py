@@ -0,0 +1,32 @@
+import numpy as np
+import pandas as pd
+import pytest
+from queuequest_meta import ATTRACTION_METADATA
+from feature_utils import build_encoding_tables, build_feature_matrix
+from train_model import prepare_data
+
+PARKS = ["EFTELING", "PHANTASIALAND", "WALIBI_BELGIUM"]
+WEATHER = [(15.0, 0.0, "Cloudy"), (3.7, 2.4, "Rain: Light")]
+
+@pytest.mark.parametrize("park", PARKS)
+@pytest.mark.parametrize("temp, precip, cond", WEATHER)
+def test_feature_matrix_matches_prepare_data(park, temp, precip, cond):
+    """build_feature_matrix geeft exact dezelfde float32-matrix als train_model.prepare_data op dezelfde rijen."""
+    rides = [r for r, m in ATTRACTION_METADATA.items() if m['park'] == park] + ["Onbekende Attractie"]
+    days, hours = np.repeat(np.arange(1, 8), 24), np.tile(np.arange(24), 7)
+    holidays = (days >= 6).astype(int)
+    df = pd.DataFrame({
+        'timestamp': '', 'park_name': park, 'attraction_name': np.repeat(rides, len(hours)),
+        'posted_wait_time_min': 0, 'temp_c': temp, 'precip_mm': precip, 'weather_condition': cond,
+        'day_of_week': np.tile(days, len(rides)), 'hour_of_day': np.tile(hours, len(rides)),
+        'is_holiday': np.tile(holidays, len(rides))
+    })
+    df_train, encoders = prepare_data(df)
+    features = [c for c in df_train.columns if c != 'posted_wait_time_min']
+    expected = df_train[features].to_numpy(dtype=np.float32)
+
+    got = build_feature_matrix(features, build_encoding_tables(encoders), park, rides, days, hours, holidays, temp, precip, cond)
+
+    assert got.dtype == np.float32
+    assert got.shape == expected.shape
+    np.testing.assert_array_equal(got, expected)
@@ -0,0 +1,151 @@
+import datetime
+import random
+import pytest
+import route_problem
+import route_solver as rs
+from queuequest_meta import ATTRACTION_METADATA
+
+# Referentie: de oorspronkelijke greedy loops (één calculate_dynamic_score / forecast_wait per kandidaat per stap,
+# met kloktijden), alleen met een vaste `now`. De NumPy-kernels moeten exact dezelfde itinerary geven.
+NOW = datetime.datetime(2026, 7, 14, 8, 0)
+
+def reference_max_score_route(park_name, start_str, end_str, start_location="Ingang", pace_factor=1.0, now=None):
+    now, current_time, park_close = rs.resolve_time_window(start_str, end_str, now)
+    is_simulating_now = (abs((current_time - now).total_seconds()) < 3600)
+    live_data = rs.fetch_live_data(park_name) if is_simulating_now else {}
+    forecast = rs.get_wait_forecast(park_name, current_time.date())
+    candidates = [r for r, m in ATTRACTION_METADATA.items() if m.get('park') == park_name and m.get('score', 0) > 0 and m.get('type') not in ['Restaurant', 'Snack']]
+    if is_simulating_now and live_data:
+        candidates = [c for c in candidates if live_data.get(c, {}).get('is_open', True)]
+
+    itinerary = []
+    current_loc = start_location if start_location != "Unknown" else "Ingang"
+    ride_counts = {c: 0 for c in candidates}
+    while current_time < park_close:
+        best_cand, best_roi, best_det = None, -1, {}
+        last_ride = itinerary[-1]['ride'] if itinerary else None
+        for cand in candidates:
+            transit = rs.calculate_transit_time(park_name, current_loc, cand, pace_factor)
+            arrival = current_time + datetime.timedelta(minutes=transit)
+            if arrival >= park_close: continue
+            wait = rs.forecast_wait(forecast, park_name, cand, arrival, live_data, now)
+            if wait >= 999: continue
+            ride_quality = ATTRACTION_METADATA[cand].get('score', 5)
+            if cand == last_ride and ride_quality < 7: continue
+            duration = ATTRACTION_METADATA[cand].get('duration_min', 5)
+            roi = (ride_quality * 0.7 ** ride_counts[cand]) / max(5, transit + wait + duration)
+            if roi > best_roi:
+                best_roi, best_cand, best_det = roi, cand, {"transit": transit, "wait": wait, "arrival": arrival, "duration": duration}
+        if not best_cand: break
+        ride_start = best_det['arrival'] + datetime.timedelta(minutes=best_det['wait'])
+        ride_end = ride_start + datetime.timedelta(minutes=best_det['duration'])
+        itinerary.append({
+            "ride": best_cand, "type": "SCORE", "start_walk": rs.format_time(current_time),
+            "walk_min": int(best_det['transit']), "arrival_time": rs.format_time(best_det['arrival']),
+            "wait_min": int(best_det['wait']), "ride_start": rs.format_time(ride_start),
+            "ride_end": rs.format_time(ride_end), "note": f"Rit #{ride_counts[best_cand] + 1}"
+        })
+        current_time, current_loc = ride_end, best_cand
+        ride_counts[best_cand] += 1
+    return itinerary, [], []
+
+def reference_route_with_priorities(park_name, must_haves, should_haves, start_str, end_str, start_location="Unknown", lunch_config=None, pace_factor=1.0, now=None):
+    now, current_time, park_close = rs.resolve_time_window(start_str, end_str, now)
+    is_simulating_now = (abs((current_time - now).total_seconds()) < 3600)
+    live_data = rs.fetch_live_data(park_name) if is_simulating_now else {}
+    forecast = rs.get_wait_forecast(park_name, current_time.date())
+    lunch_done = False
+    lunch_dt = current_time.tzinfo.localize(datetime.datetime.combine(current_time.date(), lunch_config['time'])) if lunch_config else None
+    unvisited = list(set(must_haves + should_haves))
+    closed_rides = []
+    if is_simulating_now and live_data:
+        for ride in list(unvisited):
+            if ride in live_data and not live_data[ride]['is_open']:
+                closed_rides.append(ride); unvisited.remove(ride)
+
+    itinerary, current_loc, skipped = [], rs.resolve_start_location(park_name, start_location), []
+    while unvisited:
+        if current_time >= park_close: skipped = list(unvisited); break
+        if lunch_config and not lunch_done and current_time >= lunch_dt:
+            rest = lunch_config['restaurant']
+            walk = rs.calculate_transit_time(park_name, current_loc, rest, pace_factor)
+            arr = current_time + datetime.timedelta(minutes=walk)
+            fin = arr + datetime.timedelta(minutes=lunch_config['duration'])
+            itinerary.append({"ride": f"🍽️ Lunch: {rest}", "type": "LUNCH", "start_walk": rs.format_time(current_time), "walk_min": int(walk), "arrival_time": rs.format_time(arr), "wait_min": 0, "ride_start": rs.format_time(arr), "ride_end": rs.format_time(fin), "note": "Pauze"})
+            current_time, current_loc, lunch_done = fin, rest, True; continue
+
+        best_cand, best_score, best_det = None, float('inf'), {}
+        last_ride = itinerary[-1]['ride'] if itinerary and itinerary[-1]['type'] != 'LUNCH' else None
+        for candidate in unvisited:
+            temp_transit = rs.calculate_transit_time(park_name, current_loc, candidate, pace_factor)
+            temp_arrival = current_time + datetime.timedelta(minutes=temp_transit)
+            if temp_arrival >= park_close: continue
+            score, transit, wait = rs.calculate_dynamic_score(park_name, candidate, current_loc, temp_arrival, live_data, pace_factor, forecast, now)
+            ride_quality = ATTRACTION_METADATA.get(candidate, {}).get('score', 5)
+            if candidate == last_ride: score += 500 if ride_quality < 7 else 20
+            if candidate in should_haves: score *= 1.3
+            if score < best_score:
+                best_score, best_cand, best_det = score, candidate, {"transit": transit, "wait": wait, "arrival": temp_arrival}
+        if not best_cand: skipped = list(unvisited); break
+        dur = ATTRACTION_METADATA.get(best_cand, {}).get('duration_min', 5)
+        ride_start = best_det['arrival'] + datetime.timedelta(minutes=best_det['wait'])
+        ride_end = ride_start + datetime.timedelta(minutes=dur)
+        itinerary.append({"ride": best_cand, "type": "MUST" if best_cand in must_haves else "SHOULD", "start_walk": rs.format_time(current_time), "walk_min": int(best_det['transit']), "arrival_time": rs.format_time(best_det['arrival']), "wait_min": int(best_det['wait']), "ride_start": rs.format_time(ride_start), "ride_end": rs.format_time(ride_end), "note": "⚡ Live" if is_simulating_now else "🔮 Forecast"})
+        current_time, current_loc = ride_end, best_cand
+        unvisited.remove(best_cand)
+    return itinerary, closed_rides, skipped
+
+# --- SCENARIO'S ---
+def park_rides(park_name):
+    return [r for r, m in ATTRACTION_METADATA.items() if m['park'] == park_name and m.get('type') not in ['Restaurant', 'Snack']]
+
+def restaurant(park_name):
+    return next(r for r, m in ATTRACTION_METADATA.items() if m['park'] == park_name and m.get('type') == 'Restaurant')
+
+def scenarios():
+    rng = random.Random(17)
+    cases = []
+    for park in ["EFTELING", "PHANTASIALAND", "WALIBI_BELGIUM"]:
+        pool = park_rides(park)
+        for k in range(6):
+            wish = rng.sample(pool, rng.randint(1, len(pool)))
+            split = rng.randint(0, len(wish))
+            lunch = {"time": datetime.time(12, 30), "duration": 45, "restaurant": restaurant(park)} if k % 2 else None
+            start = rng.choice(["09:00", "10:00", "10:35", "13:20"])
+            end = rng.choice(["17:00", "18:00", "19:30"])
+            cases.append((park, wish[:split], wish[split:], start, end, rng.choice([1.0, 1.3]), lunch))
+    return cases
+
+@pytest.fixture
+def live(monkeypatch):
+    """Live data (willekeurig, deels dicht) in plaats van de poller; route_problem gebruikt dezelfde functie."""
+    snapshots = {}
+    def fake_fetch(park_name):
+        if park_name not in snapshots:
+            rng = random.Random(park_name)
+            snapshots[park_name] = {r: {"is_open": rng.random() > 0.15, "wait_time": rng.choice([0, 5, 15, 45, 90])} for r in park_rides(park_name)}
+        return snapshots[park_name]
+    monkeypatch.setattr(rs, "fetch_live_data", fake_fetch)
+    monkeypatch.setattr(route_problem, "fetch_live_data", fake_fetch)
+
+@pytest.mark.parametrize("park, must, should, start, end, pace, lunch", scenarios())
+def test_priorities_kernel_matches_reference(park, must, should, start, end, pace, lunch):
+    expected = reference_route_with_priorities(park, must, should, start, end, "Unknown", lunch, pace, now=NOW)
+    assert rs.solve_route_with_priorities(park, must, should, start, end, "Unknown", lunch, pace, now=NOW) == expected
+
+@pytest.mark.parametrize("park", ["EFTELING", "PHANTASIALAND", "WALIBI_BELGIUM"])
+@pytest.mark.parametrize("start, end, pace", [("10:00", "18:00", 1.0), ("13:20", "19:30", 1.3)])
+def test_max_score_kernel_matches_reference(park, start, end, pace):
+    expected = reference_max_score_route(park, start, end, "Ingang", pace, now=NOW)
+    assert rs.solve_max_score_route(park, start, end, "Ingang", pace, now=NOW) == expected
+
+@pytest.mark.parametrize("park", ["EFTELING", "PHANTASIALAND", "WALIBI_BELGIUM"])
+def test_kernels_match_reference_with_live_data(live, park):
+    # Starttijd = nu: live data in het eerste halfuur, gesloten ritten vallen af
+    now = datetime.datetime(2026, 7, 14, 10, 5)
+    pool = park_rides(park)
+    must, should = pool[::2], pool[1::2]
+    expected = reference_route_with_priorities(park, must, should, "10:00", "18:00", "Unknown", None, 1.0, now=now)
+    assert expected[0] and expected[0][0]['note'] == "⚡ Live"
+    assert rs.solve_route_with_priorities(park, must, should, "10:00", "18:00", "Unknown", None, 1.0, now=now) == expected
+    assert rs.solve_max_score_route(park, "10:00", "18:00", "Ingang", 1.0, now=now) == reference_max_score_route(park, "10:00", "18:00", "Ingang", 1.0, now=now)
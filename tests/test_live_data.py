@@ -0,0 +1,71 @@
+import json
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+import pytest
+import live_data
+from live_data import SnapshotStore, LivePoller, PARK_IDS
+from wait_history import WaitHistory
+
+# Per park-id één rit zoals de API hem noemt (Walibi: 'Pulsar' wordt PULSAR via de resolver)
+OTHER_RIDES = {"56": [{"id": 1, "name": "Taron ", "is_open": True, "wait_time": 45}], "14": [{"id": 2, "name": "Pulsar", "is_open": False, "wait_time": 0}]}
+
+@pytest.fixture
+def stand_in():
+    """Lokale queue-times op een vrije poort: ETag per inhoud (304 bij een match) en een trage response."""
+    state = {"waits": {"Baron 1898": 30}, "hits": [], "not_modified": 0}
+
+    class StandIn(BaseHTTPRequestHandler):
+        def do_GET(self):
+            state["hits"].append(self.path)
+            time.sleep(0.2)
+            park_id = self.path.split("/")[2]
+            rides = OTHER_RIDES.get(park_id) or [{"id": 3, "name": name, "is_open": True, "wait_time": w} for name, w in state["waits"].items()]
+            body = json.dumps({"lands": [{"rides": rides}]}).encode()
+            etag = f'"{park_id}-{hash(body)}"'
+            if self.headers.get("If-None-Match") == etag:
+                state["not_modified"] += 1
+                self.send_response(304); self.send_header("ETag", etag); self.end_headers()
+                return
+            self.send_response(200); self.send_header("Content-Type", "application/json"); self.send_header("ETag", etag); self.end_headers()
+            self.wfile.write(body)
+        def log_message(self, *args): pass
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), StandIn)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    state["url"] = f"http://127.0.0.1:{server.server_port}"
+    yield state
+    server.shutdown()
+
+def test_version_follows_content(stand_in):
+    store = SnapshotStore(stand_in["url"])
+    first = store.refresh("EFTELING")
+    assert first.version == 1 and first.rides["Baron 1898"] == {"is_open": True, "wait_time": 30}
+
+    # Zelfde inhoud: de server antwoordt 304, de versie blijft
+    again = store.refresh("EFTELING")
+    assert stand_in["not_modified"] == 1 and again.version == 1
+
+    stand_in["waits"]["Baron 1898"] = 55
+    changed = store.refresh("EFTELING")
+    assert changed.version == 2 and changed.rides["Baron 1898"]["wait_time"] == 55
+
+def test_concurrent_refresh_is_single_flight(stand_in, monkeypatch):
+    monkeypatch.setattr(live_data, "LIVE_STORE", SnapshotStore(stand_in["url"]))
+    with ThreadPoolExecutor(8) as ex:
+        results = list(ex.map(lambda _: live_data.refresh_park("EFTELING"), range(8)))
+    assert len(stand_in["hits"]) == 1
+    assert all(r == {"Baron 1898": {"is_open": True, "wait_time": 30}} for r in results)
+
+def test_poller_records_history(stand_in, tmp_path):
+    store = SnapshotStore(stand_in["url"])
+    history = WaitHistory(str(tmp_path))
+    poller = LivePoller(store, interval_s=60, history=history)
+    poller.poll_once()
+    assert {p: s.rides for p, s in store._snapshots.items()} == {
+        "EFTELING": {"Baron 1898": {"is_open": True, "wait_time": 30}},
+        "PHANTASIALAND": {"Taron": {"is_open": True, "wait_time": 45}},
+        "WALIBI_BELGIUM": {"PULSAR": {"is_open": False, "wait_time": 0}},
+    }
+    assert history.records == len(PARK_IDS)
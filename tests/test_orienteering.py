@@ -0,0 +1,24 @@
+import datetime
+import pytest
+from orienteering import OrienteeringPlanner, max_score_problem, emit_itinerary, DECAY
+from queuequest_meta import ATTRACTION_METADATA
+from route_solver import solve_max_score_route
+
+NOW = datetime.datetime(2026, 7, 14, 8, 0)
+
+@pytest.mark.parametrize("park", ["EFTELING", "PHANTASIALAND", "WALIBI_BELGIUM"])
+@pytest.mark.parametrize("start, end", [("10:00", "18:00"), ("13:30", "17:00")])
+def test_anytime_starts_at_greedy_and_only_improves(park, start, end):
+    problem = max_score_problem(park, start, end, "Ingang", 1.0, NOW)
+    progress = []
+    best_score, best_steps = OrienteeringPlanner(problem, seed=0).solve(0.2, on_improve=lambda score, steps: progress.append((score, list(steps))))
+
+    # Eerste plan = de greedy route, daarna alleen strikt betere
+    assert emit_itinerary(problem, progress[0][1]) == solve_max_score_route(park, start, end, "Ingang", 1.0, now=NOW)[0]
+    scores = [score for score, _ in progress]
+    assert all(b > a for a, b in zip(scores, scores[1:]))
+    assert (best_score, best_steps) == progress[-1]
+    # De gerapporteerde score hoort bij de gerapporteerde route
+    for score, steps in progress:
+        recomputed = sum(ATTRACTION_METADATA[problem.rides[ride]].get('score', 5) * DECAY ** count for ride, _, _, _, _, count in steps)
+        assert recomputed == pytest.approx(score)
@@ -0,0 +1,26 @@
+import datetime
+import os
+import signal
+import parallel_solver as ps
+from queuequest_meta import ATTRACTION_METADATA
+
+def test_pool_is_rebuilt_after_a_worker_dies():
+    pool = ps.get_pool(2)
+    pid = pool.submit(os.getpid).result(timeout=60)
+    os.kill(pid, signal.SIGKILL)
+    try: pool.submit(os.getpid).result(timeout=60)
+    except Exception: pass
+    assert pool._broken
+
+    fresh = ps.get_pool(2)
+    assert fresh is not pool
+    assert fresh.submit(os.getpid).result(timeout=60) not in (pid, os.getpid())
+    fresh.shutdown(cancel_futures=True)
+    ps._pool = None
+
+def test_small_requests_stay_in_process(monkeypatch):
+    monkeypatch.setattr(ps, "_pool", None)
+    everything = [r for r, m in ATTRACTION_METADATA.items() if m['park'] == "EFTELING" and m.get('type') not in ['Restaurant', 'Snack']]
+    route, _, skipped, stats = ps.solve_parallel("EFTELING", everything, [], "10:00", "18:00", n_workers=4, now=datetime.datetime(2026, 7, 14, 8, 0))
+    assert route and [s['pid'] for s in stats] == [os.getpid()]
+    assert stats[0]['elapsed_s'] < ps.TIME_BUDGET_S and ps._pool is None
@@ -0,0 +1,28 @@
+import datetime
+import plan_cache
+import route_problem
+import route_solver
+from live_data import SnapshotStore
+from plan_cache import PlanCache, cached_plan
+from route_solver import solve_route_with_priorities
+
+MUST = ["Baron 1898", "Symbolica", "Python"]
+
+def test_live_plans_are_reused_until_the_snapshot_changes(monkeypatch):
+    store, cache = SnapshotStore("http://127.0.0.1:9"), PlanCache()
+    monkeypatch.setattr(plan_cache, "live_snapshot", store.get)
+    monkeypatch.setattr(plan_cache, "PLAN_CACHE", cache)
+    for module in (route_solver, route_problem): monkeypatch.setattr(module, "fetch_live_data", store.rides)
+    store.put("EFTELING", {"Python": {"is_open": True, "wait_time": 10}})
+
+    # Zelfde aanvraag een paar minuten later, zelfde snapshot: uit de cache
+    for minute in (0, 3, 11, 25):
+        cached_plan(solve_route_with_priorities, "EFTELING", MUST, [], "10:00", "19:00", now=datetime.datetime(2026, 7, 14, 10, minute))
+    assert (cache.hits, cache.misses) == (3, 1)
+
+    # Zelfde inhoud opnieuw gemeten: versie blijft, nog steeds een hit; andere inhoud: opnieuw rekenen
+    store.put("EFTELING", {"Python": {"is_open": True, "wait_time": 10}})
+    cached_plan(solve_route_with_priorities, "EFTELING", MUST, [], "10:00", "19:00", now=datetime.datetime(2026, 7, 14, 10, 30))
+    store.put("EFTELING", {"Python": {"is_open": True, "wait_time": 40}})
+    cached_plan(solve_route_with_priorities, "EFTELING", MUST, [], "10:00", "19:00", now=datetime.datetime(2026, 7, 14, 10, 31))
+    assert (cache.hits, cache.misses) == (4, 2) and cache.stats()["invalidations"] == 1
@@ -4,12 +4,11 @@ import xgboost as xgb
 from sklearn.model_selection import train_test_split
 from sklearn.metrics import mean_absolute_error
 from sklearn.preprocessing import LabelEncoder
-import joblib
 from queuequest_meta import ATTRACTION_METADATA
+from model_store import REGISTRY_DIR, publish_version
 
 # --- CONFIGURATIE ---
 INPUT_FILE = "real_data.csv"
-MODEL_FILE = "queuequest_model.pkl"
 
 def prepare_data(df):
     print("Feature Engineering gestart...")
@@ -132,14 +131,14 @@ def train_model():
     # Check de diepte analyse opnieuw
     check_model_performance(y_test, predictions)
     
-    # 7. Opslaan
-    full_pipeline = {
-        "model": model,
-        "encoders": encoders,
-        "features": features
-    }
-    joblib.dump(full_pipeline, MODEL_FILE)
-    print(f"\nModel succesvol opgeslagen als '{MODEL_FILE}'")
+    # 7. Publiceren in de model registry (draaiende apps wisselen automatisch)
+    version = publish_version(model, encoders, features, {
+        "mae": round(float(mae), 3),
+        "train_rows": int(len(X_train)),
+        "test_rows": int(len(X_test)),
+        "input_file": INPUT_FILE
+    })
+    print(f"\nModel succesvol gepubliceerd als {version} in '{REGISTRY_DIR}'")
 
 if __name__ == "__main__":
     train_model()
\ No newline at end of file
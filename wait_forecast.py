@@ -0,0 +1,98 @@
+import datetime
+import threading
+from collections import OrderedDict
+import numpy as np
+from queuequest_meta import ATTRACTION_METADATA
+
+# --- CONFIGURATIE ---
+SLOT_MINUTES = 5
+SLOTS_PER_HOUR = 60 // SLOT_MINUTES
+HORIZON_HOURS = 30            # Tot 06:00 de volgende dag (dekt de '+2 uur' lookahead na sluitingstijd)
+MAX_CACHE_BYTES = 64 * 1024 * 1024
+
+def get_park_rides(park_name):
+    """Alle attracties (geen eten) van een park, in de volgorde van ATTRACTION_METADATA."""
+    return [r for r, m in ATTRACTION_METADATA.items() if m.get('park') == park_name and m.get('type') not in ['Restaurant', 'Snack']]
+
+class WaitForecast:
+    """
+    Voorspelde wachttijden van één park op één dag (en één weerscenario).
+    waits[ride_id, slot] met slots van 5 minuten vanaf 00:00 van `date`.
+    """
+
+    def __init__(self, park_name, date, rides, waits, weather_key=None):
+        self.park_name = park_name
+        self.date = date
+        self.weather_key = weather_key
+        self.rides = list(rides)
+        self.ride_index = {r: i for i, r in enumerate(self.rides)}
+        self.waits = waits
+
+    @classmethod
+    def build(cls, park_name, date, predict_fn, weather=None, rides=None):
+        """Vult de tensor met één model-call per uur van de horizon (predict_fn = predict_grid)."""
+        rides = get_park_rides(park_name) if rides is None else list(rides)
+        midnight = datetime.datetime.combine(date, datetime.time(0, 0))
+        times = [midnight + datetime.timedelta(hours=h) for h in range(HORIZON_HOURS)]
+        hourly = np.asarray(predict_fn(park_name, rides, times, weather=weather)).reshape(len(rides), HORIZON_HOURS)
+        # Het model kijkt alleen naar het uur: elk uur beslaat 12 identieke slots
+        waits = np.repeat(hourly, SLOTS_PER_HOUR, axis=1).astype(np.int16)
+        return cls(park_name, date, rides, waits, weather_key=weather_cache_key(weather))
+
+    @property
+    def nbytes(self):
+        return self.waits.nbytes
+
+    def slot(self, dt):
+        minutes = (dt.date() - self.date).days * 1440 + dt.hour * 60 + dt.minute
+        return min(max(minutes // SLOT_MINUTES, 0), self.waits.shape[1] - 1)
+
+    def lookup(self, ride_name, dt):
+        """Wachttijd voor een attractie op tijdstip dt, of None als de attractie niet in de tensor zit."""
+        row = self.ride_index.get(ride_name)
+        if row is None: return None
+        return int(self.waits[row, self.slot(dt)])
+
+def weather_cache_key(weather):
+    return tuple(sorted(weather.items())) if weather else None
+
+class ForecastCache:
+    """LRU-cache van WaitForecasts, begrensd op het totale geheugen van de tensors."""
+
+    def __init__(self, max_bytes=MAX_CACHE_BYTES):
+        self.max_bytes = max_bytes
+        self._items = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+
+    def get(self, park_name, date, predict_fn, weather=None):
+        key = (park_name, date, weather_cache_key(weather))
+        with self._lock:
+            forecast = self._items.get(key)
+            if forecast is not None:
+                self._items.move_to_end(key)
+                return forecast
+        forecast = WaitForecast.build(park_name, date, predict_fn, weather=weather)
+        with self._lock:
+            if key not in self._items:
+                self._items[key] = forecast
+                self._bytes += forecast.nbytes
+            # Oudste eerst weg, maar houd altijd de zojuist gebouwde forecast
+            while self._bytes > self.max_bytes and len(self._items) > 1:
+                _, old = self._items.popitem(last=False)
+                self._bytes -= old.nbytes
+            return self._items.get(key, forecast)
+
+    def invalidate(self, parks=None, with_weather=False):
+        """Gooit de forecasts van `parks` weg (None = alles); with_weather=True: ook alle forecasts met een weerscenario."""
+        with self._lock:
+            for key in [k for k in self._items if parks is None or k[0] in parks or (with_weather and k[2] is not None)]:
+                self._bytes -= self._items.pop(key).nbytes
+
+    def clear(self):
+        with self._lock:
+            self._items.clear()
+            self._bytes = 0
+
+    def __len__(self):
+        return len(self._items)
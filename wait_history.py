@@ -0,0 +1,178 @@
+import datetime
+import json
+import os
+import threading
+import numpy as np
+import pandas as pd
+import pytz
+
+# --- CONFIGURATIE ---
+HISTORY_DIR = os.environ.get("QUEUEQUEST_HISTORY_DIR", "wait_history")   # Eén submap per park: rides.json + één .bin per dag
+RIDES_FILE = "rides.json"
+TZ = pytz.timezone('Europe/Brussels')
+MINUTES_PER_DAY = 24 * 60
+CLOSED_WAIT = 999          # Zelfde betekenis als in route_solver: attractie dicht
+# Vaste breedte (7 bytes), little-endian: het aantal records is altijd bestandsgrootte // 7
+RECORD_DTYPE = np.dtype([('ride', '<u2'), ('minute', '<u2'), ('wait', '<u2'), ('open', 'u1')])
+
+class WaitHistory:
+    """
+    Append-only tijdreeks van gemeten wachttijden, lokaal op schijf. Per park en per (lokale) dag één bestand
+    met records van vaste breedte (RECORD_DTYPE), in de volgorde waarin ze binnenkwamen. De ritnamen staan één keer
+    in rides.json (naam -> id); een nieuwe rit krijgt het volgende id, bestaande ids veranderen nooit.
+    Lezen gaat via np.memmap en geeft per kolom een array terug (read(...)['wait'], ...).
+    """
+
+    def __init__(self, root=HISTORY_DIR):
+        self.root = root
+        self._ids = {}
+        self._lock = threading.Lock()
+        self.records = 0
+
+    def _park_dir(self, park_name):
+        return os.path.join(self.root, park_name)
+
+    def _day_file(self, park_name, day):
+        return os.path.join(self._park_dir(park_name), f"{day.isoformat()}.bin")
+
+    # --- RIT-IDS ---
+    def ride_ids(self, park_name):
+        """{ritnaam: id} van dit park (leeg als er nog niets is opgeslagen)."""
+        if park_name not in self._ids:
+            path = os.path.join(self._park_dir(park_name), RIDES_FILE)
+            ids = {}
+            if os.path.exists(path):
+                with open(path, encoding="utf-8") as f:
+                    ids = json.load(f)
+            self._ids[park_name] = ids
+        return self._ids[park_name]
+
+    def ride_names(self, park_name):
+        """Omgekeerde map: id -> ritnaam."""
+        return {i: name for name, i in self.ride_ids(park_name).items()}
+
+    def _assign_ids(self, park_name, names):
+        ids = self.ride_ids(park_name)
+        new = [n for n in names if n not in ids]
+        if new:
+            for name in new:
+                ids[name] = len(ids)
+            # Eerst de namen wegschrijven (atomair), dan pas records die ernaar verwijzen
+            path = os.path.join(self._park_dir(park_name), RIDES_FILE)
+            with open(path + ".tmp", "w", encoding="utf-8") as f:
+                json.dump(ids, f, ensure_ascii=False, indent=1)
+            os.replace(path + ".tmp", path)
+        return ids
+
+    # --- SCHRIJVEN ---
+    def append(self, park_name, fetched_at, rides):
+        """
+        Voegt één meting toe: `rides` als dict ({rit: {"is_open", "wait_time"}}),
+        `fetched_at` als epoch-seconden. Geeft het aantal weggeschreven records.
+        """
+        if not rides: return 0
+        names = list(rides)
+        return self._write(park_name, fetched_at, names, [rides[n].get('wait_time') or 0 for n in names], [bool(rides[n].get('is_open')) for n in names])
+
+    def append_waits(self, park_name, fetched_at, names, waits):
+        """
+        Zoals append, maar rechtstreeks uit een snapshot-array (Snapshot.waits met de ritnamen `names` in dezelfde
+        volgorde): CLOSED_WAIT = dicht, negatief = niet gemeld (geen record).
+        """
+        waits = np.asarray(waits)
+        keep = np.flatnonzero(waits >= 0)
+        if not len(keep): return 0
+        waits = waits[keep]
+        is_open = waits != CLOSED_WAIT
+        return self._write(park_name, fetched_at, [names[i] for i in keep], np.where(is_open, waits, 0), is_open)
+
+    def _write(self, park_name, fetched_at, names, waits, is_open):
+        moment = datetime.datetime.fromtimestamp(fetched_at, TZ)
+        with self._lock:
+            os.makedirs(self._park_dir(park_name), exist_ok=True)
+            ids = self._assign_ids(park_name, names)
+            block = np.empty(len(names), dtype=RECORD_DTYPE)
+            block['ride'] = [ids[n] for n in names]
+            block['minute'] = moment.hour * 60 + moment.minute
+            block['wait'] = np.clip(waits, 0, np.iinfo(np.uint16).max)
+            block['open'] = is_open
+            # Eén write per meting; 'ab' schrijft altijd achteraan
+            with open(self._day_file(park_name, moment.date()), "ab") as f:
+                torn = f.tell() % RECORD_DTYPE.itemsize
+                if torn: f.truncate(f.tell() - torn)    # Half record van een eerdere crash: anders schuift alles op
+                f.write(block.tobytes())
+            self.records += len(block)
+        return len(block)
+
+    # --- LEZEN ---
+    def days(self, park_name):
+        """Alle dagen waarvoor er metingen zijn, oudste eerst."""
+        folder = self._park_dir(park_name)
+        if not os.path.isdir(folder): return []
+        return sorted(datetime.date.fromisoformat(f[:-4]) for f in os.listdir(folder) if f.endswith(".bin"))
+
+    def read(self, park_name, day, start_min=0, end_min=MINUTES_PER_DAY, rides=None):
+        """
+        Records van één dag met start_min <= minuut < end_min, optioneel alleen voor de ritten `rides` (namen).
+        Een half geschreven laatste record (crash midden in een write) wordt genegeerd.
+        """
+        path = self._day_file(park_name, day)
+        count = os.path.getsize(path) // RECORD_DTYPE.itemsize if os.path.exists(path) else 0
+        if not count: return np.empty(0, dtype=RECORD_DTYPE)
+        data = np.memmap(path, dtype=RECORD_DTYPE, mode='r', shape=(count,))
+        keep = (data['minute'] >= start_min) & (data['minute'] < end_min)
+        if rides is not None:
+            ids = self.ride_ids(park_name)
+            keep &= np.isin(data['ride'], [ids[r] for r in rides if r in ids])
+        return np.array(data[keep])
+
+    def series(self, park_name, day, ride):
+        """(minuten, wachttijden) van één rit op één dag; alleen de metingen waarop de rit open was."""
+        rows = self.read(park_name, day, rides=[ride])
+        rows = rows[rows['open'] == 1]
+        return rows['minute'].astype(int), rows['wait'].astype(int)
+
+    def to_frame(self, park_name, days=None):
+        """Als DataFrame met dezelfde kolomnamen als real_data.csv (plus is_open), bijv. als extra trainingsdata."""
+        names = self.ride_names(park_name)
+        frames = []
+        for day in (self.days(park_name) if days is None else days):
+            rows = self.read(park_name, day)
+            if not len(rows): continue
+            midnight = pd.Timestamp(datetime.datetime.combine(day, datetime.time(0, 0))).tz_localize(TZ)
+            frames.append(pd.DataFrame({
+                "timestamp": midnight + pd.to_timedelta(rows['minute'].astype(int), unit='min'),
+                "park_name": park_name, "attraction_name": [names[i] for i in rows['ride']],
+                "posted_wait_time_min": rows['wait'].astype(int), "is_open": rows['open'].astype(bool)
+            }))
+        if not frames: return pd.DataFrame(columns=["timestamp", "park_name", "attraction_name", "posted_wait_time_min", "is_open"])
+        return pd.concat(frames, ignore_index=True)
+
+WAIT_HISTORY = WaitHistory()
+
+if __name__ == "__main__":
+    # Een dag aan metingen (elke 5 minuten, 40 ritten) in een tijdelijke map: schrijven, bereik lezen, half record
+    import tempfile
+    import time
+    rng = np.random.default_rng(0)
+    with tempfile.TemporaryDirectory() as tmp:
+        history = WaitHistory(tmp)
+        rides = [f"Rit {i}" for i in range(40)]
+        opening = TZ.localize(datetime.datetime(2026, 7, 14, 10, 0)).timestamp()
+        t0 = time.perf_counter()
+        for k in range(96):
+            history.append("EFTELING", opening + 300 * k, {r: {"is_open": rng.random() > 0.05, "wait_time": int(rng.integers(0, 90))} for r in rides})
+        t_write = time.perf_counter() - t0
+        day = history.days("EFTELING")[0]
+        size = os.path.getsize(history._day_file("EFTELING", day))
+        t0 = time.perf_counter()
+        window = history.read("EFTELING", day, 12 * 60, 14 * 60, rides=["Rit 3", "Rit 7"])
+        t_read = time.perf_counter() - t0
+        print(f"{history.records} records ({size} bytes) in {1000 * t_write:.1f} ms | 12:00-14:00 voor 2 ritten: {len(window)} records in {1000 * t_read:.2f} ms")
+        minutes, waits = history.series("EFTELING", day, "Rit 3")
+        print(f"Rit 3: {len(minutes)} open metingen, eerste {minutes[0] // 60:02d}:{minutes[0] % 60:02d} ({waits[0]} min)")
+        with open(history._day_file("EFTELING", day), "ab") as f:
+            f.write(b"\x01\x02\x03")
+        print("Na een half record:", len(history.read("EFTELING", day)), "records |", len(WaitHistory(tmp).to_frame("EFTELING")), "rijen in to_frame")
+        history.append("EFTELING", opening + 300 * 96, {"Rit 3": {"is_open": True, "wait_time": 12}})
+        print("Volgende meting na het halve record:", history.series("EFTELING", day, "Rit 3")[1][-1], "min")
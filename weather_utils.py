@@ -1,5 +1,7 @@
-import requests
 import datetime
+import threading
+import time
+from http_client import HTTP
 
 # Coördinaten van de parken (Centraal punt)
 PARK_COORDS = {
@@ -7,6 +9,12 @@ PARK_COORDS = {
     "PHANTASIALAND": {"lat": 50.8000, "lon": 6.8800},
     "WALIBI_BELGIUM": {"lat": 50.7000, "lon": 4.5900}
 }
+WEATHER_TIMEOUT_S = 2
+WEATHER_TTL_S = 30 * 60        # Open-Meteo ververst hooguit elk uur; elke Streamlit-rerun hoeft niet opnieuw te vragen
+FALLBACK_TTL_S = 5 * 60        # Ook een mislukte poging onthouden, anders wacht elke rerun opnieuw op de timeout
+
+_WEATHER_CACHE = {}            # (park, datum) -> (verloopt op, resultaat)
+_WEATHER_LOCK = threading.Lock()
 
 # Klimaatgemiddelden (Maand 1-12) voor Fallback (>14 dagen)
 # [Temp Max, Neerslagkans %]
@@ -16,13 +24,17 @@ CLIMATE_AVERAGES = {
     9: [19, 25], 10: [15, 30], 11: [10, 40], 12: [7, 45]
 }
 
+def weather_url(park_name):
+    """Open-Meteo dagvoorspelling (Gratis, geen key nodig) voor het centrale punt van het park."""
+    coords = PARK_COORDS.get(park_name, PARK_COORDS["EFTELING"])
+    return f"https://api.open-meteo.com/v1/forecast?latitude={coords['lat']}&longitude={coords['lon']}&daily=temperature_2m_max,precipitation_sum,precipitation_probability_max&timezone=auto"
+
 def get_automated_weather(park_name, target_date):
     """
     Haalt het weer op.
-    - Binnen 14 dagen: Live API (Open-Meteo).
+    - Binnen 14 dagen: Live API (Open-Meteo), per (park, datum) onthouden.
     - Verder weg: Statistisch gemiddelde.
     """
-    coords = PARK_COORDS.get(park_name, PARK_COORDS["EFTELING"])
     today = datetime.date.today()
     days_diff = (target_date - today).days
 
@@ -37,11 +49,21 @@ def get_automated_weather(park_name, target_date):
         }
 
     # SCENARIO B: LIVE VOORSPELLING (0 - 14 dagen)
+    key = (park_name, target_date)
+    with _WEATHER_LOCK:
+        hit = _WEATHER_CACHE.get(key)
+    if hit and hit[0] > time.monotonic(): return hit[1]
+    result = fetch_forecast(park_name, target_date)
+    ttl = FALLBACK_TTL_S if result['source'].startswith("⚠️") else WEATHER_TTL_S
+    with _WEATHER_LOCK:
+        _WEATHER_CACHE[key] = (time.monotonic() + ttl, result)
+    return result
+
+def fetch_forecast(park_name, target_date):
+    """Eén request naar Open-Meteo (zonder retries: hooguit WEATHER_TIMEOUT_S wachten), anders de fallback."""
     try:
-        # Open-Meteo API (Gratis, geen key nodig)
-        url = f"https://api.open-meteo.com/v1/forecast?latitude={coords['lat']}&longitude={coords['lon']}&daily=temperature_2m_max,precipitation_sum,precipitation_probability_max&timezone=auto"
-        resp = requests.get(url, timeout=2)
-        data = resp.json()
+        # Gedeelde client: keep-alive en revalidatie; None als Open-Meteo niet antwoordt
+        data = HTTP.fetch_json(weather_url(park_name), timeout=WEATHER_TIMEOUT_S, retries=0) or {}
         
         # Zoek de juiste dag in de response
         daily = data.get('daily', {})
@@ -0,0 +1,122 @@
+import numpy as np
+from queuequest_meta import ATTRACTION_METADATA
+from distance_utils import PHL_LOCATIONS
+from route_problem import problem_from_request, itinerary_step, lunch_step, CLOSED_WAIT, LOOKAHEAD_MIN
+
+# --- CONFIGURATIE ---
+MAX_EXACT_ZONES = 12       # Daarboven worden de zones greedy (goedkoopste volgende zone) gerangschikt
+SHOULD_FACTOR = 1.3        # Zelfde weging als solve_route_with_priorities
+FUTURE_MIN = LOOKAHEAD_MIN # Urgentie: vergelijk met de wachttijd 2 uur later
+
+def ride_zone(park_name, ride):
+    """Phantasialand: de zones van de loopmatrix (PHL_LOCATIONS), anders de 'zone' uit de metadata."""
+    if park_name == "PHANTASIALAND" and ride in PHL_LOCATIONS: return PHL_LOCATIONS[ride]
+    return ATTRACTION_METADATA.get(ride, {}).get('zone', "Onbekend")
+
+class ZonePlanner:
+    """
+    Twee niveaus: eerst de volgorde van de zones (tijdsafhankelijk: looptijd tussen zones + de wacht- en rittijd
+    van alle ritten in de zone op het moment van binnenkomst), daarna per zone de greedy volgorde van alleen
+    die ritten. Elke stap scoort dus een zone in plaats van de hele wensenlijst.
+    """
+
+    def __init__(self, problem):
+        p = self.problem = problem
+        names = [ride_zone(p.park_name, r) for r in p.rides]
+        self.zones = list(dict.fromkeys(names))
+        self.members = [np.array([i for i, z in enumerate(names) if z == zone]) for zone in self.zones]
+        self.weight = np.where(p.is_must, 1.0, SHOULD_FACTOR)
+
+        # Zone-kosten: kortste looptijd naar de zone, en de geschatte tijd in de zone per aankomstminuut
+        loc = [m + 1 for m in self.members]
+        self.enter = np.array([p.transit[0, l].min() for l in loc])
+        self.between = np.array([[p.transit[np.ix_(a, b)].min() for b in loc] for a in loc])
+        open_waits = np.where(p.waits >= CLOSED_WAIT, 0, p.waits)
+        intra = [p.transit[np.ix_(l, l)].sum() / max(len(l), 1) for l in loc]   # Gemiddelde looptijd per rit binnen de zone
+        self.work = np.array([open_waits[m].sum(axis=0) + p.durations[m].sum() + intra[z] for z, m in enumerate(self.members)]).astype(int)
+
+    def finish(self, zone, minute):
+        return minute + int(self.work[zone, min(minute, self.work.shape[1] - 1)])
+
+    def zone_order(self):
+        """Held-Karp over de zones (vroegste geschatte einde van alle zones), of greedy bij veel zones."""
+        nz = len(self.zones)
+        if nz > MAX_EXACT_ZONES:
+            order, clock, last, todo = [], 0, None, set(range(nz))
+            while todo:
+                cost = lambda z: self.finish(z, clock + int(self.enter[z] if last is None else self.between[last, z]))
+                z = min(sorted(todo), key=cost)
+                clock, last = cost(z), z
+                order.append(z); todo.remove(z)
+            return order
+
+        best = {(1 << z, z): (self.finish(z, int(self.enter[z])), None) for z in range(nz)}
+        for mask in range(1, 1 << nz):
+            for last in range(nz):
+                state = best.get((mask, last))
+                if state is None: continue
+                for z in range(nz):
+                    if mask >> z & 1: continue
+                    end = self.finish(z, state[0] + int(self.between[last, z]))
+                    key = (mask | 1 << z, z)
+                    if key not in best or end < best[key][0]: best[key] = (end, last)
+        full = (1 << nz) - 1
+        last = min(range(nz), key=lambda z: best[(full, z)][0])
+        order, mask = [], full
+        while last is not None:
+            order.append(last)
+            mask, last = mask ^ (1 << last), best[(mask, last)][1]
+        return order[::-1]
+
+    def plan(self):
+        """Zones in volgorde afwerken met de greedy scoreregels; ritten die in hun zone niet pasten op het eind nog eens."""
+        p = self.problem
+        steps, visited = [], np.zeros(p.n, dtype=bool)
+        clock, loc, lunch_done = 0, 0, False
+        for group in [self.members[z] for z in self.zone_order()] + [np.arange(p.n)]:
+            while clock < p.horizon:
+                if p.lunch and not lunch_done and clock >= p.lunch['minute']:
+                    walk = int(p.transit[loc, p.lunch['loc']])
+                    steps.append(("LUNCH", clock, walk))
+                    clock, loc, lunch_done = clock + walk + p.lunch['duration'], p.lunch['loc'], True; continue
+                todo = group[~visited[group]]
+                if not len(todo): break
+                transit = p.transit[loc, todo + 1]
+                arrival = clock + transit
+                ok = arrival < p.horizon
+                arrival = np.minimum(arrival, p.horizon - 1)
+                wait = p.waits[todo, arrival]
+                ok &= wait < CLOSED_WAIT
+                if not ok.any(): break
+                future = p.waits[todo, arrival + FUTURE_MIN]
+                urgency = np.where(future > wait + 15, -20, np.where(future < wait - 10, 15, 0))
+                score = np.maximum(transit, transit + wait + urgency) * self.weight[todo]
+                k = int(np.where(ok, score, np.inf).argmin())
+                ride = int(todo[k])
+                steps.append(("RIDE", ride, clock, int(transit[k]), int(arrival[k]), int(wait[k])))
+                clock, loc = int(arrival[k] + wait[k] + p.durations[ride]), ride + 1
+                visited[ride] = True
+        return steps, visited
+
+# --- SOLVER (ZELFDE INTERFACE ALS solve_route_with_priorities) ---
+def solve_route_zoned(park_name, must_haves, should_haves, start_str, end_str, start_location="Unknown", lunch_config=None, pace_factor=1.0, now=None):
+    problem, closed_rides = problem_from_request(park_name, must_haves, should_haves, start_str, end_str, start_location, lunch_config, pace_factor, now)
+    if problem is None: return [], closed_rides, []
+    steps, visited = ZonePlanner(problem).plan()
+    itinerary = [lunch_step(problem, *s[1:]) if s[0] == "LUNCH" else itinerary_step(problem, *s[1:]) for s in steps]
+    skipped = [r for r, v in zip(problem.rides, visited) if not v]
+    return itinerary, closed_rides, skipped
+
+if __name__ == "__main__":
+    # Hele park als wensenlijst: greedy tegenover zone voor zone
+    import time
+    import datetime
+    from route_solver import solve_route_with_priorities
+    now = datetime.datetime(2026, 7, 14, 9, 0)
+    for park in ["EFTELING", "PHANTASIALAND", "WALIBI_BELGIUM"]:
+        everything = [r for r, m in ATTRACTION_METADATA.items() if m['park'] == park and m.get('type') not in ['Restaurant', 'Snack']]
+        for name, solver in [("Greedy", solve_route_with_priorities), ("Zones", solve_route_zoned)]:
+            t0 = time.perf_counter()
+            route, _, skipped = solver(park, everything, [], "10:00", "18:00", now=now)
+            walk, wait = sum(s['walk_min'] for s in route), sum(s['wait_min'] for s in route)
+            print(f"{park:<15} {name:<7}| {len(route)} ritten, {len(skipped)} overgeslagen | {wait} min wachten, {walk} min lopen | klaar {route[-1]['ride_end'] if route else '-'} | {time.perf_counter() - t0:.3f}s")